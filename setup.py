@@ -47,6 +47,7 @@ setuptools.setup(
     entry_points={
         "console_scripts": [
             "squad = squad.squad:main",
+            "squad-bench = squad.bench:main",
         ],
     },
     zip_safe=False,
@@ -1,42 +1,189 @@
 """Gets AS and DM access tokens.
+
+Tokens are shared by everything in the process. They are cached,
+and refreshed in the background shortly before they expire, so callers
+normally get the current token without waiting for Keycloak.
+Tokens are obtained one at a time, squonk2's Auth.get_access_token()
+is synchronised, so the AS and DM tokens cannot be obtained concurrently.
 """
-from typing import Optional
+import base64
+import json
+import threading
+import time
+from typing import Dict, Optional
+
 from squonk2.auth import Auth
+from squonk2.dm_api import DmApi, DmApiRv
 
 from squad.environment import get_environment
+from squad.fetcher import Fetcher
+from squad.startup import StartupProfile
+
+# Tokens are refreshed (in the background) this many seconds before they expire.
+_REFRESH_MARGIN_S: float = 60.0
+# The lifetime assumed for a token whose expiry cannot be decoded.
+_DEFAULT_LIFETIME_S: float = 300.0
+# The time we wait after failing to get a token before trying again.
+_RETRY_PERIOD_S: float = 10.0
+
+
+def get_token_expiry(token: str) -> float:
+    """Returns the time (seconds since the epoch) a token expires.
+    The token is a JWT, we decode its payload (without verification)
+    to find its 'exp' claim.
+    """
+    try:
+        payload: str = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time.time() + _DEFAULT_LIFETIME_S
 
 
 class AccessToken:
-    """Gets AS or DM access tokens."""
+    """Gets AS or DM access tokens, using a process-wide cache."""
+
+    # A lock protecting the following
+    _lock: threading.Lock = threading.Lock()
+    # Tokens (and their expiry time), indexed by Keycloak client ID
+    _tokens: Dict[str, str] = {}
+    _expiry: Dict[str, float] = {}
+    # Time of the last failure to get a token, indexed by Keycloak client ID
+    _failure_time: Dict[str, float] = {}
+    # Background refresh timers, indexed by Keycloak client ID
+    _timers: Dict[str, threading.Timer] = {}
+    # The DM token we've set the admin state for (and its lock)
+    _dm_admin_lock: threading.Lock = threading.Lock()
+    _dm_admin_token: Optional[str] = None
 
     @classmethod
-    def get_as_access_token(cls, *, prior_token: Optional[str] = None) -> Optional[str]:
+    def get_as_access_token(cls) -> Optional[str]:
         """Returns a token for the AS API.
         This returns None on error or if the client ID is not defined.
         """
-        if not get_environment().keycloak_as_client_id():
-            return None
-        access_token: Optional[str] = Auth.get_access_token(
-            keycloak_url=get_environment().keycloak_url(),
-            keycloak_realm=get_environment().keycloak_realm(),
-            keycloak_client_id=get_environment().keycloak_as_client_id(),
-            username=get_environment().admin_user(),
-            password=get_environment().admin_password(),
-            prior_token=prior_token,
-        )
-        return access_token
+        return cls._get_access_token(get_environment().keycloak_as_client_id())
 
     @classmethod
-    def get_dm_access_token(cls, *, prior_token: Optional[str] = None) -> Optional[str]:
+    def get_dm_access_token(cls) -> Optional[str]:
         """Returns a token for the DM API or None if a token could not be obtained."""
-        if not get_environment().keycloak_dm_client_id():
+        return cls._get_access_token(get_environment().keycloak_dm_client_id())
+
+    @classmethod
+    def has_dm_access_token(cls) -> bool:
+        """True if we hold an unexpired DM token. This never calls Keycloak."""
+        client_id: Optional[str] = get_environment().keycloak_dm_client_id()
+        if not client_id:
+            return False
+        return cls._get_cached_token(client_id) is not None
+
+    @classmethod
+    def set_dm_admin_state(cls, access_token: str) -> bool:
+        """Sets the DM 'admin' state for the given token, returning True on success.
+        The DM is only called if we haven't already done this for the token.
+        """
+        with cls._dm_admin_lock:
+            if access_token == cls._dm_admin_token:
+                return True
+            set_admin_response: DmApiRv = DmApi.set_admin_state(
+                access_token, admin=True
+            )
+            if not set_admin_response.success:
+                return False
+            cls._dm_admin_token = access_token
+            return True
+
+    @classmethod
+    def reset_dm_admin_state(cls) -> None:
+        """Forgets the DM admin state, it will be set on the next call to
+        set_dm_admin_state(). Used when we suspect our admin rights have been lost.
+        """
+        with cls._dm_admin_lock:
+            cls._dm_admin_token = None
+
+    @classmethod
+    def _get_cached_token(cls, client_id: str) -> Optional[str]:
+        """Returns the cached token for the client, if it has not expired."""
+        token: Optional[str] = cls._tokens.get(client_id)
+        if token and cls._expiry.get(client_id, 0.0) > time.time():
+            return token
+        return None
+
+    @classmethod
+    def _get_access_token(cls, client_id: Optional[str]) -> Optional[str]:
+        """Returns a token for the client, only calling Keycloak if we do not
+        have a current token (something that's normally only true when
+        we're first called). A recent failure is remembered,
+        and None is returned until it's time to try again.
+        """
+        if not client_id:
             return None
-        access_token: Optional[str] = Auth.get_access_token(
-            keycloak_url=get_environment().keycloak_url(),
-            keycloak_realm=get_environment().keycloak_realm(),
-            keycloak_client_id=get_environment().keycloak_dm_client_id(),
-            username=get_environment().admin_user(),
-            password=get_environment().admin_password(),
-            prior_token=prior_token,
+        token: Optional[str] = cls._get_cached_token(client_id)
+        if token:
+            return token
+
+        with cls._lock:
+            # Someone may have got a token while we waited for the lock
+            token = cls._get_cached_token(client_id)
+            if token:
+                return token
+            failure_time: Optional[float] = cls._failure_time.get(client_id)
+            if failure_time and time.time() - failure_time < _RETRY_PERIOD_S:
+                return None
+            return cls._new_access_token(client_id)
+
+    @classmethod
+    def _new_access_token(cls, client_id: str) -> Optional[str]:
+        """Gets a new token from Keycloak, caching it and arranging for it to
+        be refreshed before it expires.
+        Expected to be called while holding the lock.
+        """
+        with Fetcher.host_slot("keycloak"), StartupProfile.span("get token"):
+            token: Optional[str] = Auth.get_access_token(
+                keycloak_url=get_environment().keycloak_url(),
+                keycloak_realm=get_environment().keycloak_realm(),
+                keycloak_client_id=client_id,
+                username=get_environment().admin_user(),
+                password=get_environment().admin_password(),
+            )
+        now: float = time.time()
+        if token:
+            StartupProfile.mark("first token")
+            cls._tokens[client_id] = token
+            cls._expiry[client_id] = get_token_expiry(token)
+            if cls._expiry[client_id] <= now:
+                # Already expired (a replayed token or a skewed clock),
+                # assume the default lifetime rather than refresh continuously.
+                cls._expiry[client_id] = now + _DEFAULT_LIFETIME_S
+            cls._failure_time.pop(client_id, None)
+            # Refresh ahead of expiry
+            # (but not too early for unusually short-lived tokens)
+            lifetime: float = cls._expiry[client_id] - now
+            refresh_delay: float = max(lifetime - _REFRESH_MARGIN_S, lifetime / 2)
+        else:
+            cls._failure_time[client_id] = now
+            if not cls._get_cached_token(client_id):
+                # Nothing left to keep fresh.
+                return None
+            # Try again, while the token we have remains usable.
+            refresh_delay = _RETRY_PERIOD_S
+
+        # Schedule a background refresh
+        prior_timer: Optional[threading.Timer] = cls._timers.get(client_id)
+        if prior_timer:
+            prior_timer.cancel()
+        timer: threading.Timer = threading.Timer(
+            max(refresh_delay, 0.0), cls._refresh, args=(client_id,)
         )
-        return access_token
+        timer.daemon = True
+        timer.start()
+        cls._timers[client_id] = timer
+
+        return token
+
+    @classmethod
+    def _refresh(cls, client_id: str) -> None:
+        """Refreshes a token (a timer callback).
+        The existing token continues to be handed out until the new one arrives.
+        """
+        with cls._lock:
+            cls._new_access_token(client_id)
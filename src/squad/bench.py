@@ -0,0 +1,405 @@
+"""A benchmark of the SquAd topic renderers (squad-bench).
+
+    squad-bench --sizes 100,1000,10000 --output bench.json
+
+Each topic's renderer is given synthetic AS/DM responses of growing size
+(no API is used) and we record the time it takes to extract the rows
+(into the renderer's row store), sort them, reverse the sort and build
+(and lay out) the topic's table, along with the peak memory used.
+The results are written as JSON so that the results of different versions
+can be compared (see --compare).
+"""
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from rich.console import Console
+from squonk2.as_api import AsApiRv
+from squonk2.dm_api import DmApiRv
+
+from squad.widgets.topics.base import TopicRenderer
+from squad.widgets.topics.registry import renderer_class
+from squad.widgets.topics.row_store import SortOrder
+
+# The default number of rows in each benchmark
+_DEFAULT_SIZES: List[int] = [100, 1_000, 10_000, 100_000]
+# The number of rows in the display window (the number of rows rendered)
+_PAGE_SIZE: int = 50
+# The timed measurements in each result
+_TIMES: List[str] = ["extract_s", "sort_s", "reverse_s", "render_s"]
+
+# A handful of values repeated across rows,
+# the sort of repetition we find in real responses.
+_OWNERS: List[str] = ["alan", "boris", "claire", "dimitri", "eve"]
+_PHASES: List[str] = ["RUNNING", "COMPLETED", "FAILED", "PENDING"]
+
+
+def _uuid(kind: str, number: int) -> str:
+    """Returns a (fake) UUID for a thing."""
+    return f"{kind}-{number:08x}-0000-4000-8000-{number * 7919:012x}"
+
+
+def _created(number: int) -> str:
+    """Returns a (fake) creation date for a thing."""
+    return f"2022-{number % 12 + 1:02}-{number % 28 + 1:02}T{number % 24:02}:00:00Z"
+
+
+def _assets(num_rows: int) -> Dict[str, Any]:
+    return {
+        "assets": [
+            {
+                "name": f"asset-{n}",
+                "creator": _OWNERS[n % len(_OWNERS)],
+                "scope": "USER",
+                "scope_id": _OWNERS[n % len(_OWNERS)],
+                "created": _created(n),
+                "disabled": n % 5 == 0,
+                "secret": n % 2 == 0,
+                "merchants": [{"name": "squonk"}],
+            }
+            for n in range(num_rows)
+        ]
+    }
+
+
+def _datasets(num_rows: int) -> Dict[str, Any]:
+    return {
+        "datasets": [
+            {
+                "dataset_id": _uuid("dataset", n),
+                "versions": [
+                    {
+                        "version": 1,
+                        "owner": _OWNERS[n % len(_OWNERS)],
+                        "processing_stage": "DONE",
+                        "file_name": f"molecules-{n}.sdf",
+                        "size": n * 1024,
+                        "published": _created(n),
+                        "projects": [_uuid("project", n % 7)],
+                    }
+                ],
+            }
+            for n in range(num_rows)
+        ]
+    }
+
+
+def _exchange_rates(num_rows: int) -> Dict[str, Any]:
+    return {
+        "exchange_rates": [
+            {
+                "collection": f"collection-{n % 10}",
+                "job": f"job-{n}",
+                "version": "1.0.0",
+                "rate": f"{n % 10}.5",
+            }
+            for n in range(num_rows)
+        ]
+    }
+
+
+def _instances(num_rows: int) -> Dict[str, Any]:
+    return {
+        "instances": [
+            {
+                "id": _uuid("instance", n),
+                "archived": n % 9 == 0,
+                "name": f"instance {n}",
+                "owner": _OWNERS[n % len(_OWNERS)],
+                "launched": _created(n),
+                "phase": _PHASES[n % len(_PHASES)],
+                "coins": f"{n % 100}.25",
+                "application_type": "JOB",
+                "application_id": "datamanagerjobs.squonk.it",
+                "job_job": f"job-{n % 20}",
+                "job_version": "1.0.0",
+                "job_image_type": "SIMPLE",
+            }
+            for n in range(num_rows)
+        ]
+    }
+
+
+def _tasks(num_rows: int) -> Dict[str, Any]:
+    return {
+        "tasks": [
+            {
+                "id": _uuid("task", n),
+                "created": _created(n),
+                "purpose": "INSTANCE",
+                "purpose_id": _uuid("instance", n // 3),
+                "purpose_version": 1,
+                "done": n % 4 != 0,
+                "exit_code": 0,
+                "removal": n % 11 == 0,
+            }
+            for n in range(num_rows)
+        ]
+    }
+
+
+def _merchants(num_rows: int) -> Dict[str, Any]:
+    return {
+        "merchants": [
+            {
+                "id": n,
+                "kind": "DATA_MANAGER",
+                "created": _created(n),
+                "api_hostname": f"dm-{n % 3}.example.com",
+                "name": f"merchant {n}",
+            }
+            for n in range(num_rows)
+        ]
+    }
+
+
+def _units(organisation: str, num_rows: int) -> Dict[str, Any]:
+    return {
+        "units": [
+            {
+                "organisation": {"name": organisation},
+                "units": [
+                    {
+                        "id": _uuid("unit", n),
+                        "name": f"unit {n}",
+                        "owner_id": _OWNERS[n % len(_OWNERS)],
+                        "created": _created(n),
+                        "private": n % 2 == 0,
+                    }
+                    for n in range(num_rows)
+                ],
+            }
+        ]
+    }
+
+
+def _products(num_rows: int) -> Dict[str, Any]:
+    return {
+        "products": [
+            {
+                "product": {
+                    "id": _uuid("product", n),
+                    "type": "DATA_MANAGER_PROJECT_TIER_SUBSCRIPTION",
+                    "flavour": "BRONZE",
+                    "name": f"product {n}",
+                },
+                "unit": {"name": f"unit {n % 50}"},
+                "claim": {"name": f"project {n}"},
+                "storage": {"size": {"current": f"{n % 100} MiB"}},
+                "coins": {
+                    "billing_day": n % 28 + 1,
+                    "remaining_days": n % 31,
+                    "current_burn_rate": f"{n % 10}.1",
+                    "used": f"{n % 1000}.5",
+                    "billing_prediction": f"{n % 2000}.75",
+                    "allowance": "1000",
+                    "limit": "2000",
+                },
+            }
+            for n in range(num_rows)
+        ]
+    }
+
+
+def _projects(num_rows: int) -> Dict[str, Any]:
+    return {
+        "projects": [
+            {
+                "project_id": _uuid("project", n),
+                "name": f"project {n}",
+                "owner": _OWNERS[n % len(_OWNERS)],
+                "size": n * 4096,
+            }
+            for n in range(num_rows)
+        ]
+    }
+
+
+def _service_errors(num_rows: int) -> Dict[str, Any]:
+    return {
+        "service_errors": [
+            {
+                "id": n,
+                "created": _created(n),
+                "severity": "ERROR" if n % 3 else "CRITICAL",
+                "summary": f"Something went wrong ({n % 10})",
+            }
+            for n in range(num_rows)
+        ]
+    }
+
+
+# Synthetic response messages for each topic, given the number of rows
+PAYLOADS: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "assets": _assets,
+    "datasets": _datasets,
+    "defined-exchange-rates": _exchange_rates,
+    "instances": _instances,
+    "tasks": _tasks,
+    "merchants": _merchants,
+    "products": _products,
+    "projects": _projects,
+    "personal-units": lambda num_rows: _units("Default", num_rows),
+    "service-errors": _service_errors,
+    "undefined-exchange-rates": _exchange_rates,
+    "units": lambda num_rows: _units("Informatics Matters", num_rows),
+}
+
+
+def _response(renderer: TopicRenderer, msg: Dict[str, Any]) -> Any:
+    """Returns a (successful) response for a topic, given its message."""
+    if renderer.api_host == "as":
+        return AsApiRv(success=True, msg=msg)
+    return DmApiRv(success=True, msg=msg)
+
+
+def _run(topic: str, msg: Dict[str, Any], console: Console) -> Dict[str, float]:
+    """Runs the topic's benchmark once (using a new renderer),
+    returning the time of each step.
+    """
+    renderer: TopicRenderer = renderer_class(topic)()
+    response: Any = _response(renderer, msg)
+    reverse_order: SortOrder = (
+        SortOrder.ASCENDING
+        if renderer.sort_order == SortOrder.DESCENDING
+        else SortOrder.DESCENDING
+    )
+
+    start: float = time.perf_counter()
+    renderer.rows.merge(renderer.extract_rows(response))
+    extracted: float = time.perf_counter()
+    renderer.rows.sort(renderer.sort_column, renderer.sort_order)
+    sorted_: float = time.perf_counter()
+    renderer.rows.sort(renderer.sort_column, reverse_order)
+    reversed_: float = time.perf_counter()
+    renderer.page_size = _PAGE_SIZE
+    console.print(renderer.render())
+    rendered: float = time.perf_counter()
+
+    return {
+        "extract_s": extracted - start,
+        "sort_s": sorted_ - extracted,
+        "reverse_s": reversed_ - sorted_,
+        "render_s": rendered - reversed_,
+    }
+
+
+def benchmark(topic: str, num_rows: int, repeat: int = 3) -> Dict[str, Any]:
+    """Benchmarks a topic with the given number of rows, returning the best
+    time of each step (from the given number of runs)
+    and the peak memory (bytes) used by one (separate) run.
+    The synthetic response is built beforehand, it's not part of the
+    time or memory measured.
+    """
+    console: Console = Console(file=io.StringIO(), width=200)
+    msg: Dict[str, Any] = PAYLOADS[topic](num_rows)
+    runs: List[Dict[str, float]] = [_run(topic, msg, console) for _ in range(repeat)]
+    result: Dict[str, Any] = {"topic": topic, "rows": num_rows}
+    for name in _TIMES:
+        result[name] = min(run[name] for run in runs)
+    # Memory is measured on its own (tracing slows everything down)
+    tracemalloc.start()
+    try:
+        _run(topic, msg, console)
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]]) -> str:
+    """Returns a report comparing results with those of a baseline,
+    the ratio of each measurement (new/baseline).
+    """
+    baseline_results: Dict[Any, Dict[str, Any]] = {
+        (result["topic"], result["rows"]): result for result in baseline
+    }
+    lines: List[str] = [
+        f"{'topic':<26}{'rows':>8}"
+        + "".join(f"{name:>12}" for name in _TIMES + ["peak_bytes"])
+    ]
+    for result in results:
+        old: Optional[Dict[str, Any]] = baseline_results.get(
+            (result["topic"], result["rows"])
+        )
+        if old is None:
+            continue
+        ratios: str = "".join(
+            f"{result[name] / old[name]:>11.2f}x" if old[name] else f"{'-':>12}"
+            for name in _TIMES + ["peak_bytes"]
+        )
+        lines.append(f"{result['topic']:<26}{result['rows']:>8}{ratios}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """The 'squad-bench' entry point."""
+    parser = argparse.ArgumentParser(
+        prog="squad-bench",
+        description="Benchmarks the SquAd topic renderers using synthetic responses",
+    )
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in _DEFAULT_SIZES),
+        help="A comma-separated list of the number of rows to benchmark",
+    )
+    parser.add_argument(
+        "--topics",
+        default=",".join(PAYLOADS),
+        help="A comma-separated list of the topics to benchmark",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="The number of times each benchmark is run (the best time is used)",
+    )
+    parser.add_argument(
+        "--output", "-o", help="The JSON file to write (otherwise stdout)"
+    )
+    parser.add_argument(
+        "--compare",
+        help="A JSON file (from an earlier run) to compare the results with",
+    )
+    args = parser.parse_args(argv)
+
+    topics: List[str] = args.topics.split(",")
+    for topic in topics:
+        if topic not in PAYLOADS:
+            print(f"Unknown topic: '{topic}'", file=sys.stderr)
+            return 1
+    sizes: List[int] = [int(size) for size in args.sizes.split(",")]
+
+    results: List[Dict[str, Any]] = []
+    for topic in topics:
+        for num_rows in sizes:
+            results.append(benchmark(topic, num_rows, max(args.repeat, 1)))
+            print(
+                f"{topic} {num_rows} rows"
+                f" {sum(results[-1][name] for name in _TIMES):.3f}s",
+                file=sys.stderr,
+            )
+    report: Dict[str, Any] = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as baseline_file:
+            baseline: Dict[str, Any] = json.load(baseline_file)
+        print(compare(results, baseline["results"]), file=sys.stderr)
+    return 0
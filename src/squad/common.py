@@ -1,6 +1,8 @@
 """Common material (constants etc.).
 """
+import sys
 from decimal import Decimal
+from typing import Optional
 
 from rich.style import Style
 from rich.text import Text
@@ -52,6 +54,8 @@ COIN_RESET_STYLE: Style = Style(color="orchid1")
 MSG_STYLE: Style = Style(color="cyan3")
 # style for indices/line-numbers
 INDEX_STYLE: Style = Style(color="grey50", italic=True)
+# style for the indices of rows that have recently changed
+CHANGED_INDEX_STYLE: Style = Style(color="black", bgcolor="yellow3", italic=True)
 # Merchants
 MERCHANT_ID_STYLE: Style = Style(color="dark_sea_green2")
 MERCHANT_NAME_STYLE: Style = Style(color="dark_sea_green2")
@@ -96,3 +100,23 @@ def remove_exponent(num: Decimal) -> Decimal:
     and 4.0 becomes 4.
     """
     return num.quantize(Decimal(1)) if num == num.to_integral() else num.normalize()
+
+
+def intern_string(value: str) -> str:
+    """Returns the interned copy of a string, so that strings repeated
+    in many rows (owners, phases etc.) are only kept once.
+    Values that are not strings (e.g. None) are returned as they are.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def format_latency(latency_s: Optional[float]) -> str:
+    """Returns a latency (seconds) as a short string, in milliseconds
+    (or seconds for latencies of a second or more).
+    """
+    if latency_s is None:
+        return "-"
+    if latency_s >= 1.0:
+        return f"{latency_s:.2f}s"
+    latency_ms: float = latency_s * 1000
+    return f"{latency_ms:.1f}ms" if latency_ms < 10 else f"{latency_ms:.0f}ms"
@@ -2,8 +2,12 @@
 """
 from typing import List, Optional
 
+from squonk2.as_api import AsApi
+from squonk2.dm_api import DmApi
 from squonk2.environment import Environment
 
+from squad.http_sessions import HttpSessions
+
 _ENVIRONMENT: Optional[Environment] = None
 
 
@@ -23,3 +27,26 @@ def get_environment() -> Environment:
     names: List[str] = Environment.load()
     assert names
     return Environment(names[0])
+
+
+def load_environment(name: Optional[str]) -> Environment:
+    """Loads the named environment (or the default if there's no name)
+    from the environments file, setting it (so others can use it)
+    and preparing the AS and DM APIs to use it. An exception (with a message)
+    is raised if the environment cannot be loaded.
+    """
+    names: List[str] = Environment.load()
+    if not names:
+        raise ValueError("no environments")
+    env: Environment = Environment(name or names[0])
+
+    # Set the environment (so others can use it)
+    set_environment(env)
+    # Set the API URLs for the AS and DM
+    # based on the environment we've just read.
+    if env.as_api():
+        AsApi.set_api_url(env.as_api(), verify_ssl_cert=False)
+    DmApi.set_api_url(env.dm_api(), verify_ssl_cert=False)
+    # Use pooled (keep-alive) connections for the AS, DM and Keycloak.
+    HttpSessions.install()
+    return env
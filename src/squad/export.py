@@ -0,0 +1,225 @@
+"""Headless export of SquAd topics (without starting the TUI).
+
+    squad export products projects --format csv --output ./exports
+
+Topics are fetched concurrently (although squonk2 makes the calls to each
+API one at a time) and each topic's rows, extracted by the
+topic's renderer, are written (as they're extracted) as CSV, JSON lines or
+Parquet. Parquet needs the (optional) 'pyarrow' package.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from decimal import Decimal
+from functools import partial
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Union
+
+from rich.text import Text
+from squonk2.as_api import AsApiRv
+from squonk2.dm_api import DmApiRv
+
+from squad import environment
+from squad.fetcher import Fetcher
+from squad.recordings import Recordings
+from squad.widgets.topics.base import StreamedRv, TopicRenderer
+from squad.widgets.topics.registry import TopicRegistry
+from squad.widgets.topics.row_store import Row
+
+# Supported formats and the file extension used for each
+_FORMATS: Dict[str, str] = {"csv": "csv", "jsonl": "jsonl", "parquet": "parquet"}
+
+
+def plain_value(value: Any) -> Any:
+    """Returns a value suitable for export. Rich Text becomes a plain string
+    and Decimals become strings (so they remain exact).
+    """
+    if isinstance(value, Text):
+        return value.plain
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def write_csv(column_names: List[str], rows: Iterator[Row], file: IO[str]) -> None:
+    """Writes rows as CSV (with a header)."""
+    writer = csv.writer(file)
+    writer.writerow(column_names)
+    for row in rows:
+        writer.writerow(["" if value is None else plain_value(value) for value in row])
+
+
+def write_jsonl(column_names: List[str], rows: Iterator[Row], file: IO[str]) -> None:
+    """Writes rows as JSON lines, one object (keyed by column name) for each row."""
+    for row in rows:
+        file.write(
+            json.dumps(
+                {name: plain_value(value) for name, value in zip(column_names, row)}
+            )
+        )
+        file.write("\n")
+
+
+def write_parquet(
+    column_names: List[str], rows: Iterator[Row], file: IO[bytes]
+) -> None:
+    """Writes rows as a Parquet table, using the (optional) pyarrow package."""
+    # pylint: disable=import-outside-toplevel
+    import pyarrow
+    from pyarrow import parquet
+
+    columns: List[List[Any]] = [[] for _ in column_names]
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value.plain if isinstance(value, Text) else value)
+    arrays: List[Any] = []
+    for column in columns:
+        try:
+            arrays.append(pyarrow.array(column))
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            # Mixed values, export them as strings
+            arrays.append(
+                pyarrow.array(
+                    [None if value is None else str(value) for value in column]
+                )
+            )
+    parquet.write_table(pyarrow.table(arrays, names=column_names), file)
+
+
+def get_final_response(
+    renderer: TopicRenderer,
+) -> Optional[Union[DmApiRv, AsApiRv, StreamedRv]]:
+    """Returns a topic's final (most complete) response. Only the final
+    request is sent, not those that precede it when a topic loads
+    its rows in stages (see TopicRenderer.get_responses()).
+    """
+    return renderer.get_response()
+
+
+def export_topic(
+    renderer: TopicRenderer,
+    response: Union[DmApiRv, AsApiRv, StreamedRv],
+    output_format: str,
+    path: Optional[str],
+) -> None:
+    """Writes a topic's rows (from its response) to a file (or stdout)."""
+    rows: Iterator[Row] = renderer.response_rows(response)
+    if output_format == "parquet":
+        if path:
+            with open(path, "wb") as binary_file:
+                write_parquet(renderer.column_names, rows, binary_file)
+        else:
+            write_parquet(renderer.column_names, rows, sys.stdout.buffer)
+        return
+    writer: Callable[[List[str], Iterator[Row], IO[str]], None] = (
+        write_csv if output_format == "csv" else write_jsonl
+    )
+    if path:
+        with open(path, "w", encoding="utf-8", newline="") as text_file:
+            writer(renderer.column_names, rows, text_file)
+    else:
+        writer(renderer.column_names, rows, sys.stdout)
+
+
+def main(argv: List[str]) -> int:
+    """The 'squad export' entry point, given the command-line arguments
+    that follow 'export'.
+    """
+    # Only the renderers of the topics we export are created
+    topic_renderers: TopicRegistry = TopicRegistry()
+    parser = argparse.ArgumentParser(
+        prog="squad export",
+        description="Exports SquAd topics (without starting the TUI)",
+    )
+    parser.add_argument(
+        "topics",
+        nargs="+",
+        metavar="topic",
+        help="The topics to export, one or more of: " + ", ".join(topic_renderers),
+    )
+    parser.add_argument(
+        "--format",
+        choices=list(_FORMATS),
+        default="csv",
+        help="The export format",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="The file to write (when exporting one topic) or the directory"
+        " to write files to (named after each topic). If not provided"
+        " the (single) topic is written to stdout.",
+    )
+    parser.add_argument(
+        "--environment",
+        "-e",
+        help="The environment name to use. If not provided"
+        " the default environment in the environments file is used.",
+    )
+    parser.add_argument(
+        "--stream",
+        help="Decode large DM responses (datasets, instances and tasks)"
+        " as they arrive, which uses less memory",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Export the responses recorded (by 'squad --record')"
+        " in a directory rather than use the network",
+    )
+    args = parser.parse_args(argv)
+
+    for topic in args.topics:
+        if topic not in topic_renderers:
+            print(f"Unknown topic: '{topic}'", file=sys.stderr)
+            return 1
+    if len(args.topics) > 1 and not args.output:
+        print(
+            "An --output directory is needed for more than one topic", file=sys.stderr
+        )
+        return 1
+    if args.format == "parquet":
+        try:
+            import pyarrow  # pylint: disable=import-outside-toplevel,unused-import
+        except ImportError:
+            print(
+                "Parquet export needs pyarrow ('pip install pyarrow')", file=sys.stderr
+            )
+            return 1
+
+    try:
+        environment.load_environment(args.environment)
+    except Exception as ex:  # pylint: disable=broad-except
+        print(f"Error loading environment: {ex}", file=sys.stderr)
+        return 1
+
+    if args.replay:
+        try:
+            Recordings.replay(args.replay)
+        except (OSError, ValueError) as ex:
+            print(f"Error using recordings: {ex}", file=sys.stderr)
+            return 1
+
+    TopicRenderer.stream_responses = args.stream
+
+    # Get all the topics (concurrently)...
+    renderers: List[TopicRenderer] = [topic_renderers[topic] for topic in args.topics]
+    responses: List[Any] = Fetcher.gather(
+        *[partial(get_final_response, renderer) for renderer in renderers]
+    )
+
+    # ...and write them
+    ret_val: int = 0
+    for topic, renderer, response in zip(args.topics, renderers, responses):
+        if not response or not response.success:
+            print(f"Failed to get '{topic}'", file=sys.stderr)
+            ret_val = 1
+            continue
+        path: Optional[str] = args.output
+        if path and len(args.topics) > 1:
+            os.makedirs(path, exist_ok=True)
+            path = os.path.join(path, f"{topic}.{_FORMATS[args.format]}")
+        export_topic(renderer, response, args.format, path)
+    return ret_val
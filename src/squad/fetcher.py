@@ -0,0 +1,257 @@
+"""A background fetch scheduler.
+
+Calls to the AS and DM APIs are made from worker threads so that
+widget rendering never has to wait for the network. Callers schedule a fetch
+(using a key, typically the name of a topic) and then simply
+read the latest result, which may be None if nothing has been fetched.
+Functions that deliver their results in stages (pages) can publish
+a Pages object before they finish, adding pages to it as they arrive.
+
+Calls to each API host (AS, DM and Keycloak) are made one at a time.
+The squonk2 AsApi, DmApi and Auth methods are synchronised (each class
+holds a lock while it makes a call), so more than one concurrent call to
+a host would only queue for that lock, holding a worker while it waits.
+Calls to different hosts are independent and can be made concurrently
+(see gather()), so the time they take is that of the slowest, not their sum.
+As Keycloak issues both the AS and DM tokens, getting them is not concurrent.
+
+Background (low priority) fetches, used to keep topics that are not being
+displayed up to date, are run by a single worker of their own
+and are limited by a (fetches per minute) budget.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# The number of worker threads used to call the APIs.
+_NUM_WORKERS: int = 4
+# The default background budget (fetches per minute)
+_DEFAULT_BACKGROUND_BUDGET: float = 30.0
+# The number of threads used to make concurrent calls (see gather())
+_NUM_GATHER_WORKERS: int = 4
+
+# A unit of work - a key and the function to call
+_Job = Tuple[str, Callable[[], Any]]
+
+
+class Pages:
+    """The responses (pages) of a fetch that delivers its results in stages.
+    Pages are appended by the worker thread as they arrive
+    and 'complete' is set once they all have.
+    """
+
+    def __init__(self, expected: int) -> None:
+        # The number of pages we expect
+        self.expected: int = expected
+        self.responses: List[Any] = []
+        self.complete: bool = False
+        # The time (seconds) it took to get all the pages
+        self.elapsed_s: float = 0.0
+
+    def append(self, response: Any) -> None:
+        """Adds a page."""
+        self.responses.append(response)
+
+
+class Fetcher:
+    """Runs API calls in background (daemon) worker threads,
+    remembering the latest result for each key.
+    """
+
+    # Work waiting for a worker
+    _queue: "queue.Queue[_Job]" = queue.Queue()
+    _workers: List[threading.Thread] = []
+    # Background work waiting for the background worker
+    _background_queue: "queue.Queue[_Job]" = queue.Queue()
+    # The background budget (fetches per minute), the fetches that remain
+    # and when we last topped them up.
+    _background_budget: float = _DEFAULT_BACKGROUND_BUDGET
+    _background_allowance: float = _DEFAULT_BACKGROUND_BUDGET
+    _background_time: float = time.monotonic()
+    # Locks serialising the calls to each host, indexed by host
+    _host_locks: Dict[str, threading.Lock] = {}
+    # The pool used by gather()
+    _executor: Optional[ThreadPoolExecutor] = None
+    # A lock protecting the following
+    _lock: threading.Lock = threading.Lock()
+    # Keys whose fetch is queued or running
+    _in_flight: Set[str] = set()
+    # The latest result for each key
+    _results: Dict[str, Any] = {}
+    # The number of fetches that have finished for each key
+    _generations: Dict[str, int] = {}
+    # The time each key's most recent fetch was started
+    _request_times: Dict[str, datetime] = {}
+
+    @classmethod
+    def schedule(
+        cls,
+        key: str,
+        function: Callable[[], Any],
+        *,
+        interval: timedelta,
+        background: bool = False,
+        host: Optional[str] = None,
+    ) -> None:
+        """Schedules a call to the given function unless one is already
+        in progress for the key, or the last one was started less than 'interval'
+        ago. The function is called from a worker thread and its result
+        replaces any prior result for the key. Background calls are
+        only made if they're within the background budget. If the function
+        calls an API 'host' ("as" or "dm") the call waits for the host's slot.
+        """
+        now: datetime = datetime.now()
+        with cls._lock:
+            if key in cls._in_flight:
+                return
+            last_request_time: Optional[datetime] = cls._request_times.get(key)
+            if last_request_time is not None and now - last_request_time <= interval:
+                return
+            if background and not cls._spend_background_allowance():
+                return
+            cls._in_flight.add(key)
+            cls._request_times[key] = now
+            cls._start_workers()
+        if host:
+            function = partial(cls._call_host, host, function)
+        if background:
+            cls._background_queue.put((key, function))
+        else:
+            cls._queue.put((key, function))
+
+    @classmethod
+    def gather(cls, *functions: Callable[[], Any]) -> List[Any]:
+        """Calls independent functions concurrently, waiting for them all
+        and returning their results (in order). The result of any function
+        that raises an exception is None.
+        """
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=_NUM_GATHER_WORKERS, thread_name_prefix="squad-gather"
+                )
+            executor: ThreadPoolExecutor = cls._executor
+        futures = [executor.submit(function) for function in functions]
+        results: List[Any] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception:  # pylint: disable=broad-except
+                results.append(None)
+        return results
+
+    @classmethod
+    @contextmanager
+    def host_slot(cls, host: str) -> Iterator[None]:
+        """A context manager that waits for (and then holds) the host's slot,
+        so that calls to the host are made one at a time.
+        """
+        with cls._lock:
+            host_lock: threading.Lock = cls._host_locks.setdefault(
+                host, threading.Lock()
+            )
+        with host_lock:
+            yield
+
+    @classmethod
+    def _call_host(cls, host: str, function: Callable[[], Any]) -> Any:
+        """Calls a function while holding the host's slot."""
+        with cls.host_slot(host):
+            return function()
+
+    @classmethod
+    def set_background_budget(cls, fetches_per_minute: float) -> None:
+        """Sets the maximum rate of background fetches."""
+        with cls._lock:
+            cls._background_budget = fetches_per_minute
+            cls._background_allowance = min(
+                cls._background_allowance, fetches_per_minute
+            )
+
+    @classmethod
+    def get(cls, key: str) -> Any:
+        """Returns the latest result for the key (or None)."""
+        return cls._results.get(key)
+
+    @classmethod
+    def publish(cls, key: str, result: Any) -> None:
+        """Sets the result for a key before its fetch has finished.
+        Called by (worker) functions that deliver their results in stages.
+        """
+        with cls._lock:
+            cls._results[key] = result
+
+    @classmethod
+    def generation(cls, key: str) -> int:
+        """Returns the number of fetches that have finished for the key.
+        A change in the generation (with a result of None) means a fetch has failed.
+        """
+        return cls._generations.get(key, 0)
+
+    @classmethod
+    def busy(cls, key: str) -> bool:
+        """True if a fetch for the key is queued or running."""
+        return key in cls._in_flight
+
+    @classmethod
+    def _spend_background_allowance(cls) -> bool:
+        """Takes one fetch from the background allowance, returning False
+        if there's nothing left. The allowance is topped up continuously
+        (at the budget rate) but never exceeds one minute's worth.
+        Expected to be called while holding the lock.
+        """
+        now: float = time.monotonic()
+        cls._background_allowance = min(
+            cls._background_allowance
+            + (now - cls._background_time) * cls._background_budget / 60.0,
+            cls._background_budget,
+        )
+        cls._background_time = now
+        if cls._background_allowance < 1.0:
+            return False
+        cls._background_allowance -= 1.0
+        return True
+
+    @classmethod
+    def _start_workers(cls) -> None:
+        """Starts the worker threads (if they're not running).
+        Expected to be called while holding the lock.
+        """
+        if cls._workers:
+            return
+        for worker_number in range(_NUM_WORKERS):
+            worker = threading.Thread(
+                target=cls._work,
+                args=(cls._queue,),
+                name=f"squad-fetch-{worker_number}",
+                daemon=True,
+            )
+            worker.start()
+            cls._workers.append(worker)
+        worker = threading.Thread(
+            target=cls._work,
+            args=(cls._background_queue,),
+            name="squad-fetch-background",
+            daemon=True,
+        )
+        worker.start()
+        cls._workers.append(worker)
+
+    @classmethod
+    def _work(cls, work_queue: "queue.Queue[_Job]") -> None:
+        """The worker thread body, calling functions (from the given queue) forever."""
+        while True:
+            key, function = work_queue.get()
+            try:
+                result: Any = function()
+            except Exception:  # pylint: disable=broad-except
+                result = None
+            with cls._lock:
+                cls._results[key] = result
+                cls._generations[key] = cls._generations.get(key, 0) + 1
+                cls._in_flight.discard(key)
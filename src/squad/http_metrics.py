@@ -0,0 +1,222 @@
+"""Latency, error and payload metrics for each AS, DM and Keycloak endpoint.
+
+Every request sent through our HTTP sessions is recorded here
+(see HttpSessions.request()). Latencies are kept in fixed-size histograms
+with logarithmic buckets, so the memory used does not grow with the
+number of requests. Each endpoint has a histogram for the current period
+and one for the previous period, the percentiles are of both
+(i.e. of the last five to ten minutes). Request, error and byte counts
+are kept from the start.
+
+An endpoint is a method, host and path, where path segments that look like
+identifiers (e.g. a project's UUID) are replaced by '{id}'.
+"""
+import math
+import re
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+# The histogram buckets. The first bucket holds latencies below the minimum,
+# each bucket after that is about 19% wider than the one before
+# and the last holds everything above the maximum.
+_MIN_LATENCY_S: float = 0.000_1
+_MAX_LATENCY_S: float = 100.0
+_BUCKET_RATIO: float = 2**0.25
+_NUM_BUCKETS: int = (
+    math.ceil(math.log(_MAX_LATENCY_S / _MIN_LATENCY_S, _BUCKET_RATIO)) + 2
+)
+# The length (seconds) of each histogram period
+_PERIOD_S: float = 300.0
+# Path segments that are identifiers
+# (anything with a digit in it that's not a version, like 'v1')
+_ID_SEGMENT: re.Pattern[str] = re.compile(r"^(?!v\d+$).*\d")
+
+
+class LatencyHistogram:
+    """A fixed-size histogram of latencies (seconds)."""
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * _NUM_BUCKETS
+        self.total: int = 0
+
+    @staticmethod
+    def bucket(latency_s: float) -> int:
+        """Returns the bucket a latency belongs in."""
+        if latency_s < _MIN_LATENCY_S:
+            return 0
+        index: int = int(math.log(latency_s / _MIN_LATENCY_S, _BUCKET_RATIO)) + 1
+        return min(index, _NUM_BUCKETS - 1)
+
+    @staticmethod
+    def bucket_latency(index: int) -> float:
+        """Returns the latency that represents a bucket
+        (the geometric middle of its range).
+        """
+        if index == 0:
+            return _MIN_LATENCY_S
+        return _MIN_LATENCY_S * math.pow(_BUCKET_RATIO, index - 0.5)
+
+    def add(self, latency_s: float) -> None:
+        """Adds a latency to the histogram."""
+        self.counts[self.bucket(latency_s)] += 1
+        self.total += 1
+
+    def clear(self) -> None:
+        """Removes all the latencies."""
+        self.counts = [0] * _NUM_BUCKETS
+        self.total = 0
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Adds the latencies of another histogram to this one."""
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.total += other.total
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Returns the latency below which the given fraction (0..1)
+        of the latencies fall, or None if there are none.
+        """
+        if not self.total:
+            return None
+        rank: float = max(fraction * self.total, 1)
+        cumulative: int = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return self.bucket_latency(index)
+        return self.bucket_latency(_NUM_BUCKETS - 1)
+
+
+class EndpointSummary(NamedTuple):
+    """The metrics of an endpoint (or of all the endpoints of a host).
+    Latencies are in seconds (None if there are none).
+    """
+
+    endpoint: str
+    requests: int
+    errors: int
+    p50_s: Optional[float]
+    p95_s: Optional[float]
+    p99_s: Optional[float]
+    total_bytes: int
+
+
+class _EndpointMetrics:
+    """The metrics of an endpoint."""
+
+    def __init__(self, hostname: str, period_start: float) -> None:
+        self.hostname: str = hostname
+        self.latencies: LatencyHistogram = LatencyHistogram()
+        self.previous_latencies: LatencyHistogram = LatencyHistogram()
+        self.period_start: float = period_start
+        self.requests: int = 0
+        self.errors: int = 0
+        self.total_bytes: int = 0
+
+    def rotate(self, now: float) -> None:
+        """Starts a new period (if the current one has ended)."""
+        if now - self.period_start < _PERIOD_S:
+            return
+        if now - self.period_start < 2 * _PERIOD_S:
+            self.latencies, self.previous_latencies = (
+                self.previous_latencies,
+                self.latencies,
+            )
+        else:
+            # Nothing has happened for at least a period
+            self.previous_latencies.clear()
+        self.latencies.clear()
+        self.period_start = now
+
+
+def endpoint_name(method: str, url: str) -> str:
+    """Returns the name of the endpoint a request is sent to."""
+    parsed = urlparse(url)
+    path: str = "/".join(
+        "{id}" if _ID_SEGMENT.match(segment) else segment
+        for segment in parsed.path.split("/")
+    )
+    return f"{method.upper()} {parsed.hostname or ''}{path}"
+
+
+class HttpMetrics:
+    """The metrics of every endpoint."""
+
+    # A lock protecting the following
+    _lock: threading.Lock = threading.Lock()
+    # Metrics, indexed by endpoint name
+    _endpoints: Dict[str, _EndpointMetrics] = {}
+
+    @classmethod
+    def record(
+        cls,
+        method: str,
+        url: str,
+        latency_s: float,
+        *,
+        error: bool = False,
+        size: int = 0,
+    ) -> None:
+        """Records a request, the time it took, whether it failed
+        (an exception or an error status) and the size (bytes) of its response.
+        """
+        name: str = endpoint_name(method, url)
+        now: float = time.monotonic()
+        with cls._lock:
+            metrics: Optional[_EndpointMetrics] = cls._endpoints.get(name)
+            if metrics is None:
+                metrics = _EndpointMetrics(urlparse(url).hostname or "", now)
+                cls._endpoints[name] = metrics
+            metrics.rotate(now)
+            metrics.latencies.add(latency_s)
+            metrics.requests += 1
+            metrics.errors += int(error)
+            metrics.total_bytes += size
+
+    @classmethod
+    def get_summaries(cls) -> List[EndpointSummary]:
+        """Returns the metrics of each endpoint."""
+        now: float = time.monotonic()
+        with cls._lock:
+            summaries: List[EndpointSummary] = []
+            for name, metrics in cls._endpoints.items():
+                metrics.rotate(now)
+                summaries.append(cls._summary(name, [metrics]))
+            return summaries
+
+    @classmethod
+    def get_host_summary(cls, hostname: str) -> EndpointSummary:
+        """Returns the combined metrics of a host's endpoints."""
+        now: float = time.monotonic()
+        with cls._lock:
+            host_metrics: List[_EndpointMetrics] = []
+            for metrics in cls._endpoints.values():
+                if metrics.hostname == hostname:
+                    metrics.rotate(now)
+                    host_metrics.append(metrics)
+            return cls._summary(hostname, host_metrics)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forgets all the metrics."""
+        with cls._lock:
+            cls._endpoints = {}
+
+    @staticmethod
+    def _summary(name: str, endpoints: List[_EndpointMetrics]) -> EndpointSummary:
+        """Returns the summary of one or more endpoints' metrics."""
+        latencies: LatencyHistogram = LatencyHistogram()
+        for metrics in endpoints:
+            latencies.merge(metrics.latencies)
+            latencies.merge(metrics.previous_latencies)
+        return EndpointSummary(
+            endpoint=name,
+            requests=sum(metrics.requests for metrics in endpoints),
+            errors=sum(metrics.errors for metrics in endpoints),
+            p50_s=latencies.quantile(0.5),
+            p95_s=latencies.quantile(0.95),
+            p99_s=latencies.quantile(0.99),
+            total_bytes=sum(metrics.total_bytes for metrics in endpoints),
+        )
@@ -0,0 +1,201 @@
+"""Pooled (keep-alive) HTTP sessions for the squonk2 clients.
+
+The squonk2 AsApi, DmApi and Auth classes use the module-level 'requests'
+functions, which open a new connection (and TLS handshake) for every call.
+We replace the 'requests' module they use with one that sends requests
+through a pooled session for each host, so connections are re-used.
+A session that has been idle for a while is closed (and replaced),
+rather than risk using connections the server may have dropped.
+Responses can also be recorded, or replayed, here (see recordings.py)
+and the latency of every request is measured (see http_metrics.py).
+"""
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, NamedTuple, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from squonk2 import as_api, auth, dm_api
+
+from squad.http_metrics import HttpMetrics
+from squad.recordings import Recordings
+
+# The default size of each host's connection pool
+_DEFAULT_POOL_SIZE: int = 4
+# The time (seconds) after which an idle session is closed
+_IDLE_TIMEOUT_S: float = 60.0
+
+
+class HttpStats(NamedTuple):
+    """HTTP session statistics (for all hosts)."""
+
+    requests: int
+    connections: int
+    idle_closures: int
+
+
+class HttpSessions:
+    """Pooled HTTP sessions, one for each host."""
+
+    # A lock protecting the following
+    _lock: threading.Lock = threading.Lock()
+    # Connection pool sizes, indexed by hostname
+    _pool_sizes: Dict[str, int] = {}
+    # Sessions and the time each was last used, indexed by hostname
+    _sessions: Dict[str, requests.Session] = {}
+    _last_used: Dict[str, float] = {}
+    # Statistics
+    _num_requests: int = 0
+    _num_closed_connections: int = 0
+    _num_idle_closures: int = 0
+
+    @classmethod
+    def install(cls, pool_sizes: Optional[Dict[str, int]] = None) -> None:
+        """Routes the requests of the squonk2 clients through our sessions,
+        given optional connection pool sizes (indexed by hostname).
+        """
+        cls._pool_sizes = pool_sizes or {}
+        shim: _RequestsShim = _RequestsShim()
+        for module in (as_api, dm_api, auth):
+            setattr(module, "requests", shim)
+
+    @classmethod
+    def request(cls, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Sends a request using the session for the URL's host.
+        Responses are recorded, or replayed, if Recordings has been told to,
+        and the metrics of every request are kept (see HttpMetrics).
+        """
+        start_time: float = time.monotonic()
+        try:
+            if Recordings.is_replaying():
+                with cls._lock:
+                    cls._num_requests += 1
+                response: requests.Response = Recordings.get_response(
+                    method, url, kwargs.get("params")
+                )
+            else:
+                response = cls._get_session(url).request(method, url, **kwargs)
+                if Recordings.is_recording():
+                    Recordings.save(
+                        method, url, kwargs.get("params"), response, start_time
+                    )
+        except requests.RequestException:
+            HttpMetrics.record(method, url, time.monotonic() - start_time, error=True)
+            raise
+        HttpMetrics.record(
+            method,
+            url,
+            time.monotonic() - start_time,
+            error=response.status_code >= 400,
+            size=_response_size(response, kwargs.get("stream", False)),
+        )
+        return response
+
+    @classmethod
+    def get_stats(cls) -> HttpStats:
+        """Returns the number of requests sent and connections opened."""
+        with cls._lock:
+            connections: int = cls._num_closed_connections + sum(
+                _count_connections(session) for session in cls._sessions.values()
+            )
+            return HttpStats(
+                requests=cls._num_requests,
+                connections=connections,
+                idle_closures=cls._num_idle_closures,
+            )
+
+    @classmethod
+    def close(cls) -> None:
+        """Closes all the sessions."""
+        with cls._lock:
+            for hostname in list(cls._sessions):
+                cls._close_session(hostname)
+
+    @classmethod
+    def _get_session(cls, url: str) -> requests.Session:
+        """Returns the session for the URL's host, creating one if there's
+        no session or the existing one has been idle for too long.
+        """
+        hostname: str = urlparse(url).netloc
+        now: float = time.monotonic()
+        with cls._lock:
+            cls._num_requests += 1
+            if (
+                hostname in cls._sessions
+                and now - cls._last_used[hostname] > _IDLE_TIMEOUT_S
+            ):
+                cls._close_session(hostname)
+                cls._num_idle_closures += 1
+            if hostname not in cls._sessions:
+                pool_size: int = cls._pool_sizes.get(
+                    urlparse(url).hostname or hostname, _DEFAULT_POOL_SIZE
+                )
+                adapter: HTTPAdapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=pool_size
+                )
+                session: requests.Session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                cls._sessions[hostname] = session
+            cls._last_used[hostname] = now
+            return cls._sessions[hostname]
+
+    @classmethod
+    def _close_session(cls, hostname: str) -> None:
+        """Closes a host's session.
+        Expected to be called while holding the lock.
+        """
+        session: requests.Session = cls._sessions.pop(hostname)
+        cls._num_closed_connections += _count_connections(session)
+        session.close()
+
+
+def _count_connections(session: requests.Session) -> int:
+    """Returns the number of connections a session has opened."""
+    connections: int = 0
+    # One adapter may be mounted for more than one prefix (http and https)
+    adapters: Dict[int, Any] = {
+        id(adapter): adapter for adapter in session.adapters.values()
+    }
+    for adapter in adapters.values():
+        if isinstance(adapter, HTTPAdapter):
+            pools: Any = adapter.poolmanager.pools
+            connections += sum(pools[key].num_connections for key in pools.keys())
+    return connections
+
+
+def _response_size(response: requests.Response, stream: bool) -> int:
+    """Returns the size (bytes) of a response's body. The body of a streamed
+    response has yet to be read, so we rely on its Content-Length header.
+    """
+    if not stream or Recordings.is_replaying():
+        return len(response.content or b"")
+    try:
+        return int(response.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+class _RequestsShim(ModuleType):
+    """Stands in for the 'requests' module used by the squonk2 clients.
+    Requests are sent using our sessions, everything else
+    comes from the real module.
+    """
+
+    def __init__(self) -> None:
+        super().__init__("requests")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(requests, name)
+
+    @staticmethod
+    def request(method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Sends a request (like requests.request())."""
+        return HttpSessions.request(method, url, **kwargs)
+
+    @staticmethod
+    def post(url: str, **kwargs: Any) -> requests.Response:
+        """Sends a POST request (like requests.post())."""
+        return HttpSessions.request("POST", url, **kwargs)
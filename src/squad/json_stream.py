@@ -0,0 +1,99 @@
+"""Incremental (streaming) decoding of large JSON responses.
+
+DM list responses are objects with one large array of records,
+e.g. '{"count": 2, "tasks": [{...}, {...}]}'. Rather than decode the whole
+response (and hold it, and the object tree it produces, in memory)
+iter_array() yields the records of the array one at a time,
+as the response body arrives. Only the record being decoded
+(and the unconsumed part of the current chunk) is held.
+"""
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional
+
+_DECODER: json.JSONDecoder = json.JSONDecoder()
+_WHITESPACE: str = " \t\n\r"
+
+
+class _Buffer:
+    """Text decoded from a stream of byte chunks, read from the front."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._decoder: Any = codecs.getincrementaldecoder("utf-8")()
+        self.text: str = ""
+        self.exhausted: bool = False
+
+    def read_more(self) -> bool:
+        """Adds the next chunk to the text, returning False if there are none."""
+        if self.exhausted:
+            return False
+        chunk: Optional[bytes] = next(self._chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            self.text += self._decoder.decode(b"", final=True)
+            return False
+        self.text += self._decoder.decode(chunk)
+        return True
+
+    def next_char(self) -> str:
+        """Skips whitespace, returning the next character (without consuming it)
+        or an empty string at the end of the stream.
+        """
+        while True:
+            self.text = self.text.lstrip(_WHITESPACE)
+            if self.text:
+                return self.text[0]
+            if not self.read_more():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consumes the expected (next non-whitespace) character."""
+        if self.next_char() != char:
+            raise ValueError(f"Expected '{char}' in JSON stream")
+        self.text = self.text[1:]
+
+    def decode(self) -> Any:
+        """Decodes (and consumes) the next JSON value. A value is only
+        accepted if something follows it (or the stream has ended)
+        so that values like numbers are not cut short at the end of a chunk.
+        """
+        self.next_char()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text)
+                if end < len(self.text) or self.exhausted:
+                    self.text = self.text[end:]
+                    return value
+            except json.JSONDecodeError:
+                if self.exhausted:
+                    raise
+            if not self.read_more() and not self.text:
+                raise ValueError("Unexpected end of JSON stream")
+
+
+def iter_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """Yields the items of the array that is the value of 'key'
+    in a JSON object, given the object as a stream of byte chunks.
+    Other values in the object are decoded (and ignored).
+    A ValueError is raised if the JSON is malformed or the key is missing.
+    """
+    buffer: _Buffer = _Buffer(chunks)
+    buffer.expect("{")
+    while buffer.next_char() != "}":
+        name: Any = buffer.decode()
+        buffer.expect(":")
+        if name == key and buffer.next_char() == "[":
+            buffer.expect("[")
+            while buffer.next_char() != "]":
+                yield buffer.decode()
+                if buffer.next_char() == ",":
+                    buffer.expect(",")
+            return
+        # Not the array we want
+        buffer.decode()
+        if buffer.next_char() == ",":
+            buffer.expect(",")
+        elif buffer.next_char() == "":
+            break
+    raise ValueError(f"No '{key}' array in JSON stream")
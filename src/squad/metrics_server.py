@@ -0,0 +1,384 @@
+"""Serves SquAd's topics as OpenMetrics (Prometheus) gauges.
+
+    squad metrics-server --port 9105 products projects datasets instances
+
+Topics are fetched on their usual schedule (through the Fetcher, as they are
+in the TUI) and each topic's gauges are updated when its rows change.
+Only the rows that have changed (or gone) are looked at, their contribution
+to each gauge is removed and the new one added. The text of each topic's
+gauges is kept, so a scrape (GET /metrics) is answered from memory
+and never calls an API.
+"""
+import argparse
+import sys
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple, Union
+
+from squad import environment
+from squad.http_metrics import HttpMetrics
+from squad.widgets.topics.base import TopicRenderer
+from squad.widgets.topics.registry import TopicRegistry
+from squad.widgets.topics.row_store import Row, RowStore
+
+# The default topics served
+_DEFAULT_TOPICS: List[str] = ["products", "projects", "datasets", "instances"]
+# The period (seconds) between checking the topics for new responses
+_POLL_PERIOD_S: float = 1.0
+# The content type of our responses
+_CONTENT_TYPE: str = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# A gauge's labels (names and values)
+Labels = Tuple[Tuple[str, str], ...]
+# A row's contribution to a gauge, the gauge, its labels and the value
+Sample = Tuple[str, Labels, Union[int, Decimal]]
+
+# The description of each gauge
+_GAUGES: Dict[str, str] = {
+    "squad_product_coins_burn_rate": "A product's current coin burn rate",
+    "squad_product_coins_used": "The coins a product has used (this billing period)",
+    "squad_product_coins_prediction": "The coins a product is predicted to use",
+    "squad_product_coins_allowance": "A product's coin allowance",
+    "squad_product_coins_limit": "A product's coin limit",
+    "squad_projects": "The number of projects",
+    "squad_projects_size_bytes": "The total size of the projects",
+    "squad_dataset_versions": "The number of dataset versions",
+    "squad_datasets_size_bytes": "The total size of the dataset versions",
+    "squad_instances": "The number of instances, by phase",
+    "squad_instances_coins": "The coins used by instances, by phase",
+}
+
+
+def _product_samples(row: Row) -> Iterator[Sample]:
+    """The gauges of a product."""
+    labels: Labels = (
+        ("product", row[0]),
+        ("name", row[4]),
+        ("unit", row[3]),
+        ("flavour", row[2]),
+    )
+    yield "squad_product_coins_burn_rate", labels, row[9]
+    yield "squad_product_coins_used", labels, row[10]
+    yield "squad_product_coins_prediction", labels, row[11]
+    yield "squad_product_coins_allowance", labels, row[12]
+    yield "squad_product_coins_limit", labels, row[13]
+
+
+def _project_samples(row: Row) -> Iterator[Sample]:
+    """A project's contribution to the project gauges."""
+    yield "squad_projects", (), 1
+    yield "squad_projects_size_bytes", (), row[3]
+
+
+def _dataset_samples(row: Row) -> Iterator[Sample]:
+    """A dataset version's contribution to the dataset gauges."""
+    yield "squad_dataset_versions", (), 1
+    yield "squad_datasets_size_bytes", (), row[5]
+
+
+def _instance_samples(row: Row) -> Iterator[Sample]:
+    """An instance's contribution to the instance gauges."""
+    labels: Labels = (("phase", row[5]),)
+    yield "squad_instances", labels, 1
+    yield "squad_instances_coins", labels, row[6]
+
+
+# The function that returns a row's samples, for each topic that has gauges
+# (other topics just have their number of rows)
+SAMPLES: Dict[str, Callable[[Row], Iterator[Sample]]] = {
+    "products": _product_samples,
+    "projects": _project_samples,
+    "datasets": _dataset_samples,
+    "instances": _instance_samples,
+}
+
+
+def _escape(value: str) -> str:
+    """Escapes a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_sample(name: str, labels: Labels, value: Union[int, float, Decimal]) -> str:
+    """Returns a sample as a line of OpenMetrics text."""
+    if labels:
+        label_text: str = ",".join(
+            f'{label}="{_escape(str(label_value))}"' for label, label_value in labels
+        )
+        return f"{name}{{{label_text}}} {value}"
+    return f"{name} {value}"
+
+
+class TopicGauges:
+    """A topic's gauges, updated with the rows that change."""
+
+    def __init__(self, topic: str) -> None:
+        self.topic: str = topic
+        self.samples: Optional[Callable[[Row], Iterator[Sample]]] = SAMPLES.get(topic)
+        # The rows we've seen (indexed by key) and their samples
+        self._rows: Dict[Hashable, Row] = {}
+        self._row_samples: Dict[Hashable, List[Sample]] = {}
+        # The value of each gauge (and the number of rows that contribute to it)
+        self._values: Dict[Tuple[str, Labels], Union[int, Decimal]] = {}
+        self._contributors: Dict[Tuple[str, Labels], int] = {}
+        # The row store (and its version) we last saw
+        self._seen: Optional[Tuple[RowStore, int]] = None
+        # The gauges as OpenMetrics text
+        self.text: str = ""
+
+    def update(self, rows: RowStore) -> bool:
+        """Updates the gauges with the rows that have changed (if any),
+        returning True if they have.
+        """
+        if self._seen == (rows, rows.version):
+            return False
+        self._seen = (rows, rows.version)
+        if self.samples is None:
+            return True
+        current: Dict[Hashable, Row] = {rows.key(row): row for row in rows.rows}
+        for key in [key for key in self._rows if key not in current]:
+            self._remove(key)
+        for key, row in current.items():
+            previous: Optional[Row] = self._rows.get(key)
+            if previous is row or previous == row:
+                continue
+            if previous is not None:
+                self._remove(key)
+            self._add(key, row)
+        self.text = self._format()
+        return True
+
+    def _add(self, key: Hashable, row: Row) -> None:
+        """Adds a row's samples to the gauges."""
+        assert self.samples
+        samples: List[Sample] = list(self.samples(row))
+        self._rows[key] = row
+        self._row_samples[key] = samples
+        for name, labels, value in samples:
+            self._values[(name, labels)] = self._values.get((name, labels), 0) + value
+            self._contributors[(name, labels)] = (
+                self._contributors.get((name, labels), 0) + 1
+            )
+
+    def _remove(self, key: Hashable) -> None:
+        """Removes a row's samples from the gauges."""
+        del self._rows[key]
+        for name, labels, value in self._row_samples.pop(key):
+            self._contributors[(name, labels)] -= 1
+            if self._contributors[(name, labels)]:
+                self._values[(name, labels)] -= value
+            else:
+                del self._contributors[(name, labels)]
+                del self._values[(name, labels)]
+
+    def _format(self) -> str:
+        """Returns the gauges as OpenMetrics text."""
+        lines: List[str] = []
+        gauges: Dict[str, List[str]] = {}
+        for (name, labels), value in self._values.items():
+            gauges.setdefault(name, []).append(format_sample(name, labels, value))
+        for name in sorted(gauges):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"# HELP {name} {_GAUGES.get(name, name)}")
+            lines.extend(sorted(gauges[name]))
+        return "".join(f"{line}\n" for line in lines)
+
+
+class MetricsStore:
+    """The (latest) gauges of each topic, read by the HTTP server."""
+
+    # A lock protecting the following
+    _lock: threading.Lock = threading.Lock()
+    # The gauges of each topic, indexed by topic
+    _gauges: Dict[str, TopicGauges] = {}
+    # The number of rows of each topic and whether they're up to date
+    # (not from a snapshot or a failed fetch), indexed by topic
+    _rows: Dict[str, int] = {}
+    _up: Dict[str, bool] = {}
+
+    @classmethod
+    def update(cls, topic: str, renderer: TopicRenderer) -> None:
+        """Updates a topic's gauges (if its rows have changed)."""
+        with cls._lock:
+            gauges: TopicGauges = cls._gauges.setdefault(topic, TopicGauges(topic))
+            gauges.update(renderer.rows)
+            cls._rows[topic] = len(renderer.rows)
+            cls._up[topic] = renderer.rows_loaded and renderer.snapshot_time is None
+
+    @classmethod
+    def exposition(cls) -> str:
+        """Returns all the gauges as OpenMetrics text."""
+        lines: List[str] = [
+            "# TYPE squad_topic_up gauge",
+            "# HELP squad_topic_up Whether a topic's rows are up to date",
+        ]
+        with cls._lock:
+            lines.extend(
+                format_sample("squad_topic_up", (("topic", topic),), int(up))
+                for topic, up in cls._up.items()
+            )
+            lines.append("# TYPE squad_topic_rows gauge")
+            lines.append("# HELP squad_topic_rows The number of rows in a topic")
+            lines.extend(
+                format_sample("squad_topic_rows", (("topic", topic),), num_rows)
+                for topic, num_rows in cls._rows.items()
+            )
+            topic_text: str = "".join(gauges.text for gauges in cls._gauges.values())
+        requests: List[str] = [
+            "# TYPE squad_http_requests gauge",
+            "# HELP squad_http_requests Requests sent to an endpoint",
+        ]
+        errors: List[str] = [
+            "# TYPE squad_http_errors gauge",
+            "# HELP squad_http_errors Requests to an endpoint that failed",
+        ]
+        latencies: List[str] = [
+            "# TYPE squad_http_latency_seconds gauge",
+            "# HELP squad_http_latency_seconds An endpoint's recent latency",
+        ]
+        for summary in HttpMetrics.get_summaries():
+            labels: Labels = (("endpoint", summary.endpoint),)
+            requests.append(
+                format_sample("squad_http_requests", labels, summary.requests)
+            )
+            errors.append(format_sample("squad_http_errors", labels, summary.errors))
+            for quantile, latency_s in (
+                ("0.5", summary.p50_s),
+                ("0.95", summary.p95_s),
+                ("0.99", summary.p99_s),
+            ):
+                if latency_s is not None:
+                    latencies.append(
+                        format_sample(
+                            "squad_http_latency_seconds",
+                            labels + (("quantile", quantile),),
+                            round(latency_s, 6),
+                        )
+                    )
+        lines.extend(requests + errors + latencies)
+        return "".join(f"{line}\n" for line in lines) + topic_text + "# EOF\n"
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forgets all the gauges."""
+        with cls._lock:
+            cls._gauges = {}
+            cls._rows = {}
+            cls._up = {}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Answers scrapes (GET /metrics) from the MetricsStore."""
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Handles a GET request."""
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body: bytes = MetricsStore.exposition().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", _CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:  # pylint: disable=arguments-differ
+        """Scrapes are not logged."""
+
+
+def serve(address: Tuple[str, int]) -> ThreadingHTTPServer:
+    """Starts serving the metrics (in a daemon thread), returning the server."""
+    server: ThreadingHTTPServer = ThreadingHTTPServer(address, _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: List[str]) -> int:
+    """The 'squad metrics-server' entry point, given the command-line arguments
+    that follow 'metrics-server'.
+    """
+    topic_renderers: TopicRegistry = TopicRegistry()
+    parser = argparse.ArgumentParser(
+        prog="squad metrics-server",
+        description="Serves SquAd topics as OpenMetrics (Prometheus) gauges",
+    )
+    parser.add_argument(
+        "topics",
+        nargs="*",
+        metavar="topic",
+        help="The topics to serve, any of: "
+        + ", ".join(topic_renderers)
+        + f" (default {', '.join(_DEFAULT_TOPICS)})",
+    )
+    parser.add_argument(
+        "--port", type=int, default=9105, help="The port to serve the metrics on"
+    )
+    parser.add_argument(
+        "--address",
+        default="127.0.0.1",
+        help="The address to serve the metrics on",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        help="The period (seconds) between fetching each topic."
+        " If not provided each topic is fetched as often as it is in the TUI.",
+    )
+    parser.add_argument(
+        "--environment",
+        "-e",
+        help="The environment name to use. If not provided"
+        " the default environment in the environments file is used.",
+    )
+    parser.add_argument(
+        "--stream",
+        help="Decode large DM responses (datasets, instances and tasks)"
+        " as they arrive, which uses less memory",
+        action="store_true",
+    )
+    args = parser.parse_args(argv)
+
+    topics: List[str] = args.topics or _DEFAULT_TOPICS
+    for topic in topics:
+        if topic not in topic_renderers:
+            print(f"Unknown topic: '{topic}'", file=sys.stderr)
+            return 1
+
+    try:
+        environment.load_environment(args.environment)
+    except Exception as ex:  # pylint: disable=broad-except
+        print(f"Error loading environment: {ex}", file=sys.stderr)
+        return 1
+
+    TopicRenderer.stream_responses = args.stream
+    renderers: List[TopicRenderer] = [topic_renderers[topic] for topic in topics]
+    if args.interval:
+        for renderer in renderers:
+            renderer.refresh_interval = timedelta(seconds=args.interval)
+            renderer.min_refresh_interval = renderer.refresh_interval
+            renderer.max_refresh_interval = renderer.refresh_interval
+
+    try:
+        server: ThreadingHTTPServer = serve((args.address, args.port))
+    except OSError as ex:
+        print(f"Error serving on port {args.port}: {ex}", file=sys.stderr)
+        return 1
+    print(
+        f"Serving {', '.join(topics)} on http://{args.address}:{args.port}/metrics",
+        file=sys.stderr,
+    )
+    try:
+        while True:
+            for topic, renderer in zip(topics, renderers):
+                renderer.check_response()
+                MetricsStore.update(topic, renderer)
+            time.sleep(_POLL_PERIOD_S)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
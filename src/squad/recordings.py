@@ -0,0 +1,185 @@
+"""Recording (and replaying) the responses of the AS, DM and Keycloak.
+
+With a recording directory set (see record()) every response received
+through our HTTP sessions is saved, along with the time it took.
+With a replay directory set (see replay()) nothing is sent, each request
+is answered with the recorded response, optionally after the recorded delay,
+so SquAd can be run (and profiled) without a network.
+
+Requests are identified by their method, URL and query parameters.
+A request made more than once is answered with each of its recorded
+responses in turn, the last one being repeated. Request bodies (which may
+include passwords) are not recorded, but responses (which include
+Keycloak's access tokens) are, so the directory is only readable by its owner.
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# Response headers that do not apply to the (decoded) body we record
+_DROPPED_HEADERS: List[str] = [
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+]
+
+
+def request_key(method: str, url: str, params: Optional[Any] = None) -> str:
+    """Returns the key (a digest) identifying a request."""
+    request: str = f"{method.upper()} {url}"
+    if params:
+        request += " " + json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(request.encode("utf-8")).hexdigest()[:20]
+
+
+class Recordings:
+    """Records or replays HTTP responses."""
+
+    # The directory responses are recorded to (or replayed from)
+    _directory: Optional[Path] = None
+    _replaying: bool = False
+    # Whether replayed responses are delayed (by the time each originally took)
+    _replay_latency: bool = False
+    # A lock protecting the following
+    _lock: threading.Lock = threading.Lock()
+    # The number of responses (recorded or replayed) for each request key
+    _counts: Dict[str, int] = {}
+    # The recorded responses (metadata files) for each request key
+    _recordings: Dict[str, List[Path]] = {}
+
+    @classmethod
+    def record(cls, directory: str) -> None:
+        """Records responses in a directory. Responses are added to
+        any that are already there.
+        """
+        path: Path = Path(directory)
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        cls._start(path, replaying=False)
+
+    @classmethod
+    def replay(cls, directory: str, latency: bool = False) -> None:
+        """Replays the responses recorded in a directory, optionally
+        taking as long as each originally took.
+        """
+        if not Path(directory).is_dir():
+            raise ValueError(f"{directory} is not a directory")
+        cls._replay_latency = latency
+        cls._start(Path(directory), replaying=True)
+
+    @classmethod
+    def stop(cls) -> None:
+        """Stops recording (or replaying)."""
+        with cls._lock:
+            cls._directory = None
+            cls._replaying = False
+            cls._counts = {}
+            cls._recordings = {}
+
+    @classmethod
+    def is_recording(cls) -> bool:
+        """True if responses are being recorded."""
+        return cls._directory is not None and not cls._replaying
+
+    @classmethod
+    def is_replaying(cls) -> bool:
+        """True if responses are being replayed."""
+        return cls._directory is not None and cls._replaying
+
+    @classmethod
+    def save(
+        cls,
+        method: str,
+        url: str,
+        params: Optional[Any],
+        response: requests.Response,
+        start_time: float,
+    ) -> None:
+        """Saves a response, given the (monotonic) time the request was sent.
+        The response body is read (so the time includes it).
+        """
+        body: bytes = response.content
+        elapsed_s: float = time.monotonic() - start_time
+        key: str = request_key(method, url, params)
+        with cls._lock:
+            if cls._directory is None:
+                return
+            directory: Path = cls._directory
+            number: int = cls._counts.get(key, 0)
+            cls._counts[key] = number + 1
+        path: Path = directory / f"{key}.{number:04}.json"
+        path.with_suffix(".body").write_bytes(body)
+        metadata: Dict[str, Any] = {
+            "method": method.upper(),
+            "url": url,
+            "params": params,
+            "status_code": response.status_code,
+            "headers": {
+                name: value
+                for name, value in response.headers.items()
+                if name.lower() not in _DROPPED_HEADERS
+            },
+            "elapsed_s": round(elapsed_s, 6),
+            "recorded": datetime.now(timezone.utc).isoformat(),
+        }
+        path.write_text(json.dumps(metadata, indent=2, default=str), encoding="utf-8")
+
+    @classmethod
+    def get_response(
+        cls, method: str, url: str, params: Optional[Any] = None
+    ) -> requests.Response:
+        """Returns the next recorded response to a request, or a 404 (Not Found)
+        response if the request was not recorded.
+        """
+        key: str = request_key(method, url, params)
+        with cls._lock:
+            paths: List[Path] = cls._recordings.get(key, [])
+            number: int = cls._counts.get(key, 0)
+            cls._counts[key] = number + 1
+        response: requests.Response = requests.Response()
+        response.url = url
+        if not paths:
+            response.status_code = 404
+            response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+            body: bytes = json.dumps({"error": "No recorded response"}).encode()
+            elapsed_s: float = 0.0
+        else:
+            path: Path = paths[min(number, len(paths) - 1)]
+            metadata: Dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+            response.status_code = metadata["status_code"]
+            response.headers = CaseInsensitiveDict(metadata["headers"])
+            body = path.with_suffix(".body").read_bytes()
+            elapsed_s = metadata["elapsed_s"]
+        # pylint: disable=protected-access
+        response._content = body
+        response._content_consumed = True
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.elapsed = timedelta(seconds=elapsed_s)
+        if cls._replay_latency and elapsed_s > 0:
+            time.sleep(elapsed_s)
+        return response
+
+    @classmethod
+    def _start(cls, directory: Path, replaying: bool) -> None:
+        """Uses a directory, finding the responses already recorded there."""
+        recordings: Dict[str, List[Path]] = {}
+        if directory.is_dir():
+            for path in sorted(directory.glob("*.json")):
+                recordings.setdefault(path.name.split(".")[0], []).append(path)
+        with cls._lock:
+            cls._directory = directory
+            cls._replaying = replaying
+            cls._recordings = recordings
+            # Recording adds to the responses that are there,
+            # replaying starts with the first of them.
+            cls._counts = (
+                {}
+                if replaying
+                else {key: len(paths) for key, paths in recordings.items()}
+            )
@@ -0,0 +1,64 @@
+"""A process-wide cache of API responses.
+
+Topics built on the same API endpoint (like Units and Personal Units)
+use the cache so that they share one request and one (parsed) response.
+Only successful responses are cached, and only for a limited time (TTL).
+"""
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar, Union
+
+from squonk2.as_api import AsApiRv
+from squonk2.dm_api import DmApiRv
+
+ApiRv = TypeVar("ApiRv", bound=Union[AsApiRv, DmApiRv])
+
+
+class ResponseCache:
+    """Caches responses, keyed by the API method and its (keyword) arguments."""
+
+    # A lock protecting the dictionaries
+    _lock: threading.Lock = threading.Lock()
+    # Responses (and the time they were obtained), indexed by key
+    _entries: Dict[Hashable, Tuple[float, Any]] = {}
+    # Locks used to ensure only one call is made for any one key
+    _key_locks: Dict[Hashable, threading.Lock] = {}
+
+    @classmethod
+    def get(
+        cls,
+        function: Callable[..., ApiRv],
+        access_token: str,
+        *,
+        ttl: timedelta,
+        **kwargs: Any,
+    ) -> ApiRv:
+        """Returns the response of the API method, using a cached response
+        if there is one that's younger than the given TTL. The access token
+        is passed to the method but is not part of the key.
+        If another thread is already calling the method (with the same arguments)
+        we wait for it and use its response.
+        """
+        key: Hashable = (function.__qualname__, tuple(sorted(kwargs.items())))
+        with cls._lock:
+            key_lock: threading.Lock = cls._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry: Tuple[float, Any] = cls._entries.get(key, (0.0, None))
+            if (
+                entry[1] is not None
+                and time.monotonic() - entry[0] < ttl.total_seconds()
+            ):
+                response: ApiRv = entry[1]
+                return response
+            response = function(access_token, **kwargs)
+            if response.success:
+                with cls._lock:
+                    cls._entries[key] = (time.monotonic(), response)
+            return response
+
+    @classmethod
+    def clear(cls) -> None:
+        """Removes all cached responses."""
+        with cls._lock:
+            cls._entries.clear()
@@ -0,0 +1,79 @@
+"""An on-disk cache of the last successful response of each topic.
+
+Snapshots let SquAd display something as soon as it starts (marked as stale)
+rather than waiting for the first response from each API.
+Each environment has its own directory (e.g. '~/.cache/squad/site-a')
+and each topic's response is kept there as a gzipped JSON file.
+Snapshots are only used once a directory has been set (see set_environment()).
+"""
+import gzip
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+# The minimum period (seconds) between saving a topic's snapshot
+_SAVE_INTERVAL_S: float = 60.0
+
+
+class Snapshots:
+    """Saves and loads topic response snapshots."""
+
+    # The snapshot directory (None if snapshots are not used)
+    _directory: Optional[Path] = None
+    # A lock protecting the following
+    _lock: threading.Lock = threading.Lock()
+    # The time each snapshot was last saved, indexed by name
+    _save_times: Dict[str, float] = {}
+
+    @classmethod
+    def set_environment(cls, environment: str) -> None:
+        """Uses snapshots for the named environment. They are kept in
+        the 'squad' directory of the user's cache directory
+        ($XDG_CACHE_HOME or ~/.cache).
+        """
+        cache_directory: str = os.environ.get(
+            "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+        )
+        cls._directory = Path(cache_directory) / "squad" / environment
+
+    @classmethod
+    def save(cls, name: str, msg: Dict[str, Any]) -> None:
+        """Saves a (successful) response's message as the named snapshot,
+        unless it was saved recently. Errors are ignored.
+        """
+        if cls._directory is None:
+            return
+        now: float = time.monotonic()
+        with cls._lock:
+            if now - cls._save_times.get(name, -_SAVE_INTERVAL_S) < _SAVE_INTERVAL_S:
+                return
+            cls._save_times[name] = now
+        try:
+            cls._directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # Write to a temporary file and then rename it,
+            # so a snapshot is never seen half-written.
+            path: Path = cls._directory / f"{name}.json.gz"
+            tmp_path: Path = path.with_suffix(".tmp")
+            with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as file:
+                json.dump(msg, file, separators=(",", ":"))
+            tmp_path.replace(path)
+        except (OSError, TypeError, ValueError):
+            pass
+
+    @classmethod
+    def load(cls, name: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Returns the time (seconds since the epoch) the named snapshot
+        was saved and its message, or None if there's no (readable) snapshot.
+        """
+        if cls._directory is None:
+            return None
+        path: Path = cls._directory / f"{name}.json.gz"
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                msg: Dict[str, Any] = json.load(file)
+            return path.stat().st_mtime, msg
+        except (OSError, ValueError):
+            return None
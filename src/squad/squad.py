@@ -5,17 +5,21 @@ import os
 import sys
 from typing import List, Optional
 
+from textual import events
 from textual.app import App
-from squonk2.as_api import AsApi
-from squonk2.dm_api import DmApi
 from squonk2.environment import Environment
 
 from squad import common
 from squad import environment
+from squad.fetcher import Fetcher
+from squad.recordings import Recordings
+from squad.snapshots import Snapshots
+from squad.startup import StartupProfile
 from squad.widgets.logo import LogoWidget
 from squad.widgets.env import EnvWidget
 from squad.widgets.info import InfoWidget
 from squad.widgets.topic import TopicWidget
+from squad.widgets.topics.base import TopicRenderer
 
 # Users set SQUONK2_LOGFILE to enable logging
 # e.g. "export SQUONK2_LOGFILE=./squad.log"
@@ -25,6 +29,9 @@ _LOG: Optional[str] = os.environ.get("SQUONK2_LOGFILE")
 class Squad(App):  # type: ignore
     """An example of a very simple Textual App"""
 
+    # The TopicWidget we place (refreshed when the user changes what it displays)
+    topic_widget: Optional[TopicWidget] = None
+
     async def on_load(self) -> None:
         """initialisation - prior to application starting - bind keys."""
         await self.bind("Q", "quit", "Quit")
@@ -32,6 +39,7 @@ class Squad(App):  # type: ignore
         # Keys uses to switch the topic of the main display.
         await self.bind("a", "topic('assets')")
         await self.bind("d", "topic('datasets')")
+        await self.bind("h", "topic('diagnostics')")
         await self.bind("i", "topic('instances')")
         await self.bind("k", "topic('tasks')")
         await self.bind("m", "topic('merchants')")
@@ -51,6 +59,16 @@ class Squad(App):  # type: ignore
         await self.bind("up", "sort_order('ascending')")
         await self.bind("down", "sort_order('descending')")
 
+        # Sort stack keys (sort by more or fewer columns)
+        await self.bind("+", "sort_stack('push')")
+        await self.bind("-", "sort_stack('pop')")
+
+        # Scroll keys
+        await self.bind("pageup", "scroll('page-up')")
+        await self.bind("pagedown", "scroll('page-down')")
+        await self.bind("home", "scroll('home')")
+        await self.bind("end", "scroll('end')")
+
     async def on_mount(self) -> None:
         """Widget initialisation - application start"""
 
@@ -95,34 +113,76 @@ class Squad(App):  # type: ignore
         )
 
         # Now put the widgets in the grid using the areas we've created.
+        self.topic_widget = TopicWidget()
         grid.place(
             area1=EnvWidget(),
             area2=InfoWidget(),
             area3=LogoWidget(),
-            area4=TopicWidget(),
+            area4=self.topic_widget,
         )
+        StartupProfile.mark("app mounted")
+
+    async def on_key(self, event: events.Key) -> None:
+        """Reacts to a key-press. Keys are handled by our bindings
+        unless they're used by the topic's filter ('/' starts the filter
+        and the keys that follow edit it until 'enter' or 'escape').
+        """
+        if TopicWidget.filter_key(event.key):
+            self.refresh_topic()
+        else:
+            await self.press(event.key)
 
-    @staticmethod
-    async def action_topic(topic: str) -> None:
+    async def action_topic(self, topic: str) -> None:
         """Reacts to key-press, given a topic as an argument,
         and passes the argument to the TopicWidget in order to change the
-        content of the main 'topic' area.
+        content of the main 'topic' area. The new topic is displayed immediately
+        (using whatever it has already collected).
         """
         TopicWidget.set_topic(topic)
+        self.refresh_topic()
 
-    @staticmethod
-    async def action_sort_column(up_down: str) -> None:
+    async def action_sort_column(self, up_down: str) -> None:
         """Reacts to a left/right cursor key-press, given 'up' or 'down'."""
         TopicWidget.sort_column(up_down)
+        self.refresh_topic()
 
-    @staticmethod
-    async def action_sort_order(up_down: str) -> None:
+    async def action_sort_order(self, up_down: str) -> None:
         """Reacts to a left/right cursor key-press, given 'ascending' or 'descending'."""
         TopicWidget.sort_order(up_down)
+        self.refresh_topic()
+
+    async def action_sort_stack(self, push_pop: str) -> None:
+        """Reacts to a +/- key-press, given 'push' or 'pop'."""
+        TopicWidget.sort_stack(push_pop)
+        self.refresh_topic()
+
+    async def action_scroll(self, action: str) -> None:
+        """Reacts to a page-up/page-down/home/end key-press."""
+        TopicWidget.scroll(action)
+        self.refresh_topic()
+
+    def refresh_topic(self) -> None:
+        """Refreshes the TopicWidget (rather than waiting for its next
+        periodic check) so that changes appear straight away.
+        """
+        if self.topic_widget:
+            self.topic_widget.refresh()
 
 
 def main() -> int:
-    """Application entry point, called when the module is executed."""
+    """Application entry point, called when the module is executed.
+    'squad export ...' exports topics without starting the TUI
+    and 'squad metrics-server ...' serves them as OpenMetrics gauges.
+    """
+    StartupProfile.mark("imported")
+    if len(sys.argv) > 1 and sys.argv[1] == "export":
+        from squad import export  # pylint: disable=import-outside-toplevel
+
+        return export.main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "metrics-server":
+        from squad import metrics_server  # pylint: disable=import-outside-toplevel
+
+        return metrics_server.main(sys.argv[2:])
 
     parser = argparse.ArgumentParser(prog="squad", description="Squonk2 Admin (SquAd)")
     parser.add_argument(
@@ -143,6 +203,64 @@ def main() -> int:
         " to allow stderr to appear ion the console.",
         action="store_true",
     )
+    parser.add_argument(
+        "--prefetch",
+        nargs="?",
+        const="all",
+        help="Keep topics that are not being displayed up to date"
+        " (in the background) so that switching to them is instant."
+        " Prefetch 'all' topics (the default) or a comma-separated list"
+        " of topic names, e.g. instances,tasks,products.",
+    )
+    parser.add_argument(
+        "--prefetch-budget",
+        type=float,
+        default=30.0,
+        help="The maximum number of prefetch requests each minute",
+    )
+    parser.add_argument(
+        "--no-snapshots",
+        help="Do not use (or save) snapshots of the topics. Normally SquAd"
+        " saves the latest information for each topic (in ~/.cache/squad)"
+        " and displays it (marked as stale) when it next starts.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--stream",
+        help="Decode large DM responses (datasets, instances and tasks)"
+        " as they arrive, turning each record into a row, rather than"
+        " decoding each response in one go. This uses less memory.",
+        action="store_true",
+    )
+    recording = parser.add_mutually_exclusive_group()
+    recording.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Record every AS, DM and Keycloak response (and the time it took)"
+        " in a directory, so the session can be replayed (see --replay)",
+    )
+    recording.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Replay the responses recorded in a directory (see --record)"
+        " rather than use the network",
+    )
+    parser.add_argument(
+        "--replay-latency",
+        help="Take as long to replay each response as it originally took",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        help="Print the time each part of SquAd's startup took (when SquAd exits)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--startup-trace",
+        metavar="FILE",
+        help="Write the startup timeline to a file, as a Chrome trace"
+        " (for chrome://tracing or Perfetto)",
+    )
     args = parser.parse_args()
 
     # Arg-provided name?
@@ -151,30 +269,41 @@ def main() -> int:
     # Load the DM/AS config from the environment file
     # we do this here to make sure the environment is intact
     # before allowing any widgets to use it.
-    names: List[str] = Environment.load()
-    if not names:
-        print("Error loading environment - no environments")
+    try:
+        with StartupProfile.span("load environment"):
+            env: Environment = environment.load_environment(args.name)
+    except Exception as ex:  # pylint: disable=broad-except
+        print(f"Error loading environment: {ex}")
         sys.exit(1)
-    if args.name:
-        try:
-            env: Environment = Environment(args.name)
-        except Exception as ex:  # pylint: disable=broad-except
-            print(f"Error loading environment: {ex}")
-            sys.exit(1)
-    else:
-        try:
-            env = Environment(names[0])
-        except Exception as ex:  # pylint: disable=broad-except
-            print(f"Error loading environment: {ex}")
-            sys.exit(1)
-
-    # Set the environment (so others can use it)
-    environment.set_environment(env)
-    # Set the API URLs for the AS and DM
-    # based on the environment we've just read.
-    if env.as_api():
-        AsApi.set_api_url(env.as_api(), verify_ssl_cert=False)
-    DmApi.set_api_url(env.dm_api(), verify_ssl_cert=False)
+
+    # Record (or replay) responses?
+    try:
+        if args.record:
+            Recordings.record(args.record)
+        elif args.replay:
+            Recordings.replay(args.replay, latency=args.replay_latency)
+    except (OSError, ValueError) as ex:
+        print(f"Error using recordings: {ex}")
+        sys.exit(1)
+
+    # Use (and save) topic snapshots?
+    # (but not when replaying, they'd replace those of the real environment)
+    if not args.no_snapshots and not args.replay:
+        Snapshots.set_environment(env.environment())
+
+    TopicRenderer.stream_responses = args.stream
+
+    # Prefetch topics?
+    if args.prefetch:
+        prefetch_topics: List[str] = list(TopicWidget.topic_renderers)
+        if args.prefetch != "all":
+            prefetch_topics = args.prefetch.split(",")
+            for topic in prefetch_topics:
+                if topic not in TopicWidget.topic_renderers:
+                    print(f"Unknown prefetch topic: '{topic}'")
+                    sys.exit(1)
+        TopicWidget.set_prefetch_topics(prefetch_topics)
+        Fetcher.set_background_budget(args.prefetch_budget)
 
     # Redirect stderr to avoid any potential SSL errors
     # e.g. the 'ssl.SSLCertVerificationError'
@@ -192,6 +321,10 @@ def main() -> int:
     # after restoring stderr.
     if not args.enable_stderr:
         sys.stderr.close()
+    if args.profile_startup:
+        print(StartupProfile.report())
+    if args.startup_trace:
+        StartupProfile.write_chrome_trace(args.startup_trace)
     return 0
 
 
@@ -0,0 +1,171 @@
+"""A timeline of SquAd's startup (see 'squad --profile-startup').
+
+Marks (moments) and spans (periods) are recorded, by name, the first time
+they happen, e.g. 'imported', 'load environment', 'first token' and
+'first data painted'. Times are relative to the start of the process
+(when that's known, otherwise the time this module was imported).
+The timeline can be printed (see report()) or written as a Chrome trace
+(see write_chrome_trace()), which chrome://tracing and Perfetto display.
+Only the first of each is recorded, so recording costs next to nothing
+once SquAd has started.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+
+class StartupEvent(NamedTuple):
+    """A mark (with no duration) or span on the startup timeline."""
+
+    name: str
+    start_s: float
+    duration_s: Optional[float]
+    thread_id: int
+    thread_name: str
+
+
+def _process_age_s() -> float:
+    """Returns the time (seconds) since the process started,
+    which is only known on Linux (otherwise it's zero).
+    """
+    try:
+        with open("/proc/self/stat", "r", encoding="utf-8") as stat_file:
+            # The process start time (in clock ticks since the system started)
+            # is the 22nd field, the 20th after the (bracketed) command.
+            start_ticks: int = int(stat_file.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r", encoding="utf-8") as uptime_file:
+            uptime_s: float = float(uptime_file.read().split()[0])
+        return max(uptime_s - start_ticks / os.sysconf("SC_CLK_TCK"), 0.0)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+class StartupProfile:
+    """Records the startup timeline."""
+
+    # The (perf_counter) time the process started
+    _origin: float = time.perf_counter() - _process_age_s()
+    # A lock protecting the following
+    _lock: threading.Lock = threading.Lock()
+    # The events, indexed by name
+    _events: Dict[str, StartupEvent] = {}
+
+    @classmethod
+    def mark(cls, name: str) -> None:
+        """Records a moment (the first time it happens)."""
+        if name in cls._events:
+            return
+        cls._add(name, time.perf_counter(), None)
+
+    @classmethod
+    @contextlib.contextmanager
+    def span(cls, name: str) -> Iterator[None]:
+        """Records a period, the code run in the context
+        (the first time it's run).
+        """
+        if name in cls._events:
+            yield
+            return
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls._add(name, start, time.perf_counter() - start)
+
+    @classmethod
+    def events(cls) -> List[StartupEvent]:
+        """Returns the events, in the order they started."""
+        with cls._lock:
+            return sorted(cls._events.values(), key=lambda event: event.start_s)
+
+    @classmethod
+    def reset(cls) -> None:
+        """Forgets the events (the origin remains)."""
+        with cls._lock:
+            cls._events = {}
+
+    @classmethod
+    def report(cls) -> str:
+        """Returns the timeline as text, one event on each line.
+        Marks are followed by the time since the previous mark,
+        spans by the time they took.
+        """
+        lines: List[str] = [
+            "Startup (milliseconds since the process started)",
+            f"{'at':>10}{'+/took':>10}  event",
+            f"{0.0:>10.1f}{'':>10}  process started",
+        ]
+        last_mark_s: float = 0.0
+        for event in cls.events():
+            if event.duration_s is None:
+                elapsed_s: float = event.start_s - last_mark_s
+                last_mark_s = event.start_s
+                lines.append(
+                    f"{event.start_s * 1000:>10.1f}{elapsed_s * 1000:>10.1f}"
+                    f"  {event.name}"
+                )
+            else:
+                lines.append(
+                    f"{event.start_s * 1000:>10.1f}{event.duration_s * 1000:>10.1f}"
+                    f"  {event.name} [{event.thread_name}]"
+                )
+        return "\n".join(lines)
+
+    @classmethod
+    def chrome_trace(cls) -> Dict[str, Any]:
+        """Returns the timeline as a Chrome trace (the JSON object format),
+        marks are instant events and spans are complete events.
+        """
+        pid: int = os.getpid()
+        trace_events: List[Dict[str, Any]] = []
+        thread_names: Dict[int, str] = {}
+        for event in cls.events():
+            thread_names[event.thread_id] = event.thread_name
+            trace_event: Dict[str, Any] = {
+                "name": event.name,
+                "cat": "startup",
+                "ts": round(event.start_s * 1_000_000),
+                "pid": pid,
+                "tid": event.thread_id,
+            }
+            if event.duration_s is None:
+                trace_event.update({"ph": "i", "s": "g"})
+            else:
+                trace_event.update(
+                    {"ph": "X", "dur": round(event.duration_s * 1_000_000)}
+                )
+            trace_events.append(trace_event)
+        for thread_id, thread_name in thread_names.items():
+            trace_events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"name": thread_name},
+                }
+            )
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    @classmethod
+    def write_chrome_trace(cls, path: str) -> None:
+        """Writes the timeline to a file, as a Chrome trace."""
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump(cls.chrome_trace(), trace_file, indent=1)
+
+    @classmethod
+    def _add(cls, name: str, start: float, duration_s: Optional[float]) -> None:
+        """Adds an event (unless there's already one with the name)."""
+        thread: threading.Thread = threading.current_thread()
+        with cls._lock:
+            if name not in cls._events:
+                cls._events[name] = StartupEvent(
+                    name,
+                    start - cls._origin,
+                    duration_s,
+                    thread.ident or 0,
+                    thread.name,
+                )
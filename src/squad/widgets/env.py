@@ -1,6 +1,8 @@
 """A textual widget used to display environment information.
 """
-from typing import Optional
+from datetime import timedelta
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlparse
 
 from rich.panel import Panel
 from rich.style import Style
@@ -14,53 +16,102 @@ from squonk2.as_api import AsApi, AsApiRv
 from squad import common
 from squad.environment import get_environment
 from squad.access_token import AccessToken
+from squad.fetcher import Fetcher
+from squad.http_metrics import EndpointSummary, HttpMetrics
+from squad.http_sessions import HttpSessions, HttpStats
 
 _KEY_STYLE: Style = Style(color="orange_red1")
 _KEY_VALUE_STYLE: Style = Style(color="bright_white")
 _VALUE_ERROR_STYLE: Style = Style(
     color="bright_yellow", bgcolor="bright_red", bold=True
 )
+_LATENCY_STYLE: Style = Style(color="grey70", bold=False)
+_ERROR_COUNT_STYLE: Style = Style(color="bright_red")
+
+# Period between calls to the AS and DM APIs (for their versions).
+_REFRESH_INTERVAL: timedelta = timedelta(seconds=20)
 
 
 class EnvWidget(Widget):  # type: ignore
     """Displays the environment."""
 
-    as_access_token: Optional[str] = None
-    dm_access_token: Optional[str] = None
-
     def on_mount(self) -> None:
         """Widget initialisation."""
         # Set an interval timer - we check the AS and DM APIs
-        # regularly trying to get the version of each.
-        self.set_interval(20, self.refresh)
+        # regularly (in the background) trying to get the version of each.
+        # The APIs are called less frequently than we refresh.
+        self.set_interval(2, self.refresh)
+
+    def get_versions(self) -> Tuple[Optional[AsApiRv], Optional[DmApiRv]]:
+        """Gets the version of the AS and DM APIs (concurrently).
+        This is called from a Fetcher worker thread.
+        """
+        versions: List[Any] = Fetcher.gather(self.get_as_version, self.get_dm_version)
+        return versions[0], versions[1]
+
+    @staticmethod
+    def get_as_version() -> AsApiRv:
+        """Gets the version of the AS API."""
+        with Fetcher.host_slot("as"):
+            return AsApi.get_version()
+
+    @staticmethod
+    def get_dm_version() -> DmApiRv:
+        """Gets the version of the DM API."""
+        access_token: Optional[str] = AccessToken.get_dm_access_token()
+        with Fetcher.host_slot("dm"):
+            return DmApi.get_version(access_token)
+
+    @staticmethod
+    def get_latency(hostname: Optional[str]) -> Text:
+        """Returns a host's (recent) p50/p95/p99 latency and its error count."""
+        if not hostname:
+            return Text()
+        # The environment's hostnames may include a port
+        summary: EndpointSummary = HttpMetrics.get_host_summary(
+            urlparse(f"//{hostname}").hostname or hostname
+        )
+        if not summary.requests:
+            return Text()
+        latency: Text = Text(
+            "  "
+            + "/".join(
+                common.format_latency(latency_s)
+                for latency_s in (summary.p50_s, summary.p95_s, summary.p99_s)
+            ),
+            style=_LATENCY_STYLE,
+        )
+        if summary.errors:
+            latency.append(f" {summary.errors} err", style=_ERROR_COUNT_STYLE)
+        return latency
 
     def render(self) -> Panel:
         """Render the widget."""
 
-        # Get access tokens (using anything we have)
-        self.as_access_token = AccessToken.get_as_access_token(
-            prior_token=self.as_access_token
-        )
-        self.dm_access_token = AccessToken.get_dm_access_token(
-            prior_token=self.dm_access_token
+        # Collect the latest versions (fetched in the background)
+        Fetcher.schedule("EnvWidget", self.get_versions, interval=_REFRESH_INTERVAL)
+        versions: Optional[Tuple[Optional[AsApiRv], Optional[DmApiRv]]] = Fetcher.get(
+            "EnvWidget"
         )
+        as_ret_val: Optional[AsApiRv] = versions[0] if versions else None
+        dm_ret_val: Optional[DmApiRv] = versions[1] if versions else None
 
         # Get the version of the DM API and the AS API
         as_api_version: str = "- NO RESPONSE -"
         as_api_version_style: Style = _VALUE_ERROR_STYLE
-        as_ret_val: AsApiRv = AsApi.get_version()
-        if as_ret_val.success:
+        if as_ret_val and as_ret_val.success:
             as_api_version = f"{as_ret_val.msg['version']}"
             as_api_version_style = _KEY_VALUE_STYLE
         as_api_version_value: Text = Text(as_api_version, style=as_api_version_style)
+        as_api_version_value.append(self.get_latency(get_environment().as_hostname()))
 
         dm_api_version: str = "- NO RESPONSE -"
         dm_api_version_style: Style = _VALUE_ERROR_STYLE
-        dm_ret_val: DmApiRv = DmApi.get_version(self.dm_access_token)
-        if dm_ret_val.success:
+        if dm_ret_val and dm_ret_val.success:
             dm_api_version = f"{dm_ret_val.msg['version']}"
             dm_api_version_style = _KEY_VALUE_STYLE
         dm_api_version_value: Text = Text(dm_api_version, style=dm_api_version_style)
+        dm_api_version_value.append(self.get_latency(get_environment().dm_hostname()))
 
         # Information is presented in a table.
         table = Table(
@@ -77,10 +128,11 @@ class EnvWidget(Widget):  # type: ignore
         kc_host = Text(
             f"{get_environment().keycloak_hostname()} ", style=_KEY_VALUE_STYLE
         )
-        if self.dm_access_token:
+        if AccessToken.has_dm_access_token():
             kc_host.append(common.TICK)
         else:
             kc_host.append(common.CROSS)
+        kc_host.append(self.get_latency(get_environment().keycloak_hostname()))
 
         # The API lines are also dynamically styled.
         as_hostname: Optional[str] = get_environment().as_hostname()
@@ -98,6 +150,11 @@ class EnvWidget(Widget):  # type: ignore
         table.add_row("v", as_api_version_value)
         table.add_row("DM", common.truncate(get_environment().dm_hostname(), 40))
         table.add_row("v", dm_api_version_value)
+        http_stats: HttpStats = HttpSessions.get_stats()
+        table.add_row(
+            "HTTP",
+            f"{http_stats.requests} requests {http_stats.connections} connections",
+        )
 
         return Panel(
             table,
@@ -56,11 +56,19 @@ class InfoWidget(Widget):  # type: ignore
             "<up|down>",
             "Sort order",
         )
-        table.add_row("", "", "<i>", "Instances", "<t>", "Products")
-        table.add_row("", "", "<k>", "Tasks", "<a>", "Assets")
-        table.add_row("", "", "<r>", "Defined exchange rates", "<m>", "Merchants")
-        table.add_row("", "", "<u>", "Undefined exchange rates", "", "")
-        table.add_row("", "", "<s>", "Service errors", "", "")
+        table.add_row(
+            "", "", "<i>", "Instances", "<t>", "Products", "<PgUp|PgDn>", "Scroll"
+        )
+        table.add_row(
+            "", "", "<k>", "Tasks", "<a>", "Assets", "<Home|End>", "Top/bottom"
+        )
+        table.add_row(
+            "", "", "<r>", "Defined exchange rates", "<m>", "Merchants", "</>", "Filter"
+        )
+        table.add_row(
+            "", "", "<u>", "Undefined exchange rates", "", "", "<+|->", "Then sort by"
+        )
+        table.add_row("", "", "<s>", "Service errors", "<h>", "HTTP diagnostics")
 
         return Panel(
             table,
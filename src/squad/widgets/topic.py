@@ -2,26 +2,16 @@
 It a dynamic panel that displays Instances, Projects, Datasets etc.
 depending on what key the user has hit.
 """
-from typing import Dict
+from typing import List, Optional
 
 from rich import box
 from rich.panel import Panel
 from textual.widget import Widget
 
 from squad.common import log_warning, CORE_STYLE
+from squad.startup import StartupProfile
 from squad.widgets.topics.base import TopicRenderer
-from squad.widgets.topics.assets import Assets
-from squad.widgets.topics.datasets import Datasets
-from squad.widgets.topics.defined_exchange_rates import DefinedExchangeRates
-from squad.widgets.topics.instances import Instances
-from squad.widgets.topics.tasks import Tasks
-from squad.widgets.topics.merchants import Merchants
-from squad.widgets.topics.products import Products
-from squad.widgets.topics.projects import Projects
-from squad.widgets.topics.personal_units import PersonalUnits
-from squad.widgets.topics.service_errors import ServiceErrors
-from squad.widgets.topics.undefined_exchange_rates import UndefinedExchangeRates
-from squad.widgets.topics.units import Units
+from squad.widgets.topics.registry import TopicRegistry
 
 
 class TopicWidget(Widget):  # type: ignore
@@ -30,20 +20,14 @@ class TopicWidget(Widget):  # type: ignore
     # What are we displaying?
     topic: str = "instances"
     # What can we display?
-    topic_renderers: Dict[str, TopicRenderer] = {
-        "assets": Assets(),
-        "datasets": Datasets(),
-        "defined-exchange-rates": DefinedExchangeRates(),
-        "instances": Instances(),
-        "tasks": Tasks(),
-        "merchants": Merchants(),
-        "products": Products(),
-        "projects": Projects(),
-        "personal-units": PersonalUnits(),
-        "service-errors": ServiceErrors(),
-        "undefined-exchange-rates": UndefinedExchangeRates(),
-        "units": Units(),
-    }
+    # (each topic's renderer is created when it's first used)
+    topic_renderers: TopicRegistry = TopicRegistry()
+
+    # Topics kept up to date (in the background) when they're not displayed
+    prefetch_topics: List[str] = []
+
+    # The Panel we last rendered
+    rendered_panel: Optional[Panel] = None
 
     @classmethod
     def set_topic(cls, topic: str) -> None:
@@ -55,6 +39,15 @@ class TopicWidget(Widget):  # type: ignore
             return
         TopicWidget.topic = topic
 
+    @classmethod
+    def set_prefetch_topics(cls, topics: List[str]) -> None:
+        """Sets the topics that are prefetched (in the background)
+        so they can be displayed immediately. Unknown topics are ignored.
+        """
+        TopicWidget.prefetch_topics = [
+            topic for topic in topics if topic in TopicWidget.topic_renderers
+        ]
+
     @classmethod
     def sort_column(cls, up_down: str) -> None:
         """Passes sort colum request to the topic renderer."""
@@ -65,23 +58,72 @@ class TopicWidget(Widget):  # type: ignore
         """Passes sort order request to the topic renderer."""
         TopicWidget.topic_renderers[TopicWidget.topic].adjust_sort_order(up_down)
 
+    @classmethod
+    def sort_stack(cls, push_pop: str) -> None:
+        """Passes a request to add ('push') or remove ('pop')
+        a further sort column to the topic renderer.
+        """
+        renderer: TopicRenderer = TopicWidget.topic_renderers[TopicWidget.topic]
+        if push_pop == "push":
+            renderer.push_sort_column()
+        elif push_pop == "pop":
+            renderer.pop_sort_column()
+
+    @classmethod
+    def scroll(cls, action: str) -> None:
+        """Passes a scroll request to the topic renderer."""
+        TopicWidget.topic_renderers[TopicWidget.topic].adjust_scroll(action)
+
+    @classmethod
+    def filter_key(cls, key: str) -> bool:
+        """Passes a key to the topic renderer's filter,
+        returning True if the filter used it.
+        """
+        return TopicWidget.topic_renderers[TopicWidget.topic].edit_filter(key)
+
     def on_mount(self) -> None:
         """Widget initialisation."""
         # Period between refresh attempts
         # The AS/DM API isn't called at this rate - this is just the
         # rate the chosen info panel is refreshed - each panel decides how often
         # to call the underlying AS or DM (typically every 20 seconds or so).
-        self.set_interval(2, self.refresh)
+        # The API calls are made in the background (see Fetcher)
+        # so rendering never waits for the API.
+        self.set_interval(2, self.check_refresh)
+
+    def check_refresh(self) -> None:
+        """Refreshes the widget, but only if the topic's Panel has changed.
+        Topics being prefetched (other than the one being displayed)
+        collect their responses too.
+        """
+        assert TopicWidget.topic in TopicWidget.topic_renderers
+
+        for topic in TopicWidget.prefetch_topics:
+            if topic != TopicWidget.topic:
+                TopicWidget.topic_renderers[topic].check_response(background=True)
+
+        panel: Panel = TopicWidget.topic_renderers[TopicWidget.topic].get_panel(
+            self.size.width, self.size.height
+        )
+        if panel is not self.rendered_panel:
+            self.refresh()
 
     def render(self) -> Panel:
         """Render the widget using the prevailing topic."""
         assert TopicWidget.topic in TopicWidget.topic_renderers
 
-        # The chosen render returns a Panel.
+        # The chosen renderer returns a Panel
+        # (the same one if nothing has changed).
         # To avoid each renderer having to set the Panel box,
         # we do it here.
-        panel: Panel = TopicWidget.topic_renderers[TopicWidget.topic].render()
+        panel: Panel = TopicWidget.topic_renderers[TopicWidget.topic].get_panel(
+            self.size.width, self.size.height
+        )
         panel.box = box.SIMPLE
         panel.style = CORE_STYLE
         panel.padding = 0
+        self.rendered_panel = panel
+        StartupProfile.mark("first paint")
+        if TopicWidget.topic_renderers[TopicWidget.topic].rows_loaded:
+            StartupProfile.mark("first data painted")
         return panel
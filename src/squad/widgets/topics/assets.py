@@ -1,17 +1,15 @@
 """A widget used to display AS Asset information.
 """
-from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
-import pandas
 from rich.panel import Panel
 from rich.text import Text
 from rich.style import Style
-from squonk2.as_api import AsApi
+from squonk2.as_api import AsApi, AsApiRv
 
 from squad import common
 from squad.access_token import AccessToken
-from .base import SortOrder, TopicRenderer
+from .base import TopicRenderer
 
 # List of columns using names, styles and justification
 _COLUMNS: List[Tuple[str, Style, str]] = [
@@ -35,93 +33,92 @@ _SCOPE_STYLE: Dict[str, Style] = {
 _DEFAULT_SCOPE_STYLE: Style = Style(color="light_sky_blue1")
 
 
+class AssetRow(NamedTuple):
+    """An asset (a table row)."""
+
+    name: str
+    creator: str
+    scope: str
+    scope_id: str
+    created: str
+    disabled: bool
+    secret: bool
+    merchants: str
+
+
 class Assets(TopicRenderer):
     """Displays AS assets."""
 
+    api_host = "as"
+
+    # Assets are identified by their name, scope and scope ID
+    key_columns = (0, 2, 3)
+    # Columns indexed for filtering (as well as the key columns)
+    index_columns = (1,)
+
     def __init__(self) -> None:
+        super().__init__()
         # Default sort column
         self.num_columns = len(_COLUMNS)
+        self.column_names = [column[0] for column in _COLUMNS]
         self.sort_column = 4
 
-    def render(self) -> Panel:
-        """Render the widget."""
+    def get_response(self) -> Optional[AsApiRv]:
+        """Gets the assets (called from a Fetcher worker thread)."""
+        access_token: Optional[str] = AccessToken.get_as_access_token()
+        if not access_token:
+            return None
+        return AsApi.get_available_assets(access_token)
 
-        # Time to get projects?
-        now = datetime.now()
-        if (
-            self.last_response_time is None
-            or now - self.last_response_time > self.refresh_interval
-        ):
-            # No response, or we now need to replace what we have.
-            # Get an access token (it may be the one we already have)
-            self.access_token = AccessToken.get_as_access_token(
-                prior_token=self.access_token
+    def extract_rows(self, response: AsApiRv) -> Iterator[AssetRow]:
+        """Extracts the rows (values) from an assets response."""
+        for asset in response.msg["assets"]:
+            # Comma-separated list of merchants
+            merchants: str = ",".join(
+                merchant["name"] for merchant in asset["merchants"]
+            )
+            yield AssetRow(
+                asset["name"],
+                common.intern_string(asset["creator"]),
+                common.intern_string(asset["scope"]),
+                common.intern_string(asset["scope_id"]),
+                asset["created"],
+                asset["disabled"],
+                asset["secret"],
+                common.intern_string(merchants),
             )
-            self.last_response_time = now
-            if self.access_token:
-                # Got a token, time to get a new set of results...
-                self.last_response = AsApi.get_available_assets(self.access_token)
-            else:
-                self.last_response = None
+
+    def render(self) -> Panel:
+        """Render the widget."""
 
         # Results in a table.
         self.prepare_table(_COLUMNS)
         assert self.table
 
-        # Populate rows based on the last response.
-        # We populate 'data' with the project material
-        # so that we can sort on 'launched' date using pandas.
-        data: Dict[str, List[Any]] = {}
-        row_number: int = 1
-        if self.last_response and self.last_response.success:
-            for asset in self.last_response.msg["assets"]:
-                # Comma-separated list of merchants
-                merchants: str = ""
-                for merchant in asset["merchants"]:
-                    merchants += merchant["name"] + ","
-                # Strip off the trailing comma.
-                if merchants:
-                    merchants = merchants[:-1]
-                data[f"{row_number}"] = [
-                    asset["name"],
-                    asset["creator"],
-                    asset["scope"],
-                    asset["scope_id"],
-                    asset["created"],
-                    asset["disabled"],
-                    asset["secret"],
-                    merchants,
-                ]
-                row_number += 1
-
-        if data:
-            data_frame: pandas.DataFrame = pandas.DataFrame.from_dict(
-                data, orient="index"
+        # Populate the table with the rows that can be seen
+        # (sorted on the chosen column).
+        for row_label, row in self.visible_rows():
+            # The scope (user/unit etc.)
+            scope: str = row[2]
+            self.table.add_row(
+                row_label,
+                common.truncate(row[0], common.NAME_LENGTH),
+                row[1],
+                Text(
+                    scope,
+                    style=_SCOPE_STYLE.get(scope, _DEFAULT_SCOPE_STYLE),
+                ),
+                Text(
+                    row[3],
+                    style=_SCOPE_STYLE.get(scope, _DEFAULT_SCOPE_STYLE),
+                ),
+                row[4],
+                common.TICK if row[5] else common.CROSS,
+                common.TICK if row[6] else common.CROSS,
+                row[7],
             )
-            for _, row in data_frame.sort_values(
-                by=[self.sort_column], ascending=self.sort_order == SortOrder.ASCENDING
-            ).iterrows():
-                # The scope (user/unit etc.)
-                scope: str = row[2]
-                self.table.add_row(
-                    str(self.table.row_count + 1),
-                    common.truncate(row[0], common.NAME_LENGTH),
-                    row[1],
-                    Text(
-                        scope,
-                        style=_SCOPE_STYLE.get(scope, _DEFAULT_SCOPE_STYLE),
-                    ),
-                    Text(
-                        row[3],
-                        style=_SCOPE_STYLE.get(scope, _DEFAULT_SCOPE_STYLE),
-                    ),
-                    row[4],
-                    common.TICK if row[5] else common.CROSS,
-                    common.TICK if row[6] else common.CROSS,
-                    row[7],
-                )
-
-        title: str = f"Assets ({self.table.row_count})"
+
+        title: str = f"Assets ({len(self.rows)})"
         return Panel(
             self.table,
             title=title,
@@ -1,50 +1,618 @@
 """The base class for all widgets."""
+import re
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from enum import Enum
-from typing import List, Optional, Tuple, Union
+from datetime import timedelta
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
+import requests
 from rich import box
 from rich.panel import Panel
 from rich.style import Style
 from rich.table import Table
+from rich.text import Text
 from squonk2.as_api import AsApiRv
-from squonk2.dm_api import DmApiRv
+from squonk2.dm_api import DmApi, DmApiRv
 
-from squad import common
+from squad import common, json_stream
+from squad.access_token import AccessToken
+from squad.fetcher import Fetcher, Pages
+from squad.http_sessions import HttpSessions
+from squad.snapshots import Snapshots
+from squad.startup import StartupProfile
+from .row_store import Row, RowStore, SortOrder, SortSpec, parse_filter
 
+# The number of lines used by a topic's Panel and Table that are not table rows,
+# i.e. the Panel's title and subtitle lines plus the Table's
+# top border, header, header separator and bottom border.
+_PANEL_CHROME_HEIGHT: int = 6
+# The period (seconds) rows are highlighted for after they've changed
+_CHANGE_HIGHLIGHT_S: float = 5.0
 
-class SortOrder(Enum):
-    """The sort order for a table."""
+# Refresh intervals adapt to what we find.
+# The interval shrinks (by this factor) when a fetch finds changes
+# and grows when it does not.
+_ADAPT_FACTOR: float = 1.5
+# The interval grows by this factor when a fetch fails.
+_BACKOFF_FACTOR: float = 2.0
+# The interval is never less than this multiple of the time a fetch takes,
+# so slow APIs are called less often.
+_LATENCY_MULTIPLE: float = 10.0
 
-    ASCENDING = 1
-    DESCENDING = 2
+# The read timeout (seconds) and chunk size (bytes) of streamed responses
+_STREAM_TIMEOUT_S: int = 4
+_STREAM_CHUNK_SIZE: int = 64 * 1024
 
+# The DM API (and get_streamed_response()) only report the status
+# of a failed call in the error message, e.g. '... (resp=<Response [401]>)'.
+# These are the statuses that say we're not (or no longer) authorised.
+_AUTHORISATION_FAILURE: re.Pattern[str] = re.compile(r"<Response \[40[13]\]>")
 
-class TopicRenderer(ABC):
-    """The base class for all widgets."""
 
-    access_token: Optional[str] = None
+class StreamedRv(NamedTuple):
+    """A successful response that carries rows rather than a message,
+    a (DM) response that was 'streamed' (see
+    TopicRenderer.get_streamed_response()), its records turned into rows
+    as they arrived.
+    """
+
+    success: bool
+    msg: Dict[str, Any]
+    rows: List[Row]
+
+
+# The (failed) response that tells collect_pages() the API could not be called
+# but the rows we have should be kept (see TopicRenderer.current_response()).
+KEEP_ROWS: StreamedRv = StreamedRv(success=False, msg={}, rows=[])
+
+
+class TopicRenderer(ABC):  # pylint: disable=too-many-public-methods
+    """The base class for all widgets."""
 
     # A Table,
     # initialised in prepare_table()
     # and populated by the render() method.
     table: Optional[Table] = None
 
+    # The API host the topic uses ("as" or "dm")
+    api_host: str = "dm"
+
     # Period between calls to the DmApi.
     # We do not call the DmApi more frequently than this.
+    # The period adapts (see adapt_refresh_interval()) but stays within
+    # the topic's minimum and maximum.
     refresh_interval: timedelta = timedelta(seconds=20)
-    # The last response from the DmApi (or AsApi) in a renderer.
-    last_response: Optional[Union[DmApiRv, AsApiRv]] = None
-    # The time we got the last response
-    last_response_time: Optional[datetime] = None
+    min_refresh_interval: timedelta = timedelta(seconds=10)
+    max_refresh_interval: timedelta = timedelta(seconds=120)
+    # The rows extracted from the responses (see extract_rows()).
+    # Responses are obtained by the Fetcher, in the background,
+    # and collected by check_response(). Only the rows are kept,
+    # each response is dropped once its rows have been extracted.
+    rows: RowStore = RowStore()
+    # Are responses streamed? If so each record is turned into a row
+    # as the response arrives (rather than decoding the whole response first).
+    # Only topics with a 'stream_key' (the name of the response's array
+    # of records) can be streamed, and they must implement record_rows().
+    stream_responses: bool = False
+    stream_key: str = ""
+    # The columns that identify a row, used to merge the rows of a new response
+    # with those we already have. If there are none the rows are simply replaced.
+    key_columns: Tuple[int, ...] = ()
+    # Other columns (as well as the key columns) that are indexed
+    # so that filtering on them is fast (see RowStore.select())
+    index_columns: Tuple[int, ...] = ()
+    # The Pages being collected, the number we've used,
+    # the keys of the rows they've contained
+    # and whether we've finished with them.
+    pages: Optional[Pages] = None
+    pages_used: int = 0
+    page_keys: Set[Hashable] = set()
+    pages_merged: bool = False
+    # True once the rows of a complete fetch have been collected.
+    # From then on we record the rows that change.
+    rows_loaded: bool = False
+    # The row store version when we started collecting the pages
+    # and whether any page was missing (or in error).
+    pages_version: int = 0
+    pages_failed: bool = False
+    # Whether any page said the rows we have should be kept (see KEEP_ROWS)
+    pages_kept: bool = False
+    # The Fetcher generation of the last result we collected
+    fetch_generation: int = 0
+    # Have we looked for a snapshot (see load_snapshot())?
+    # If our rows come from a snapshot, the time (seconds since the epoch)
+    # it was saved. None when our rows are fresh.
+    snapshot_loaded: bool = False
+    snapshot_time: Optional[float] = None
+    # The most recently rendered Panel and the key that identifies
+    # what it displays (see get_panel())
+    panel: Optional[Panel] = None
+    panel_key: Optional[Tuple[Any, ...]] = None
+    # The (0-based) index of the first (sorted) row to display
+    # and the number of rows that can be seen (0 if unlimited).
+    # Only the rows in this 'window' are rendered.
+    first_row: int = 0
+    page_size: int = 0
+    # The number of rows the last render() drew (see visible_rows())
+    rows_drawn: int = 0
+    # The filter query (see parse_filter()) and whether it's being edited.
+    # The rows that match it (their positions in the RowStore)
+    # and the RowStore version and query they match.
+    filter_query: str = ""
+    filter_editing: bool = False
+    filter_positions: Optional[Set[int]] = None
+    filter_key: Optional[Tuple[RowStore, int, str]] = None
 
     # What column do we sort topic results (1..N) and what's the order?
     # These are adjusted by the specific topic renderer.
     sort_column: int = 0
     sort_order: SortOrder = SortOrder.DESCENDING
-    # how many columns does the topic have?
+    # Further sort columns (and their orders), used (in turn) to order rows
+    # that have the same value in the sort column. The user 'pushes'
+    # the sort column onto this stack (see push_sort_column())
+    # and then chooses a different sort column.
+    then_sort_by: List[SortSpec] = []
+    # how many columns does the topic have (and what are they called)?
     num_columns: int = 1
+    column_names: List[str] = []
+
+    def __init__(self) -> None:
+        self.rows = self.new_row_store()
+        self.page_keys = set()
+        self.then_sort_by = []
+
+    def new_row_store(self) -> RowStore:
+        """Returns a new (empty) RowStore for the topic's rows."""
+        return RowStore(key_columns=self.key_columns, index_columns=self.index_columns)
+
+    def check_response(self, background: bool = False) -> None:
+        """Asks the Fetcher for new responses (if they're due)
+        and then collects the latest responses (pages) it has. This never waits
+        for the API, the responses we collect may be from a previous call.
+        Topics that are not being displayed use a 'background' fetch.
+        """
+        fetch_key: str = self.__class__.__name__
+        Fetcher.schedule(
+            fetch_key,
+            self.fetch_pages,
+            interval=self.refresh_interval,
+            background=background,
+            host=self.api_host,
+        )
+        if not self.snapshot_loaded:
+            self.load_snapshot()
+        generation: int = Fetcher.generation(fetch_key)
+        pages: Optional[Pages] = Fetcher.get(fetch_key)
+        if pages is None and generation != self.fetch_generation:
+            # A fetch has failed (every failure counts)
+            self.adapt_refresh_interval(changed=True, failed=True)
+        self.fetch_generation = generation
+        self.collect_pages(pages)
+
+    def collect_pages(self, pages: Optional[Pages]) -> None:
+        """Merges the rows of any pages we've not used into our rows.
+        Once every page has arrived, rows that were not in any page are removed.
+        """
+        if pages is not self.pages:
+            # A new fetch (or a failed one).
+            self.pages = pages
+            self.pages_used = 0
+            self.page_keys = set()
+            self.pages_merged = False
+            self.pages_version = self.rows.version
+            self.pages_failed = False
+            self.pages_kept = False
+            if pages is None:
+                # The fetch failed
+                self.rows = self.new_row_store()
+                self.rows_loaded = False
+        if pages is None or self.pages_merged:
+            return
+        # Check whether the pages are complete before using them
+        # as more may be added (by the worker) while we do.
+        complete: bool = pages.complete
+        num_pages: int = len(pages.responses)
+        while self.pages_used < num_pages:
+            response: Optional[Union[DmApiRv, AsApiRv, StreamedRv]] = pages.responses[
+                self.pages_used
+            ]
+            if response is KEEP_ROWS:
+                self.pages_kept = True
+            elif response and response.success:
+                self.page_keys |= self.rows.merge(
+                    self.response_rows(response), record_changes=self.rows_loaded
+                )
+            else:
+                self.rows = self.new_row_store()
+                self.page_keys = set()
+                self.pages_failed = True
+            # We have its rows, so drop the (raw) response
+            pages.responses[self.pages_used] = None
+            self.pages_used += 1
+        if complete:
+            self.pages_merged = True
+            if self.pages_kept and not self.pages_failed:
+                # The fetch failed but we keep the rows we have
+                # (and the time of their snapshot, if they're from one).
+                self.adapt_refresh_interval(
+                    changed=True, failed=True, elapsed_s=pages.elapsed_s
+                )
+                return
+            # Every page has arrived,
+            # remove rows that have gone away since the last fetch.
+            self.rows.retain(self.page_keys)
+            if not self.pages_failed:
+                # Fresh rows
+                self.snapshot_time = None
+            if self.rows_loaded or self.pages_failed:
+                self.adapt_refresh_interval(
+                    changed=self.rows.version != self.pages_version,
+                    failed=self.pages_failed,
+                    elapsed_s=pages.elapsed_s,
+                )
+            self.rows_loaded = not self.pages_failed
+            if self.rows_loaded:
+                StartupProfile.mark("first data")
+
+    def fetch_pages(self) -> Pages:
+        """Collects the responses from get_responses() (called from a Fetcher
+        worker thread). The Pages are published before the first
+        response arrives so that each page can be used as soon as it's added.
+        """
+        start_time: float = time.monotonic()
+        pages: Pages = Pages(self.get_num_pages())
+        Fetcher.publish(self.__class__.__name__, pages)
+        # The responses are dropped (by collect_pages()) as they're used,
+        # so remember whether they were all successful, and the final one.
+        succeeded: bool = True
+        response: Optional[Union[DmApiRv, AsApiRv, StreamedRv]] = None
+        with StartupProfile.span(f"fetch {self.__class__.__name__}"):
+            for response in self.get_responses():
+                succeeded = succeeded and bool(response and response.success)
+                pages.append(response)
+        pages.elapsed_s = time.monotonic() - start_time
+        pages.complete = True
+        # Snapshot the final (most complete) response.
+        # Responses that carry rows have no message to save.
+        if succeeded and response and not isinstance(response, StreamedRv):
+            Snapshots.save(self.__class__.__name__, response.msg)
+        return pages
+
+    def load_snapshot(self) -> None:
+        """Loads the topic's rows from its snapshot (if there is one)
+        when we have no rows. The rows are displayed as stale
+        until fresh ones arrive.
+        """
+        self.snapshot_loaded = True
+        if self.rows:
+            return
+        snapshot: Optional[Tuple[float, Dict[str, Any]]] = Snapshots.load(
+            self.__class__.__name__
+        )
+        if snapshot is None:
+            return
+        response: Union[DmApiRv, AsApiRv] = (
+            AsApiRv(success=True, msg=snapshot[1])
+            if self.api_host == "as"
+            else DmApiRv(success=True, msg=snapshot[1])
+        )
+        try:
+            self.rows.merge(self.extract_rows(response))
+        except (KeyError, TypeError, ValueError):
+            # A snapshot we do not understand (from an older SquAd?)
+            self.rows = self.new_row_store()
+            return
+        self.snapshot_time = snapshot[0]
+        self.rows_loaded = True
+        StartupProfile.mark("snapshot loaded")
+
+    def staleness(self) -> str:
+        """Returns a string describing the age of our rows
+        if they're from a snapshot (otherwise an empty string).
+        """
+        if self.snapshot_time is None:
+            return ""
+        import humanize  # pylint: disable=import-outside-toplevel
+
+        age_s: float = max(time.time() - self.snapshot_time, 0.0)
+        return f" [stale, {humanize.naturaldelta(age_s)} old]"
+
+    def adapt_refresh_interval(
+        self, *, changed: bool, failed: bool = False, elapsed_s: float = 0.0
+    ) -> None:
+        """Adjusts the refresh interval after a fetch. Topics whose rows
+        change are refreshed more often, topics whose rows do not (and those
+        whose fetches fail or are slow) are refreshed less often.
+        """
+        interval_s: float = self.refresh_interval.total_seconds()
+        if failed:
+            interval_s *= _BACKOFF_FACTOR
+        elif changed:
+            interval_s /= _ADAPT_FACTOR
+        else:
+            interval_s *= _ADAPT_FACTOR
+        interval_s = max(interval_s, elapsed_s * _LATENCY_MULTIPLE)
+        interval_s = min(
+            max(interval_s, self.min_refresh_interval.total_seconds()),
+            self.max_refresh_interval.total_seconds(),
+        )
+        self.refresh_interval = timedelta(seconds=round(interval_s))
+
+    def loading_progress(self) -> str:
+        """Returns a string describing the progress of a multi-page fetch,
+        or an empty string if there's nothing to report.
+        """
+        if self.pages is None or self.pages.complete or self.pages.expected < 2:
+            return ""
+        return f" [loading {self.pages_used}/{self.pages.expected}]"
+
+    def get_panel(self, width: int, height: int = 0) -> Panel:
+        """Returns the topic's Panel for a display of the given width and height
+        (a height of zero means 'unlimited').
+        The latest response is collected, but a new Panel is only rendered when
+        the rows, sort column, sort order, scroll position, display size,
+        row highlights, filter or refresh interval have changed.
+        Otherwise the previous Panel is returned.
+        As unchanged rows leave the row store untouched, a fetch that
+        brings nothing new costs (almost) nothing.
+        """
+        self.check_response()
+        self.page_size = max(height - _PANEL_CHROME_HEIGHT, 1) if height > 0 else 0
+        self.first_row = self._clamp_first_row(self.first_row)
+        panel_key: Tuple[Any, ...] = (
+            self.rows,
+            self.rows.version,
+            self.loading_progress(),
+            self.staleness(),
+            self.highlight_time() > 0.0,
+            self.refresh_interval,
+            self.sort_column,
+            self.sort_order,
+            tuple(self.then_sort_by),
+            self.first_row,
+            self.page_size,
+            width,
+            self.filter_description(),
+        )
+        if self.panel is None or panel_key != self.panel_key:
+            self.panel = self.render()
+            if isinstance(self.panel.title, str):
+                # Add the loading progress, staleness,
+                # filter and refresh interval to the title
+                self.panel.title += (
+                    f"{panel_key[2]}{panel_key[3]}{panel_key[12]}"
+                    f" every {int(self.refresh_interval.total_seconds())}s"
+                )
+            if self.page_size and self.num_matching_rows() > self.page_size:
+                # Not everything can be seen.
+                # Tell the user where they are.
+                last_row: int = self.first_row + self.rows_drawn
+                self.panel.subtitle = (
+                    f"{self.first_row + 1}-{last_row} of {self.num_matching_rows()}"
+                    " <PgUp|PgDn|Home|End>"
+                )
+            self.panel_key = panel_key
+        return self.panel
+
+    def visible_rows(self) -> Iterator[Tuple[Text, Row]]:
+        """Yields the sorted rows (and a label, their 1-based row number) that are
+        in the display window. The render() method uses this
+        so that only the rows that can be seen are rendered. The labels of
+        rows that have recently changed are highlighted.
+        """
+        sorted_rows: List[Row] = self.rows.sort(
+            self.sort_column,
+            self.sort_order,
+            self.matching_positions(),
+            then_by=self.then_sort_by,
+        )
+        end_row: int = len(sorted_rows)
+        if self.page_size:
+            end_row = min(self.first_row + self.page_size, end_row)
+        self.rows_drawn = end_row - self.first_row
+        highlight_time: float = self.highlight_time()
+        for index in range(self.first_row, end_row):
+            row: Row = sorted_rows[index]
+            label: Text = Text(str(index + 1))
+            if highlight_time and self.rows.changed_since(row, highlight_time):
+                label.stylize(common.CHANGED_INDEX_STYLE)
+            yield label, row
+
+    def matching_positions(self) -> Optional[Set[int]]:
+        """Returns the positions (in the RowStore) of the rows that match
+        the filter, or None if there's no filter. The positions are kept
+        until the rows or the filter change.
+        """
+        if not self.filter_query.strip():
+            return None
+        filter_key: Tuple[RowStore, int, str] = (
+            self.rows,
+            self.rows.version,
+            self.filter_query,
+        )
+        if filter_key != self.filter_key:
+            self.filter_positions = self.rows.select(
+                parse_filter(self.filter_query, self.column_names)
+            )
+            self.filter_key = filter_key
+        return self.filter_positions
+
+    def num_matching_rows(self) -> int:
+        """Returns the number of rows that match the filter (if there is one)."""
+        positions: Optional[Set[int]] = self.matching_positions()
+        return len(self.rows) if positions is None else len(positions)
+
+    def filter_description(self) -> str:
+        """Returns a string describing the filter (and the number of rows
+        it matches), or an empty string if there's no filter.
+        """
+        if not self.filter_query and not self.filter_editing:
+            return ""
+        cursor: str = "_" if self.filter_editing else ""
+        return (
+            f" [/{self.filter_query}{cursor}"
+            f" {self.num_matching_rows()}/{len(self.rows)}]"
+        )
+
+    def edit_filter(self, key: str) -> bool:
+        """Edits the filter, given a key, returning True if the key was used.
+        '/' starts editing, characters are added to the query, backspace
+        removes the last one, enter finishes and escape removes the filter.
+        """
+        if not self.filter_editing:
+            if key != "/":
+                return False
+            self.filter_editing = True
+        elif key == "enter":
+            self.filter_editing = False
+        elif key == "escape":
+            self.filter_editing = False
+            self.filter_query = ""
+        elif key in ("ctrl+h", "backspace"):
+            self.filter_query = self.filter_query[:-1]
+        elif len(key) == 1 and key.isprintable():
+            self.filter_query += key
+        else:
+            return False
+        self.first_row = 0
+        return True
+
+    def highlight_time(self) -> float:
+        """Rows that changed after the (monotonic) time returned are highlighted.
+        Zero is returned if there are no rows to highlight.
+        """
+        highlight_time: float = time.monotonic() - _CHANGE_HIGHLIGHT_S
+        if self.rows.last_change_time > highlight_time:
+            return highlight_time
+        return 0.0
+
+    def adjust_scroll(self, action: str) -> None:
+        """Moves the display window, where the action is one of
+        'page-up', 'page-down', 'home' or 'end'.
+        """
+        page_size: int = max(self.page_size, 1)
+        if action == "page-up":
+            self.first_row -= page_size
+        elif action == "page-down":
+            self.first_row += page_size
+        elif action == "home":
+            self.first_row = 0
+        elif action == "end":
+            self.first_row = self.num_matching_rows()
+        self.first_row = self._clamp_first_row(self.first_row)
+
+    def _clamp_first_row(self, first_row: int) -> int:
+        """Returns a first row value that keeps the display window full,
+        i.e. the first row cannot be so large that there are empty rows.
+        """
+        if not self.page_size:
+            return 0
+        return max(min(first_row, self.num_matching_rows() - self.page_size), 0)
+
+    def response_rows(
+        self, response: Union[DmApiRv, AsApiRv, StreamedRv]
+    ) -> Iterator[Row]:
+        """Returns the rows of a successful response,
+        extracting them (see extract_rows()) unless it was streamed.
+        """
+        if isinstance(response, StreamedRv):
+            return iter(response.rows)
+        return self.extract_rows(response)
+
+    def get_streamed_response(
+        self,
+        endpoint: str,
+        access_token: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Union[DmApiRv, StreamedRv]:
+        """Gets a DM response (like the DmApi), decoding the records
+        in its 'stream_key' array as they arrive and turning each into
+        rows (see record_rows()). Only the rows are kept, the response
+        (and its decoded records) are discarded as we go.
+        """
+        assert self.stream_key
+        url, verify_ssl_cert = DmApi.get_api_url()
+        if not url:
+            return DmApiRv(success=False, msg={"error": "No API URL defined"})
+        rows: List[Row] = []
+        try:
+            resp: requests.Response = HttpSessions.request(
+                "GET",
+                url + endpoint,
+                headers={"Authorization": "Bearer " + access_token},
+                params=params,
+                timeout=_STREAM_TIMEOUT_S,
+                verify=verify_ssl_cert,
+                stream=True,
+            )
+            try:
+                if resp.status_code != 200:
+                    return DmApiRv(
+                        success=False, msg={"error": f"Request failed (resp={resp})"}
+                    )
+                for record in json_stream.iter_array(
+                    resp.iter_content(chunk_size=_STREAM_CHUNK_SIZE), self.stream_key
+                ):
+                    rows.extend(self.record_rows(record))
+            finally:
+                resp.close()
+        except (requests.RequestException, KeyError, TypeError, ValueError) as ex:
+            return DmApiRv(success=False, msg={"error": str(ex)})
+        return StreamedRv(success=True, msg={}, rows=rows)
+
+    def record_rows(self, record: Dict[str, Any]) -> Iterator[Row]:
+        """Returns the rows for one record (an item of the 'stream_key' array)
+        of a response. Topics that can be streamed (those with a 'stream_key')
+        implement this.
+        """
+        # pylint: disable=unused-argument
+        return iter(())
+
+    def current_response(self) -> StreamedRv:
+        """Returns KEEP_ROWS, used (from a Fetcher worker thread)
+        when the API cannot be called. The fetch fails but collect_pages()
+        keeps the rows we have (if any). The rows belong to the render thread,
+        so they're not touched here.
+        """
+        return KEEP_ROWS
+
+    def get_admin_response(
+        self,
+        function: Callable[[str], Union[DmApiRv, StreamedRv]],
+        access_token: str,
+    ) -> Optional[Union[DmApiRv, StreamedRv]]:
+        """Calls a DM API method that needs admin rights.
+        The admin state is set (once) for each access token.
+        If the call is refused (401 or 403) we may have lost our admin rights,
+        so we set the admin state again and have one more try. Other failures
+        (timeouts, server errors, etc.) are returned as they are.
+        If the admin state cannot be set the fetch fails
+        but the rows we have are kept (see current_response()).
+        """
+        if not AccessToken.set_dm_admin_state(access_token):
+            return self.current_response()
+        response: Union[DmApiRv, StreamedRv] = function(access_token)
+        if not response.success and _AUTHORISATION_FAILURE.search(
+            str(response.msg.get("error", ""))
+        ):
+            AccessToken.reset_dm_admin_state()
+            if not AccessToken.set_dm_admin_state(access_token):
+                return self.current_response()
+            response = function(access_token)
+        return response
 
     def prepare_table(self, columns: List[Tuple[str, Style, str]]) -> None:
         """Prepare the table for rendering. This is called from each
@@ -61,6 +629,14 @@ class TopicRenderer(ABC):
         self.table.add_column(
             "", style=common.INDEX_STYLE, no_wrap=True, justify="right"
         )
+        # The further sort columns (numbered from 2)
+        then_sort_by: Dict[int, Tuple[int, SortOrder]] = {
+            column: (number, order)
+            for number, (column, order) in enumerate(
+                [spec for spec in self.then_sort_by if spec[0] != self.sort_column],
+                start=2,
+            )
+        }
         c_index: int = 0
         for item in columns:
             header_style: Style = common.INDEX_STYLE
@@ -75,6 +651,15 @@ class TopicRenderer(ABC):
                     # Down Triangle
                     name += " \u25bc"
                 header_style = Style.combine([header_style, common.REVERSE])
+            elif c_index in then_sort_by:
+                # A further sort column,
+                # add its sort order icon and its place in the sort.
+                number, order = then_sort_by[c_index]
+                name += (
+                    f" \u25b3{number}"
+                    if order == SortOrder.ASCENDING
+                    else f" \u25bd{number}"
+                )
             c_index += 1
             # Justification is centered by default.
             justify: str = item[2] if item[2] else "center"
@@ -102,6 +687,52 @@ class TopicRenderer(ABC):
         elif up_down == "ascending":
             self.sort_order = SortOrder.ASCENDING
 
+    def push_sort_column(self) -> None:
+        """Adds the sort column (and its order) to the further sort columns
+        (replacing it if it's already there). Rows are then ordered by
+        whatever sort column is chosen next and then by this one.
+        """
+        self.then_sort_by = [
+            spec for spec in self.then_sort_by if spec[0] != self.sort_column
+        ]
+        self.then_sort_by.insert(0, (self.sort_column, self.sort_order))
+
+    def pop_sort_column(self) -> None:
+        """Removes the most recently added of the further sort columns."""
+        if self.then_sort_by:
+            self.then_sort_by.pop(0)
+
+    def get_num_pages(self) -> int:
+        """Returns the number of pages (responses) the next call to
+        get_responses() will yield.
+        """
+        return 1
+
+    def get_responses(
+        self,
+    ) -> Iterator[Optional[Union[DmApiRv, AsApiRv, StreamedRv]]]:
+        """Yields the responses (pages) that make up the topic's rows,
+        called from a Fetcher worker thread. Topics that can load their rows
+        in stages yield get_num_pages() responses, starting with the one that's
+        quickest to get. Most topics have just the one (from get_response()).
+        """
+        yield self.get_response()
+
+    @abstractmethod
+    def get_response(self) -> Optional[Union[DmApiRv, AsApiRv, StreamedRv]]:
+        """Calls the underlying API, returning the response.
+        This is called from a Fetcher worker thread (not the render thread)
+        and returns None if an access token could not be obtained.
+        """
+
+    @abstractmethod
+    def extract_rows(self, response: Union[DmApiRv, AsApiRv]) -> Iterator[Row]:
+        """Extracts table rows (one value for each of the topic's columns)
+        from a successful API response.
+        """
+
     @abstractmethod
     def render(self) -> Panel:
-        """Render the widget."""
+        """Render the widget (using the rows we have).
+        Normally called via get_panel().
+        """
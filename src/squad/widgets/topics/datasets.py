@@ -1,18 +1,15 @@
 """A widget used to display DM Dataset information.
 """
-from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
 
-import humanize
-import pandas
 from rich.panel import Panel
 from rich.text import Text
 from rich.style import Style
-from squonk2.dm_api import DmApi
+from squonk2.dm_api import DmApi, DmApiRv
 
 from squad import common
 from squad.access_token import AccessToken
-from .base import SortOrder, TopicRenderer
+from .base import StreamedRv, TopicRenderer
 
 # List of columns using names, styles and justification
 _COLUMNS: List[Tuple[str, Style, str]] = [
@@ -38,96 +35,106 @@ _STAGE_STYLE: Dict[str, Style] = {
 _DEFAULT_STAGE_STYLE: Style = Style(color="green4")
 
 
+class DatasetRow(NamedTuple):
+    """A dataset version (a table row)."""
+
+    dataset_id: str
+    version: int
+    owner: str
+    stage: str
+    filename: str
+    size: int
+    published: str
+    used: int
+
+
 class Datasets(TopicRenderer):
     """Displays datasets."""
 
+    # Dataset versions are identified by their dataset UID and version
+    key_columns = (0, 1)
+    # Columns indexed for filtering (as well as the key columns)
+    index_columns = (2, 3)
+    # The response's array of records (see get_streamed_response())
+    stream_key = "datasets"
+
     def __init__(self) -> None:
+        super().__init__()
         # Default sort column
         self.num_columns = len(_COLUMNS)
+        self.column_names = [column[0] for column in _COLUMNS]
         self.sort_column = 6
 
-    def render(self) -> Panel:
-        """Render the widget."""
+    def get_response(self) -> Optional[Union[DmApiRv, StreamedRv]]:
+        """Gets the datasets (called from a Fetcher worker thread)."""
+        access_token: Optional[str] = AccessToken.get_dm_access_token()
+        if not access_token:
+            return None
+        if self.stream_responses:
+            return self.get_streamed_response("/dataset", access_token)
+        return DmApi.get_available_datasets(access_token)
+
+    def extract_rows(self, response: DmApiRv) -> Iterator[DatasetRow]:
+        """Extracts the rows (values) from a datasets response,
+        one row for each version of each dataset.
+        """
+        for dataset in response.msg["datasets"]:
+            yield from self.record_rows(dataset)
 
-        # Time to get projects?
-        now = datetime.now()
-        if (
-            self.last_response_time is None
-            or now - self.last_response_time > self.refresh_interval
-        ):
-            # No response, or we now need to replace what we have.
-            # Get an access token (it may be the one we already have)
-            self.access_token = AccessToken.get_dm_access_token(
-                prior_token=self.access_token
+    def record_rows(self, record: Dict[str, Any]) -> Iterator[DatasetRow]:
+        """Returns the rows for a dataset, one for each of its versions."""
+        dataset_id: str = record["dataset_id"]
+        for dataset_version in record["versions"]:
+            yield DatasetRow(
+                dataset_id,
+                dataset_version["version"],
+                common.intern_string(dataset_version["owner"]),
+                common.intern_string(dataset_version["processing_stage"]),
+                dataset_version["file_name"],
+                dataset_version["size"],
+                dataset_version["published"],
+                len(dataset_version["projects"]),
             )
-            self.last_response_time = now
-            if self.access_token:
-                # Got a token, time to get a new set of results...
-                self.last_response = DmApi.get_available_datasets(self.access_token)
-            else:
-                self.last_response = None
+
+    def render(self) -> Panel:
+        """Render the widget."""
+        import humanize  # pylint: disable=import-outside-toplevel
 
         # Results in a table.
         self.prepare_table(_COLUMNS)
         assert self.table
 
-        # Populate rows based on the last response.
-        # We populate 'data' with the project material
-        # so that we can sort on 'launched' date using pandas.
-        data: Dict[str, List[Any]] = {}
-        row_number: int = 1
-        if self.last_response and self.last_response.success:
-            for dataset in self.last_response.msg["datasets"]:
-                dataset_id: str = dataset["dataset_id"]
-                for dataset_version in dataset["versions"]:
-                    data[f"{row_number}"] = [
-                        dataset_id,
-                        dataset_version["version"],
-                        dataset_version["owner"],
-                        dataset_version["processing_stage"],
-                        dataset_version["file_name"],
-                        dataset_version["size"],
-                        dataset_version["published"],
-                        len(dataset_version["projects"]),
-                    ]
-                    row_number += 1
-
-        # Populate rows based on the last response.
-        total_size_bytes: int = 0
-        if data:
-            data_frame: pandas.DataFrame = pandas.DataFrame.from_dict(
-                data, orient="index"
+        # Populate the table with the rows that can be seen
+        # (sorted on the chosen column).
+        for row_label, row in self.visible_rows():
+            stage: str = row[3]
+            stage_text: Text = Text(
+                stage, style=_STAGE_STYLE.get(stage, _DEFAULT_STAGE_STYLE)
+            )
+            # Used is count of projects.
+            # If zero use a cross.
+            used = row[7]
+            if used > 0:
+                used_text = Text(f"{used}", style=common.DATASET_USED_STYLE)
+            else:
+                used_text = common.CROSS
+            size: int = row[5]
+            self.table.add_row(
+                row_label,
+                row[0],
+                str(row[1]),
+                row[2],
+                stage_text,
+                row[4],
+                humanize.naturalsize(size, binary=True),
+                row[6],
+                used_text,
             )
-            for _, row in data_frame.sort_values(
-                by=[self.sort_column], ascending=self.sort_order == SortOrder.ASCENDING
-            ).iterrows():
-                stage: str = row[3]
-                stage_text: Text = Text(
-                    stage, style=_STAGE_STYLE.get(stage, _DEFAULT_STAGE_STYLE)
-                )
-                # Used is count of projects.
-                # If zero use a cross.
-                used = row[7]
-                if used > 0:
-                    used_text = Text(f"{used}", style=common.DATASET_USED_STYLE)
-                else:
-                    used_text = common.CROSS
-                size: int = row[5]
-                total_size_bytes += size
-                self.table.add_row(
-                    str(self.table.row_count + 1),
-                    row[0],
-                    str(row[1]),
-                    row[2],
-                    stage_text,
-                    row[4],
-                    humanize.naturalsize(size, binary=True),
-                    row[6],
-                    used_text,
-                )
 
+        # The total size is of all the rows (not just those we can see)
+        total_size_bytes: int = sum(self.rows.column(5))
         total_size_human: str = humanize.naturalsize(total_size_bytes, binary=True)
-        title: str = f"Datasets ({self.table.row_count}) [{total_size_human}]"
+        title: str = f"Datasets ({len(self.rows)}) [{total_size_human}]"
         return Panel(
             self.table,
             title=title,
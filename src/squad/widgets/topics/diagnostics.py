@@ -0,0 +1,103 @@
+"""A widget used to display the latency, errors and payloads
+of the AS, DM and Keycloak endpoints SquAd has used (see HttpMetrics).
+"""
+from datetime import timedelta
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from rich.panel import Panel
+from rich.style import Style
+from rich.text import Text
+from squonk2.dm_api import DmApiRv
+
+from squad import common
+from squad.http_metrics import HttpMetrics
+from .base import StreamedRv, TopicRenderer
+
+# List of columns using names, styles and justification
+_COLUMNS: List[Tuple[str, Style, str]] = [
+    ("Endpoint", common.HOSTNAME_STYLE, "left"),
+    ("Requests", common.USER_STYLE, "right"),
+    ("Errors", common.USER_STYLE, "right"),
+    ("p50", common.DATE_STYLE, "right"),
+    ("p95", common.DATE_STYLE, "right"),
+    ("p99", common.DATE_STYLE, "right"),
+    ("Received", common.STORAGE_SIZE_STYLE, "right"),
+]
+
+_ERROR_STYLE: Style = Style(color="bright_red", reverse=True)
+
+
+class EndpointRow(NamedTuple):
+    """An endpoint's metrics (a table row)."""
+
+    endpoint: str
+    requests: int
+    errors: int
+    p50_s: Optional[float]
+    p95_s: Optional[float]
+    p99_s: Optional[float]
+    total_bytes: int
+
+
+class Diagnostics(TopicRenderer):
+    """Displays the metrics of each endpoint. These come from HttpMetrics
+    (not an API) so they're 'fetched' often.
+    """
+
+    # Endpoints are identified by their name
+    key_columns = (0,)
+    # No API is used
+    api_host = ""
+    refresh_interval = timedelta(seconds=2)
+    min_refresh_interval = timedelta(seconds=2)
+    max_refresh_interval = timedelta(seconds=10)
+
+    def __init__(self) -> None:
+        super().__init__()
+        # Default sort column
+        self.num_columns = len(_COLUMNS)
+        self.column_names = [column[0] for column in _COLUMNS]
+        self.sort_column = 4
+
+    def get_response(self) -> StreamedRv:
+        """Returns the metrics, as a response that carries rows."""
+        return StreamedRv(
+            success=True,
+            msg={},
+            rows=[EndpointRow(*summary) for summary in HttpMetrics.get_summaries()],
+        )
+
+    def extract_rows(self, response: DmApiRv) -> Iterator[EndpointRow]:
+        """The metrics do not come from an API response (see get_response())
+        so there are no rows to extract.
+        """
+        # pylint: disable=unused-argument
+        return iter(())
+
+    def render(self) -> Panel:
+        """Render the widget."""
+        import humanize  # pylint: disable=import-outside-toplevel
+
+        # Results in a table.
+        self.prepare_table(_COLUMNS)
+        assert self.table
+
+        # Populate the table with the rows that can be seen
+        # (sorted on the chosen column).
+        for row_label, row in self.visible_rows():
+            self.table.add_row(
+                row_label,
+                row[0],
+                str(row[1]),
+                Text(str(row[2]), style=_ERROR_STYLE) if row[2] else "0",
+                common.format_latency(row[3]),
+                common.format_latency(row[4]),
+                common.format_latency(row[5]),
+                humanize.naturalsize(row[6], binary=True),
+            )
+
+        title: str = f"HTTP diagnostics ({len(self.rows)} endpoints)"
+        return Panel(
+            self.table,
+            title=title,
+        )
@@ -1,11 +1,10 @@
 """A widget used to display DM Instance information.
 """
-from datetime import datetime
+from datetime import timedelta
 from decimal import Decimal
-from typing import Any, Dict, List, Tuple
+from functools import partial
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
 
-import humanize
-import pandas
 from rich.panel import Panel
 from rich.style import Style
 from rich.text import Text
@@ -14,7 +13,7 @@ from squonk2.dm_api import DmApi, DmApiRv
 
 from squad import common
 from squad.access_token import AccessToken
-from .base import SortOrder, TopicRenderer
+from .base import StreamedRv, TopicRenderer
 
 # List of columns using names, styles and justification
 _COLUMNS: List[Tuple[str, Style, str]] = [
@@ -52,136 +51,142 @@ _APPS: Dict[str, str] = {"jupyternotebooks.squonk.it": "Jupyter Notebook"}
 _ZERO: Decimal = Decimal()
 
 
+class InstanceRow(NamedTuple):
+    """An instance (a table row)."""
+
+    instance_id: str
+    archived: bool
+    name: str
+    owner: str
+    launched: str
+    phase: str
+    coins: Decimal
+    app_job: str
+    image_type: str
+
+
 class Instances(TopicRenderer):
     """Displays instances."""
 
+    # Instances are identified by their UUID
+    key_columns = (0,)
+    # Columns indexed for filtering (as well as the key columns)
+    index_columns = (3, 5, 8)
+    # The response's array of records (see get_streamed_response())
+    stream_key = "instances"
+    # Changes often
+    min_refresh_interval = timedelta(seconds=5)
+    max_refresh_interval = timedelta(seconds=60)
+
     def __init__(self) -> None:
+        super().__init__()
         # Default sort column
         self.num_columns = len(_COLUMNS)
+        self.column_names = [column[0] for column in _COLUMNS]
         self.sort_column = 4
 
-    def render(self) -> Panel:
-        """Render the widget."""
-
-        # Time to get projects?
-        now = datetime.now()
-        if (
-            self.last_response_time is None
-            or now - self.last_response_time > self.refresh_interval
-        ):
-            # No response, or we now need to replace what we have.
-            # Get an access token (it may be the one we already have)
-            self.access_token = AccessToken.get_dm_access_token(
-                prior_token=self.access_token
+    def get_response(self) -> Optional[Union[DmApiRv, StreamedRv]]:
+        """Gets the instances (called from a Fetcher worker thread)."""
+        access_token: Optional[str] = AccessToken.get_dm_access_token()
+        if not access_token:
+            return None
+        if self.stream_responses:
+            return self.get_admin_response(
+                partial(self.get_streamed_response, "/instance"), access_token
             )
-            self.last_response_time = now
-            if self.access_token:
-
-                # Got a token, time to get a new set of results...
-                set_admin_response: DmApiRv = DmApi.set_admin_state(
-                    self.access_token, admin=True
-                )
-                if set_admin_response.success:
-                    self.last_response = DmApi.get_available_instances(
-                        self.access_token
-                    )
+        return self.get_admin_response(DmApi.get_available_instances, access_token)
+
+    def extract_rows(self, response: DmApiRv) -> Iterator[InstanceRow]:
+        """Extracts the rows (values) from an instances response."""
+        for instance in response.msg["instances"]:
+            yield from self.record_rows(instance)
+
+    def record_rows(self, record: Dict[str, Any]) -> Iterator[InstanceRow]:
+        """Returns the row for an instance."""
+        archived: bool = False
+        if "archived" in record and record["archived"]:
+            archived = True
+        name: str = common.truncate(record["name"], common.NAME_LENGTH)
+        job: Text = Text(no_wrap=True)
+        image_type: str = ""
+        if record["application_type"] == "JOB":
+            job.append(record["job_job"], style=common.JOB_JOB_STYLE)
+            job.append("|")
+            job.append(record["job_version"], style=common.JOB_VERSION_STYLE)
+            image_type = record["job_image_type"]
+        else:
+            # It's an application instance.
+            # Replace the application with something more friendly.
+            app_id = record["application_id"]
+            if app_id in _APPS:
+                job.append(_APPS[app_id], style=common.APP_STYLE)
             else:
-                self.last_response = None
+                job.append(app_id, style=common.APP_STYLE)
+        if "coins" in record:
+            coins: Decimal = Decimal(record["coins"])
+        else:
+            coins = Decimal()
+        yield InstanceRow(
+            record["id"],
+            archived,
+            name,
+            common.intern_string(record["owner"]),
+            record["launched"],
+            common.intern_string(record["phase"]),
+            coins,
+            common.intern_string(str(job)),
+            common.intern_string(image_type),
+        )
+
+    def render(self) -> Panel:
+        """Render the widget."""
+        import humanize  # pylint: disable=import-outside-toplevel
 
         # Results in a table.
         self.prepare_table(_COLUMNS)
         assert self.table
 
-        # Populate rows based on the last response.
-        # We populate 'data' with the project material
-        # so that we can sort on 'launched' date using pandas.
-        data: Dict[str, List[Any]] = {}
-        row_number: int = 1
-        if self.last_response and self.last_response.success:
-            for instance in self.last_response.msg["instances"]:
-                archived: bool = False
-                if "archived" in instance and instance["archived"]:
-                    archived = True
-                name: str = common.truncate(instance["name"], common.NAME_LENGTH)
-                job: Text = Text(no_wrap=True)
-                image_type: str = ""
-                if instance["application_type"] == "JOB":
-                    job.append(instance["job_job"], style=common.JOB_JOB_STYLE)
-                    job.append("|")
-                    job.append(instance["job_version"], style=common.JOB_VERSION_STYLE)
-                    image_type = instance["job_image_type"]
-                else:
-                    # It's an application instance.
-                    # Replace the application with something more friendly.
-                    app_id = instance["application_id"]
-                    if app_id in _APPS:
-                        job.append(_APPS[app_id], style=common.APP_STYLE)
-                    else:
-                        job.append(app_id, style=common.APP_STYLE)
-                if "coins" in instance:
-                    coins: Decimal = Decimal(instance["coins"])
-                else:
-                    coins = Decimal()
-                data[f"{row_number}"] = [
-                    instance["id"],
-                    archived,
-                    name,
-                    instance["owner"],
-                    instance["launched"],
-                    instance["phase"],
-                    coins,
-                    str(job),
+        # Populate the table with the rows that can be seen
+        # (sorted on the chosen column).
+        for row_label, row in self.visible_rows():
+            phase: str = row[5]
+            # Identify App/Job for prettier rendering.
+            app_job: List[str] = row[7].split("|")
+            if len(app_job) == 1:
+                # It's an application.
+                app_job_id: Text = Text(app_job[0], style=common.APP_STYLE)
+            else:
+                # It's a job.
+                app_job_id = Text(app_job[0], style=common.JOB_JOB_STYLE)
+                app_job_id.append(" ")
+                app_job_id.append(app_job[1], style=common.JOB_VERSION_STYLE)
+            # Sanitise coins
+            coins: Decimal = common.remove_exponent(row[6])
+            if coins > _ZERO:
+                coins_str: str = humanize.intcomma(str(coins))
+                if "." not in coins_str:
+                    coins_str += ".0"
+            else:
+                coins_str = ""
+            image_type: str = row[8]
+
+            self.table.add_row(
+                row_label,
+                row[0],
+                common.TICK if row[1] else common.CROSS,
+                row[2],
+                row[3],
+                row[4],
+                Text(phase, style=_PHASE_STYLE.get(phase, _DEFAULT_PHASE_STYLE)),
+                coins_str,
+                app_job_id,
+                Text(
                     image_type,
-                ]
-                row_number += 1
-
-        if data:
-            data_frame: pandas.DataFrame = pandas.DataFrame.from_dict(
-                data, orient="index"
+                    style=_IMAGE_TYPE_STYLE.get(image_type, _DEFAULT_IMAGE_TYPE_STYLE),
+                ),
             )
-            for _, row in data_frame.sort_values(
-                by=[self.sort_column], ascending=self.sort_order == SortOrder.ASCENDING
-            ).iterrows():
-                phase: str = row[5]
-                # Identify App/Job for prettier rendering.
-                app_job: List[str] = row[7].split("|")
-                if len(app_job) == 1:
-                    # It's an application.
-                    app_job_id: Text = Text(app_job[0], style=common.APP_STYLE)
-                else:
-                    # It's a job.
-                    app_job_id = Text(app_job[0], style=common.JOB_JOB_STYLE)
-                    app_job_id.append(" ")
-                    app_job_id.append(app_job[1], style=common.JOB_VERSION_STYLE)
-                # Sanitise coins
-                coins = common.remove_exponent(Decimal(row[6]))
-                if coins > _ZERO:
-                    coins_str: str = humanize.intcomma(str(coins))
-                    if "." not in coins_str:
-                        coins_str += ".0"
-                else:
-                    coins_str = ""
-                image_type = row[8]
-
-                self.table.add_row(
-                    str(self.table.row_count + 1),
-                    row[0],
-                    common.TICK if row[1] else common.CROSS,
-                    row[2],
-                    row[3],
-                    row[4],
-                    Text(phase, style=_PHASE_STYLE.get(phase, _DEFAULT_PHASE_STYLE)),
-                    coins_str,
-                    app_job_id,
-                    Text(
-                        image_type,
-                        style=_IMAGE_TYPE_STYLE.get(
-                            image_type, _DEFAULT_IMAGE_TYPE_STYLE
-                        ),
-                    ),
-                )
-
-        title: str = f"Instances ({self.table.row_count})"
+
+        title: str = f"Instances ({len(self.rows)})"
         return Panel(
             self.table,
             title=title,
@@ -1,17 +1,16 @@
 """A widget used to display AS Merchant information.
 """
-from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from datetime import timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
 
-import pandas
 from rich.panel import Panel
 from rich.text import Text
 from rich.style import Style
-from squonk2.as_api import AsApi
+from squonk2.as_api import AsApi, AsApiRv
 
 from squad import common
 from squad.access_token import AccessToken
-from .base import SortOrder, TopicRenderer
+from .base import TopicRenderer
 
 # List of columns using names, styles and justification.
 # some styles are dynamic.
@@ -30,76 +29,75 @@ _MERCHANT_STYLE: Dict[str, Style] = {
 _DEFAULT_MERCHANT_STYLE: Style = Style(color="green4")
 
 
+class MerchantRow(NamedTuple):
+    """A merchant (a table row)."""
+
+    merchant_id: int
+    kind: str
+    created: str
+    hostname: str
+    name: str
+
+
 class Merchants(TopicRenderer):
     """Displays AS assets."""
 
+    api_host = "as"
+
+    # Merchants are identified by their ID
+    key_columns = (0,)
+    # Columns indexed for filtering (as well as the key columns)
+    index_columns = (1,)
+    # Rarely changes
+    min_refresh_interval = timedelta(seconds=30)
+    max_refresh_interval = timedelta(seconds=600)
+
     def __init__(self) -> None:
+        super().__init__()
         # Default sort column
         self.num_columns = len(_COLUMNS)
+        self.column_names = [column[0] for column in _COLUMNS]
         self.sort_column = 1
 
-    def render(self) -> Panel:
-        """Render the widget."""
+    def get_response(self) -> Optional[AsApiRv]:
+        """Gets the merchants (called from a Fetcher worker thread)."""
+        access_token: Optional[str] = AccessToken.get_as_access_token()
+        if not access_token:
+            return None
+        return AsApi.get_merchants(access_token)
 
-        # Time to get projects?
-        now = datetime.now()
-        if (
-            self.last_response_time is None
-            or now - self.last_response_time > self.refresh_interval
-        ):
-            # No response, or we now need to replace what we have.
-            # Get an access token (it may be the one we already have)
-            self.access_token = AccessToken.get_as_access_token(
-                prior_token=self.access_token
+    def extract_rows(self, response: AsApiRv) -> Iterator[MerchantRow]:
+        """Extracts the rows (values) from a merchants response."""
+        for merchant in response.msg["merchants"]:
+            yield MerchantRow(
+                merchant["id"],
+                common.intern_string(merchant["kind"]),
+                merchant["created"],
+                common.intern_string(merchant["api_hostname"]),
+                common.truncate(merchant["name"], common.NAME_LENGTH),
             )
-            self.last_response_time = now
-            if self.access_token:
-                # Got a token, time to get a new set of results...
-                self.last_response = AsApi.get_merchants(self.access_token)
-            else:
-                self.last_response = None
+
+    def render(self) -> Panel:
+        """Render the widget."""
 
         # Results in a table.
         self.prepare_table(_COLUMNS)
         assert self.table
 
-        # Populate rows based on the last response.
-        # We populate 'data' with the project material
-        # so that we can sort on 'launched' date using pandas.
-        data: Dict[str, List[Any]] = {}
-        row_number: int = 1
-        if self.last_response and self.last_response.success:
-            for merchant in self.last_response.msg["merchants"]:
-                data[f"{row_number}"] = [
-                    merchant["id"],
-                    merchant["kind"],
-                    merchant["created"],
-                    merchant["api_hostname"],
-                    common.truncate(merchant["name"], common.NAME_LENGTH),
-                ]
-                row_number += 1
-
-        # Populate rows based on the last response.
-        if data:
-            data_frame: pandas.DataFrame = pandas.DataFrame.from_dict(
-                data, orient="index"
+        # Populate the table with the rows that can be seen
+        # (sorted on the chosen column).
+        for row_label, row in self.visible_rows():
+            kind: str = row[1]
+            self.table.add_row(
+                row_label,
+                str(row[0]),
+                Text(kind, style=_MERCHANT_STYLE.get(kind, _DEFAULT_MERCHANT_STYLE)),
+                row[2],
+                row[3],
+                row[4],
             )
-            for _, row in data_frame.sort_values(
-                by=[self.sort_column], ascending=self.sort_order == SortOrder.ASCENDING
-            ).iterrows():
-                kind: str = row[1]
-                self.table.add_row(
-                    str(self.table.row_count + 1),
-                    str(row[0]),
-                    Text(
-                        kind, style=_MERCHANT_STYLE.get(kind, _DEFAULT_MERCHANT_STYLE)
-                    ),
-                    row[2],
-                    row[3],
-                    row[4],
-                )
-
-        title: str = f"Merchants ({self.table.row_count})"
+
+        title: str = f"Merchants ({len(self.rows)})"
         return Panel(
             self.table,
             title=title,
@@ -1,18 +1,15 @@
 """A widget used to display DM Project information.
 """
-from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Iterator, List, NamedTuple, Optional, Tuple
 
-import humanize
-import pandas
 from rich.panel import Panel
 from rich.style import Style
 
-from squonk2.dm_api import DmApi
+from squonk2.dm_api import DmApi, DmApiRv
 
 from squad import common
 from squad.access_token import AccessToken
-from .base import SortOrder, TopicRenderer
+from .base import TopicRenderer
 
 # List of columns using names, styles and justification (centred by default)
 _COLUMNS: List[Tuple[str, Style, str]] = [
@@ -23,78 +20,73 @@ _COLUMNS: List[Tuple[str, Style, str]] = [
 ]
 
 
+class ProjectRow(NamedTuple):
+    """A project (a table row)."""
+
+    project_id: str
+    name: str
+    owner: str
+    size: int
+
+
 class Projects(TopicRenderer):
     """Displays projects."""
 
+    # Projects are identified by their UUID
+    key_columns = (0,)
+    # Columns indexed for filtering (as well as the key columns)
+    index_columns = (2,)
+
     def __init__(self) -> None:
+        super().__init__()
         # Default sort column
-        self.num_columns = 4
+        self.num_columns = len(_COLUMNS)
+        self.column_names = [column[0] for column in _COLUMNS]
         self.sort_column = 3
 
-    def render(self) -> Panel:
-        """Render the widget."""
+    def get_response(self) -> Optional[DmApiRv]:
+        """Gets the projects (called from a Fetcher worker thread)."""
+        access_token: Optional[str] = AccessToken.get_dm_access_token()
+        if not access_token:
+            return None
+        return DmApi.get_available_projects(access_token)
 
-        # Time to get projects?
-        now = datetime.now()
-        if (
-            self.last_response_time is None
-            or now - self.last_response_time > self.refresh_interval
-        ):
-            # No response, or we now need to replace what we have.
-            # Get an access token (it may be the one we already have)
-            self.access_token = AccessToken.get_dm_access_token(
-                prior_token=self.access_token
+    def extract_rows(self, response: DmApiRv) -> Iterator[ProjectRow]:
+        """Extracts the rows (values) from a projects response."""
+        for project in response.msg["projects"]:
+            yield ProjectRow(
+                project["project_id"],
+                project["name"],
+                common.intern_string(project["owner"]),
+                project["size"],
             )
-            self.last_response_time = now
-            if self.access_token:
-                # Got a token, time to get a new set of results...
-                self.last_response = DmApi.get_available_projects(self.access_token)
-            else:
-                self.last_response = None
+
+    def render(self) -> Panel:
+        """Render the widget."""
+        import humanize  # pylint: disable=import-outside-toplevel
 
         # Results in a table.
         self.prepare_table(_COLUMNS)
         assert self.table
 
-        # Populate rows based on the last response.
-        # We populate 'data' with the project material
-        # so that we can sort of size using pandas.
-        data: Dict[str, List[Any]] = {}
-        total_size_bytes: int = 0
-        row_number: int = 1
-        if self.last_response and self.last_response.success:
-            for project in self.last_response.msg["projects"]:
-                total_size_bytes += project["size"]
-                data[f"{row_number}"] = [
-                    project["project_id"],
-                    project["name"],
-                    project["owner"],
-                    project["size"],
-                ]
-                row_number += 1
-
-        # Now sort the data by size (descending)
-        # and then iterate through the results.
-        if data:
-            data_frame: pandas.DataFrame = pandas.DataFrame.from_dict(
-                data, orient="index"
+        # Populate the table with the rows that can be seen
+        # (sorted on the chosen column).
+        for row_label, row in self.visible_rows():
+            size_str: str = ""
+            if row[3] > 0:
+                size_str = humanize.naturalsize(row[3], binary=True)
+            self.table.add_row(
+                row_label,
+                row[0],
+                common.truncate(row[1], common.NAME_LENGTH),
+                row[2],
+                size_str,
             )
-            for _, row in data_frame.sort_values(
-                by=[self.sort_column], ascending=self.sort_order == SortOrder.ASCENDING
-            ).iterrows():
-                size_str: str = ""
-                if row[3] > 0:
-                    size_str = humanize.naturalsize(row[3], binary=True)
-                self.table.add_row(
-                    str(self.table.row_count + 1),
-                    row[0],
-                    common.truncate(row[1], common.NAME_LENGTH),
-                    row[2],
-                    size_str,
-                )
 
+        # The total size is of all the rows (not just those we can see)
+        total_size_bytes: int = sum(self.rows.column(3))
         total_size_human: str = humanize.naturalsize(total_size_bytes, binary=True)
-        title: str = f"Projects ({self.table.row_count}) [{total_size_human}]"
+        title: str = f"Projects ({len(self.rows)}) [{total_size_human}]"
         return Panel(
             self.table,
             title=title,
@@ -0,0 +1,74 @@
+"""The topic renderers, created when they're first used.
+
+Importing every topic's module (and what they import) and creating every
+renderer adds to the time SquAd takes to start, for topics the user may
+never look at. The registry only knows each topic's module and class,
+the module is imported (and the renderer created) the first time
+the topic's renderer is needed. For the same reason the topics import
+'humanize' in the functions that use it.
+"""
+import importlib
+import threading
+from typing import Dict, Iterator, Mapping, Optional, Tuple, Type
+
+from .base import TopicRenderer
+
+# The module (in this package) and class of each topic's renderer
+_TOPICS: Dict[str, Tuple[str, str]] = {
+    "assets": ("assets", "Assets"),
+    "datasets": ("datasets", "Datasets"),
+    "defined-exchange-rates": ("defined_exchange_rates", "DefinedExchangeRates"),
+    "diagnostics": ("diagnostics", "Diagnostics"),
+    "instances": ("instances", "Instances"),
+    "tasks": ("tasks", "Tasks"),
+    "merchants": ("merchants", "Merchants"),
+    "products": ("products", "Products"),
+    "projects": ("projects", "Projects"),
+    "personal-units": ("personal_units", "PersonalUnits"),
+    "service-errors": ("service_errors", "ServiceErrors"),
+    "undefined-exchange-rates": ("undefined_exchange_rates", "UndefinedExchangeRates"),
+    "units": ("units", "Units"),
+}
+
+
+def renderer_class(topic: str) -> Type[TopicRenderer]:
+    """Returns the renderer class of a topic (importing its module).
+    A KeyError is raised if the topic is not known.
+    """
+    module_name, class_name = _TOPICS[topic]
+    module = importlib.import_module(f"{__package__}.{module_name}")
+    cls: Type[TopicRenderer] = getattr(module, class_name)
+    return cls
+
+
+class TopicRegistry(Mapping[str, TopicRenderer]):
+    """The renderer of each topic, indexed by topic name.
+    Each renderer is created the first time it's used. Iterating over
+    the registry (or asking if it has a topic) does not create any.
+    """
+
+    def __init__(self) -> None:
+        self._renderers: Dict[str, TopicRenderer] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def __getitem__(self, topic: str) -> TopicRenderer:
+        renderer: Optional[TopicRenderer] = self._renderers.get(topic)
+        if renderer is None:
+            with self._lock:
+                if topic not in self._renderers:
+                    self._renderers[topic] = renderer_class(topic)()
+                renderer = self._renderers[topic]
+        return renderer
+
+    def __contains__(self, topic: object) -> bool:
+        return topic in _TOPICS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_TOPICS)
+
+    def __len__(self) -> int:
+        return len(_TOPICS)
+
+    def is_loaded(self, topic: str) -> bool:
+        """True if the topic's renderer has been created."""
+        return topic in self._renderers
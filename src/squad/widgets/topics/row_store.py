@@ -0,0 +1,351 @@
+"""The store of a topic's table rows, which are sorted and filtered
+(without changing the rows themselves).
+"""
+import re
+import time
+from bisect import bisect_left
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+# A table row, one value for each of a topic's columns.
+# Topics use their own (compact) NamedTuple for their rows.
+Row = Sequence[Any]
+
+
+class SortOrder(Enum):
+    """The sort order for a table."""
+
+    ASCENDING = 1
+    DESCENDING = 2
+
+
+# Sort key 'ranks' for the different types of value we find in a column.
+# Values of different types are ordered by rank (None first)
+# so mixed columns can always be sorted.
+_NONE_RANK: int = 0
+_NUMBER_RANK: int = 1
+_STRING_RANK: int = 2
+_DATE_RANK: int = 3
+_OTHER_RANK: int = 4
+
+
+def sort_key(value: Any) -> Tuple[int, Any]:
+    """Returns the sort key for a value. Numbers (including Decimal and bool),
+    strings and dates are compared using their own (exact) values.
+    """
+    if value is None:
+        return _NONE_RANK, 0
+    if isinstance(value, (bool, int, float, Decimal)):
+        return _NUMBER_RANK, value
+    if isinstance(value, str):
+        return _STRING_RANK, value
+    if isinstance(value, (date, datetime)):
+        return _DATE_RANK, value
+    return _OTHER_RANK, str(value)
+
+
+# A sort column and its order
+SortSpec = Tuple[int, "SortOrder"]
+
+# A filter term, the column it applies to (None for any column)
+# and the (lower-case) text to find.
+FilterTerm = Tuple[Optional[int], str]
+
+
+def parse_filter(query: str, column_names: List[str]) -> List[FilterTerm]:
+    """Parses a filter query into its terms. Terms are separated by spaces
+    and a row must match every term. A 'field-qualified' term
+    (like 'owner:alan') matches rows whose value in the named column
+    starts with the text (ignoring case). The field is a column name
+    (ignoring case, spaces and punctuation) or the start of one.
+    Any other term matches rows that contain the text in any column.
+    """
+    names: List[str] = [re.sub(r"[^a-z0-9]", "", name.lower()) for name in column_names]
+    terms: List[FilterTerm] = []
+    for term in query.lower().split():
+        field, _, text = term.partition(":")
+        column: Optional[int] = None
+        if text and field:
+            if field in names:
+                column = names.index(field)
+            else:
+                column = next(
+                    (
+                        index
+                        for index, name in enumerate(names)
+                        if name.startswith(field)
+                    ),
+                    None,
+                )
+        if column is None:
+            terms.append((None, term))
+        else:
+            terms.append((column, text))
+    return terms
+
+
+def _filter_value(value: Any) -> str:
+    """Returns the (lower-case) text filters compare with a value."""
+    return "" if value is None else str(value).lower()
+
+
+class RowStore:
+    """A lightweight store of table rows (sequences of column values).
+    Values are kept as they are (i.e. Decimals are not turned into floats).
+    Sort keys for a column are computed once, the first time the column is sorted,
+    and the resultant order is kept until a different order is needed.
+    Rows can be sorted by more than one column. If just the order of the first
+    column changes the kept order is reversed (rather than sorting again).
+
+    Rows are identified by the values in their 'key columns' so that rows
+    can be merged into the store (replacing rows with the same key).
+    Without key columns every row is distinct. The store's 'version'
+    changes whenever its rows change, merging rows that are equal to those
+    we already have changes nothing. The time rows change can be recorded.
+
+    Rows can be selected using filter terms (see select()). The key columns
+    (and any other 'index columns') have an inverted index, a sorted list
+    of their (lower-case) values, so that terms for those columns are found
+    without looking at every row. Like sort keys, indexes are built when
+    they're first needed and kept until the rows change.
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Row] = (),
+        *,
+        key_columns: Tuple[int, ...] = (),
+        index_columns: Tuple[int, ...] = (),
+    ) -> None:
+        self.key_columns: Tuple[int, ...] = key_columns
+        self.index_columns: Tuple[int, ...] = key_columns + index_columns
+        self.version: int = 0
+        # Rows, indexed by key (in insertion order)
+        self._rows: Dict[Hashable, Row] = {}
+        # The key of the next row when there are no key columns
+        self._next_index: int = 0
+        # The time (monotonic) rows changed, indexed by key,
+        # and the time of the most recent change.
+        self._change_times: Dict[Hashable, float] = {}
+        self.last_change_time: float = 0.0
+        # The rows (as a list), built when needed
+        self._row_list: Optional[List[Row]] = None
+        # Sort keys, indexed by column
+        self._sort_keys: Dict[int, List[Tuple[int, Any]]] = {}
+        # The most recent sort (columns and orders), the resultant order
+        # (of row positions) and the sorted rows
+        self._sorted: Optional[Tuple[Tuple[SortSpec, ...], List[int], List[Row]]] = None
+        # Inverted indexes, sorted lists of the (lower-case) values of an
+        # indexed column and the position of each row, indexed by column
+        self._indexes: Dict[int, List[Tuple[str, int]]] = {}
+        # The (lower-case) text of each row, searched by terms for any column
+        self._row_text: Optional[List[str]] = None
+        self.merge(rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def rows(self) -> List[Row]:
+        """The rows (in insertion order)."""
+        if self._row_list is None:
+            self._row_list = list(self._rows.values())
+        return self._row_list
+
+    def column(self, column: int) -> Iterator[Any]:
+        """Returns the values in the given column (in insertion order)."""
+        for row in self.rows:
+            yield row[column]
+
+    def merge(
+        self, rows: Iterable[Row], *, record_changes: bool = False
+    ) -> Set[Hashable]:
+        """Adds rows to the store, replacing any existing rows
+        with the same key (unless they're equal). If 'record_changes' is set
+        the time new and changed rows were merged is recorded.
+        The keys of the merged rows are returned.
+        """
+        keys: Set[Hashable] = set()
+        changed: bool = False
+        now: float = time.monotonic()
+        for row in rows:
+            key: Hashable = self.key(row)
+            keys.add(key)
+            if self._rows.get(key) == row:
+                continue
+            self._rows[key] = row
+            changed = True
+            if record_changes:
+                self._change_times[key] = now
+                self.last_change_time = now
+        if changed:
+            self._changed()
+        return keys
+
+    def key(self, row: Row) -> Hashable:
+        """Returns the key of a row (a new key if there are no key columns)."""
+        if self.key_columns:
+            return tuple(row[column] for column in self.key_columns)
+        self._next_index += 1
+        return self._next_index
+
+    def changed_since(self, row: Row, since: float) -> bool:
+        """True if the (keyed) row changed after the given (monotonic) time."""
+        if not self.key_columns:
+            return False
+        return self._change_times.get(self.key(row), 0.0) > since
+
+    def retain(self, keys: Set[Hashable]) -> None:
+        """Removes every row whose key is not one of those given."""
+        unwanted: List[Hashable] = [key for key in self._rows if key not in keys]
+        for key in unwanted:
+            del self._rows[key]
+            self._change_times.pop(key, None)
+        if unwanted:
+            self._changed()
+
+    def select(self, terms: List[FilterTerm]) -> Set[int]:
+        """Returns the positions (in rows) of the rows that match
+        every filter term (see parse_filter()).
+        """
+        rows: List[Row] = self.rows
+        positions: Optional[Set[int]] = None
+        unindexed_terms: List[FilterTerm] = []
+        for column, text in terms:
+            if column is not None and column in self.index_columns:
+                matches: Set[int] = self._find_prefix(column, text)
+                positions = matches if positions is None else positions & matches
+            else:
+                unindexed_terms.append((column, text))
+        if not unindexed_terms:
+            return set(range(len(rows))) if positions is None else positions
+        if any(column is None for column, _ in unindexed_terms):
+            if self._row_text is None:
+                self._row_text = [
+                    "\0".join(_filter_value(value) for value in row) for row in rows
+                ]
+        candidates: Iterable[int] = range(len(rows)) if positions is None else positions
+        selected: Set[int] = set()
+        for position in candidates:
+            for column, text in unindexed_terms:
+                if column is None:
+                    assert self._row_text is not None
+                    if text not in self._row_text[position]:
+                        break
+                elif not _filter_value(rows[position][column]).startswith(text):
+                    break
+            else:
+                selected.add(position)
+        return selected
+
+    def _find_prefix(self, column: int, text: str) -> Set[int]:
+        """Returns the positions of the rows whose value in an indexed column
+        starts with the given (lower-case) text, using the column's index.
+        """
+        if column not in self._indexes:
+            self._indexes[column] = sorted(
+                (_filter_value(row[column]), position)
+                for position, row in enumerate(self.rows)
+            )
+        index: List[Tuple[str, int]] = self._indexes[column]
+        positions: Set[int] = set()
+        for entry in range(bisect_left(index, (text, -1)), len(index)):
+            value, position = index[entry]
+            if not value.startswith(text):
+                break
+            positions.add(position)
+        return positions
+
+    def sort(
+        self,
+        column: int,
+        order: SortOrder,
+        positions: Optional[Set[int]] = None,
+        *,
+        then_by: Sequence[SortSpec] = (),
+    ) -> List[Row]:
+        """Returns the rows sorted by the given column and order, then by
+        any further columns (and their orders), optionally just the rows
+        at the given positions (see select()). The sort is stable.
+        """
+        specs: Tuple[SortSpec, ...] = ((column, order),) + tuple(
+            spec for spec in then_by if spec[0] != column
+        )
+        if self._sorted is None or self._sorted[0] != specs:
+            if (
+                self._sorted
+                and self._sorted[0][0][0] == column
+                and self._sorted[0][1:] == specs[1:]
+            ):
+                # Just the order of the first column has changed
+                self._reverse(specs)
+            else:
+                self._sort(specs)
+        assert self._sorted
+        if positions is None:
+            return self._sorted[2]
+        rows: List[Row] = self.rows
+        return [rows[index] for index in self._sorted[1] if index in positions]
+
+    def _column_sort_keys(self, column: int) -> List[Tuple[int, Any]]:
+        """Returns the sort keys for a column (computing them if necessary)."""
+        if column not in self._sort_keys:
+            self._sort_keys[column] = [sort_key(row[column]) for row in self.rows]
+        return self._sort_keys[column]
+
+    def _sort(self, specs: Tuple[SortSpec, ...]) -> None:
+        """Sorts the rows (by columns and orders), keeping the result.
+        The rows are sorted by each column in turn (last column first),
+        relying on each sort being stable.
+        """
+        rows: List[Row] = self.rows
+        indices: List[int] = list(range(len(rows)))
+        for column, order in reversed(specs):
+            indices.sort(
+                key=self._column_sort_keys(column).__getitem__,
+                reverse=order == SortOrder.DESCENDING,
+            )
+        self._sorted = specs, indices, [rows[index] for index in indices]
+
+    def _reverse(self, specs: Tuple[SortSpec, ...]) -> None:
+        """Re-orders the kept sort when just the order of its first column
+        has changed. The kept order is reversed and then each run of rows
+        with the same first-column value is reversed again, which keeps
+        the (stable) order of those rows.
+        """
+        assert self._sorted
+        rows: List[Row] = self.rows
+        keys: List[Tuple[int, Any]] = self._column_sort_keys(specs[0][0])
+        reversed_indices: List[int] = self._sorted[1][::-1]
+        indices: List[int] = []
+        run_start: int = 0
+        for position in range(1, len(reversed_indices) + 1):
+            if (
+                position == len(reversed_indices)
+                or keys[reversed_indices[position]] != keys[reversed_indices[run_start]]
+            ):
+                indices.extend(reversed(reversed_indices[run_start:position]))
+                run_start = position
+        self._sorted = specs, indices, [rows[index] for index in indices]
+
+    def _changed(self) -> None:
+        """Called when the rows change, discarding anything derived from them."""
+        self.version += 1
+        self._row_list = None
+        self._sort_keys = {}
+        self._sorted = None
+        self._indexes = {}
+        self._row_text = None
@@ -1,16 +1,14 @@
 """A textual widget used to display DM Service Errors.
 """
-from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Iterator, List, NamedTuple, Optional, Tuple
 
-import pandas
 from rich.panel import Panel
 from rich.style import Style
-from squonk2.dm_api import DmApi
+from squonk2.dm_api import DmApi, DmApiRv
 
 from squad import common
 from squad.access_token import AccessToken
-from .base import SortOrder, TopicRenderer
+from .base import TopicRenderer
 
 # List of columns using names, styles and justification.
 # some styles are dynamic.
@@ -22,71 +20,66 @@ _COLUMNS: List[Tuple[str, Style, str]] = [
 ]
 
 
+class ServiceErrorRow(NamedTuple):
+    """A service error (a table row)."""
+
+    error_id: int
+    created: str
+    severity: str
+    summary: str
+
+
 class ServiceErrors(TopicRenderer):
     """Displays service errors."""
 
+    # Service errors are identified by their ID
+    key_columns = (0,)
+    # Columns indexed for filtering (as well as the key columns)
+    index_columns = (2,)
+
     def __init__(self) -> None:
+        super().__init__()
         # Default sort column
         self.num_columns = len(_COLUMNS)
+        self.column_names = [column[0] for column in _COLUMNS]
         self.sort_column = 1
 
-    def render(self) -> Panel:
-        """Render the widget."""
+    def get_response(self) -> Optional[DmApiRv]:
+        """Gets the service errors (called from a Fetcher worker thread)."""
+        access_token: Optional[str] = AccessToken.get_dm_access_token()
+        if not access_token:
+            return None
+        return DmApi.get_service_errors(access_token)
 
-        # Time to get exchange rates?
-        now = datetime.now()
-        if (
-            self.last_response_time is None
-            or now - self.last_response_time > self.refresh_interval
-        ):
-            # No response, or we now need to replace what we have.
-            # Get an access token (it may be the one we already have)
-            self.access_token = AccessToken.get_dm_access_token(
-                prior_token=self.access_token
+    def extract_rows(self, response: DmApiRv) -> Iterator[ServiceErrorRow]:
+        """Extracts the rows (values) from a service errors response."""
+        for error in response.msg["service_errors"]:
+            yield ServiceErrorRow(
+                error["id"],
+                error["created"],
+                common.intern_string(error["severity"]),
+                common.intern_string(error["summary"]),
             )
-            self.last_response_time = now
-            if self.access_token:
-                # Got a token, time to get a new set of results.
-                self.last_response = DmApi.get_service_errors(self.access_token)
-            else:
-                self.last_response = None
+
+    def render(self) -> Panel:
+        """Render the widget."""
 
         # Results in a table.
         self.prepare_table(_COLUMNS)
         assert self.table
 
-        # Populate rows based on the last response.
-        # We populate 'data' with the project material
-        # so that we can sort on 'launched' date using pandas.
-        data: Dict[str, List[Any]] = {}
-        row_number: int = 1
-        if self.last_response and self.last_response.success:
-            for error in self.last_response.msg["service_errors"]:
-                data[f"{row_number}"] = [
-                    error["id"],
-                    error["created"],
-                    error["severity"],
-                    error["summary"],
-                ]
-                row_number += 1
-
-        # Populate rows based on the last response.
-        if data:
-            data_frame: pandas.DataFrame = pandas.DataFrame.from_dict(
-                data, orient="index"
+        # Populate the table with the rows that can be seen
+        # (sorted on the chosen column).
+        for row_label, row in self.visible_rows():
+            self.table.add_row(
+                row_label,
+                str(row[0]),
+                row[1],
+                row[2],
+                row[3],
             )
-            for _, row in data_frame.sort_values(
-                by=[self.sort_column], ascending=self.sort_order == SortOrder.ASCENDING
-            ).iterrows():
-                self.table.add_row(
-                    str(self.table.row_count + 1),
-                    str(row[0]),
-                    row[1],
-                    row[2],
-                    row[3],
-                )
-
-        title: str = f"Service errors ({self.table.row_count})"
+
+        title: str = f"Service errors ({len(self.rows)})"
         return Panel(
             self.table,
             title=title,
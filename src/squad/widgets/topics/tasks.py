@@ -1,9 +1,19 @@
 """A widget used to display DM Task information.
 """
-from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from datetime import timedelta
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
-import pandas
 from rich.panel import Panel
 from rich.style import Style
 from rich.text import Text
@@ -12,7 +22,7 @@ from squonk2.dm_api import DmApi, DmApiRv
 
 from squad import common
 from squad.access_token import AccessToken
-from .base import SortOrder, TopicRenderer
+from .base import StreamedRv, TopicRenderer
 
 # List of columns using names, styles and justification
 _COLUMNS: List[Tuple[str, Style, str]] = [
@@ -39,99 +49,129 @@ _DEFAULT_PURPOSE_STYLE: Style = Style(color="yellow3")
 _UNSET_EXIT_CODE: int = -999_999_999
 
 
+class TaskRow(NamedTuple):
+    """A task (a table row)."""
+
+    task_id: str
+    created: str
+    purpose: str
+    purpose_id: str
+    purpose_version: int
+    done: bool
+    exit_code: int
+    removal: bool
+
+
 class Tasks(TopicRenderer):
-    """Displays tasks."""
+    """Displays tasks. When there are no tasks (rows) the tasks are loaded
+    in two pages, the tasks that are not done (normally a short list)
+    followed by all the tasks. Thereafter we simply get all the tasks.
+    """
+
+    # Tasks are identified by their UUID
+    key_columns = (0,)
+    # Columns indexed for filtering (as well as the key columns)
+    index_columns = (2, 3)
+    # The response's array of records (see get_streamed_response())
+    stream_key = "tasks"
+    # Changes often
+    min_refresh_interval = timedelta(seconds=5)
+    max_refresh_interval = timedelta(seconds=60)
 
     def __init__(self) -> None:
+        super().__init__()
         # Default sort column
         self.num_columns = len(_COLUMNS)
+        self.column_names = [column[0] for column in _COLUMNS]
         self.sort_column = 1
 
+    def get_num_pages(self) -> int:
+        """Two pages until we've loaded the tasks, then one."""
+        return 1 if self.rows_loaded else 2
+
+    def get_responses(self) -> Iterator[Optional[Union[DmApiRv, StreamedRv]]]:
+        """Gets all the tasks, preceded (if we've not loaded the tasks)
+        by those that are not done (called from a Fetcher worker thread).
+        """
+        if not self.rows_loaded:
+            yield self.get_response(exclude_done=True)
+        yield self.get_response()
+
+    def get_response(
+        self, exclude_done: bool = False
+    ) -> Optional[Union[DmApiRv, StreamedRv]]:
+        """Gets the tasks (called from a Fetcher worker thread)."""
+        access_token: Optional[str] = AccessToken.get_dm_access_token()
+        if not access_token:
+            return None
+        function: Callable[[str], Union[DmApiRv, StreamedRv]] = partial(
+            DmApi.get_available_tasks, exclude_done=exclude_done
+        )
+        if self.stream_responses:
+            function = partial(
+                self.get_streamed_response,
+                "/task",
+                params={"exclude_done": True} if exclude_done else None,
+            )
+        return self.get_admin_response(function, access_token)
+
+    def extract_rows(self, response: DmApiRv) -> Iterator[TaskRow]:
+        """Extracts the rows (values) from a tasks response."""
+        for task in response.msg["tasks"]:
+            yield from self.record_rows(task)
+
+    def record_rows(self, record: Dict[str, Any]) -> Iterator[TaskRow]:
+        """Returns the row for a task."""
+        yield TaskRow(
+            record["id"],
+            record["created"],
+            common.intern_string(record["purpose"]),
+            common.intern_string(record["purpose_id"]),
+            record.get("purpose_version", 0),
+            record.get("done", False),
+            record.get("exit_code", _UNSET_EXIT_CODE),
+            record.get("removal", False),
+        )
+
     def render(self) -> Panel:
         """Render the widget."""
 
-        # Time to get projects?
-        now = datetime.now()
-        if (
-            self.last_response_time is None
-            or now - self.last_response_time > self.refresh_interval
-        ):
-            # No response, or we now need to replace what we have.
-            # Get an access token (it may be the one we already have)
-            self.access_token = AccessToken.get_dm_access_token(
-                prior_token=self.access_token
-            )
-            self.last_response_time = now
-            if self.access_token:
-
-                # Got a token, time to get a new set of results...
-                set_admin_response: DmApiRv = DmApi.set_admin_state(
-                    self.access_token, admin=True
-                )
-                if set_admin_response.success:
-                    self.last_response = DmApi.get_available_tasks(self.access_token)
-            else:
-                self.last_response = None
-
         # Results in a table.
         self.prepare_table(_COLUMNS)
         assert self.table
 
-        # Populate rows based on the last response.
-        # We populate 'data' with the project material
-        # so that we can sort on 'created' date using pandas.
-        data: Dict[str, List[Any]] = {}
-        row_number: int = 1
-        if self.last_response and self.last_response.success:
-            for task in self.last_response.msg["tasks"]:
-                data[f"{row_number}"] = [
-                    task["id"],
-                    task["created"],
-                    task["purpose"],
-                    task["purpose_id"],
-                    task.get("purpose_version", 0),
-                    task.get("done", False),
-                    task.get("exit_code", _UNSET_EXIT_CODE),
-                    task.get("removal", False),
-                ]
-                row_number += 1
-
-        if data:
-            data_frame: pandas.DataFrame = pandas.DataFrame.from_dict(
-                data, orient="index"
+        # Populate the table with the rows that can be seen
+        # (sorted on the chosen column).
+        for row_label, row in self.visible_rows():
+            purpose: str = row[2]
+            # Render exit code.
+            # Green or red.
+            # But cater for unset codes.
+            exit_code: int = row[6]
+            exit_code_str = str(exit_code)
+            exit_code_style: Style = Style(color="green1")
+            if exit_code == _UNSET_EXIT_CODE:
+                exit_code_str = "-"
+                exit_code_style = Style(color="bright_black")
+            elif exit_code != 0:
+                exit_code_style = Style(color="bright_red", reverse=True)
+            # Populate the row...
+            self.table.add_row(
+                row_label,
+                row[0],
+                row[1],
+                Text(
+                    purpose,
+                    style=_PURPOSE_STYLE.get(purpose, _DEFAULT_PURPOSE_STYLE),
+                ),
+                row[3],
+                str(row[4]) if row[4] else "",
+                common.TICK if row[5] else common.CROSS,
+                Text(exit_code_str, style=exit_code_style),
+                common.TICK if row[7] else common.CROSS,
             )
-            for _, row in data_frame.sort_values(
-                by=[self.sort_column], ascending=self.sort_order == SortOrder.ASCENDING
-            ).iterrows():
-                purpose: str = row[2]
-                # Render exit code.
-                # Green or red.
-                # But cater for unset codes.
-                exit_code: int = row[6]
-                exit_code_str = str(exit_code)
-                exit_code_style: Style = Style(color="green1")
-                if exit_code == _UNSET_EXIT_CODE:
-                    exit_code_str = "-"
-                    exit_code_style = Style(color="bright_black")
-                elif exit_code != 0:
-                    exit_code_style = Style(color="bright_red", reverse=True)
-                # Populate the row...
-                self.table.add_row(
-                    str(self.table.row_count + 1),
-                    row[0],
-                    row[1],
-                    Text(
-                        purpose,
-                        style=_PURPOSE_STYLE.get(purpose, _DEFAULT_PURPOSE_STYLE),
-                    ),
-                    row[3],
-                    str(row[4]) if row[4] else "",
-                    common.TICK if row[5] else common.CROSS,
-                    Text(exit_code_str, style=exit_code_style),
-                    common.TICK if row[7] else common.CROSS,
-                )
-
-        title: str = f"Tasks ({self.table.row_count})"
+
+        title: str = f"Tasks ({len(self.rows)})"
         return Panel(
             self.table,
             title=title,
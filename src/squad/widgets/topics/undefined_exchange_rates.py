@@ -1,16 +1,15 @@
 """A textual widget used to display DM Exchange Rate information.
 """
-from datetime import datetime
-from typing import Dict, List, Tuple
+from datetime import timedelta
+from typing import Iterator, List, NamedTuple, Optional, Tuple
 
-import pandas
 from rich.panel import Panel
 from rich.style import Style
-from squonk2.dm_api import DmApi
+from squonk2.dm_api import DmApi, DmApiRv
 
 from squad import common
 from squad.access_token import AccessToken
-from .base import SortOrder, TopicRenderer
+from .base import TopicRenderer
 
 # List of columns using names, styles and justification
 _COLUMNS: List[Tuple[str, Style, str]] = [
@@ -20,69 +19,64 @@ _COLUMNS: List[Tuple[str, Style, str]] = [
 ]
 
 
+class UndefinedExchangeRateRow(NamedTuple):
+    """A job without an exchange rate (a table row)."""
+
+    collection: str
+    job: str
+    version: str
+
+
 class UndefinedExchangeRates(TopicRenderer):
     """Displays Job Exchange Rates that have no exchange rate."""
 
+    # Rates are identified by their collection, job and version
+    key_columns = (0, 1, 2)
+    # Rarely changes
+    min_refresh_interval = timedelta(seconds=30)
+    max_refresh_interval = timedelta(seconds=600)
+
     def __init__(self) -> None:
+        super().__init__()
         # Default sort column
         self.num_columns = len(_COLUMNS)
+        self.column_names = [column[0] for column in _COLUMNS]
         self.sort_column = 0
 
-    def render(self) -> Panel:
-        """Render the widget."""
+    def get_response(self) -> Optional[DmApiRv]:
+        """Gets the exchange rates (called from a Fetcher worker thread)."""
+        access_token: Optional[str] = AccessToken.get_dm_access_token()
+        if not access_token:
+            return None
+        return DmApi.get_job_exchange_rates(access_token, only_undefined=True)
 
-        # Time to get exchange rates?
-        now = datetime.now()
-        if (
-            self.last_response_time is None
-            or now - self.last_response_time > self.refresh_interval
-        ):
-            # No response, or we now need to replace what we have.
-            # Get an access token (it may be the one we already have)
-            self.access_token = AccessToken.get_dm_access_token(
-                prior_token=self.access_token
+    def extract_rows(self, response: DmApiRv) -> Iterator[UndefinedExchangeRateRow]:
+        """Extracts the rows (values) from an exchange rate response."""
+        for e_rate in response.msg["exchange_rates"]:
+            yield UndefinedExchangeRateRow(
+                common.intern_string(e_rate["collection"]),
+                e_rate["job"],
+                common.intern_string(e_rate["version"]),
             )
-            self.last_response_time = now
-            if self.access_token:
-                # Got a token, time to get a new set of results.
-                self.last_response = DmApi.get_job_exchange_rates(
-                    self.access_token, only_undefined=True
-                )
-            else:
-                self.last_response = None
+
+    def render(self) -> Panel:
+        """Render the widget."""
 
         # Results in a table.
         self.prepare_table(_COLUMNS)
         assert self.table
 
-        # Use pandas to sort results by collection and job.
-        data: Dict[str, List[str]] = {}
-        row_number: int = 1
-        if self.last_response and self.last_response.success:
-            for e_rate in self.last_response.msg["exchange_rates"]:
-                data[f"{row_number}"] = [
-                    e_rate["collection"],
-                    e_rate["job"],
-                    e_rate["version"],
-                ]
-                row_number += 1
-
-        # Populate rows based on the last response.
-        if data:
-            data_frame: pandas.DataFrame = pandas.DataFrame.from_dict(
-                data, orient="index"
+        # Populate the table with the rows that can be seen
+        # (sorted on the chosen column).
+        for row_label, row in self.visible_rows():
+            self.table.add_row(
+                row_label,
+                row[0],
+                row[1],
+                row[2],
             )
-            for _, row in data_frame.sort_values(
-                by=[self.sort_column], ascending=self.sort_order == SortOrder.ASCENDING
-            ).iterrows():
-                self.table.add_row(
-                    str(self.table.row_count + 1),
-                    row[0],
-                    row[1],
-                    row[2],
-                )
-
-        title: str = f"Undefined exchange rates ({self.table.row_count})"
+
+        title: str = f"Undefined exchange rates ({len(self.rows)})"
         return Panel(
             self.table,
             title=title,
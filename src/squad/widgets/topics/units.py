@@ -1,17 +1,16 @@
 """A widget used to display AS Unit information.
 """
-from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Iterator, List, NamedTuple, Optional, Tuple
 
-import pandas
 from rich.panel import Panel
 from rich.style import Style
 
-from squonk2.as_api import AsApi
+from squonk2.as_api import AsApi, AsApiRv
 
 from squad import common
 from squad.access_token import AccessToken
-from .base import SortOrder, TopicRenderer
+from squad.response_cache import ResponseCache
+from .base import TopicRenderer
 
 # List of columns using names, styles and justification.
 # some styles are dynamic.
@@ -25,82 +24,85 @@ _COLUMNS: List[Tuple[str, Style, str]] = [
 ]
 
 
+class UnitRow(NamedTuple):
+    """An organisational unit (a table row)."""
+
+    organisation: str
+    unit_id: str
+    name: str
+    owner: str
+    created: str
+    private: bool
+
+
 class Units(TopicRenderer):
     """Displays AS Units (and their organisations).
     This does not include 'personal units'
     """
 
+    api_host = "as"
+
+    # Units are identified by their UUID
+    key_columns = (1,)
+    # Columns indexed for filtering (as well as the key columns)
+    index_columns = (0, 3)
+
     def __init__(self) -> None:
+        super().__init__()
         # Default sort column
         self.num_columns = len(_COLUMNS)
+        self.column_names = [column[0] for column in _COLUMNS]
         self.sort_column = 4
 
+    def get_response(self) -> Optional[AsApiRv]:
+        """Gets the units (called from a Fetcher worker thread)."""
+        access_token: Optional[str] = AccessToken.get_as_access_token()
+        if not access_token:
+            return None
+        # Units are shared with another topic
+        # so we use the response cache to avoid a duplicate request.
+        return ResponseCache.get(
+            AsApi.get_available_units, access_token, ttl=self.refresh_interval
+        )
+
+    def extract_rows(self, response: AsApiRv) -> Iterator[UnitRow]:
+        """Extracts the rows (values) from a units response."""
+        for unit in response.msg["units"]:
+            unit_org: str = unit["organisation"]["name"]
+            # Skip units in the Default organisation
+            if unit_org == "Default":
+                continue
+            for org_unit in unit["units"]:
+                yield UnitRow(
+                    common.intern_string(unit_org),
+                    org_unit["id"],
+                    org_unit["name"],
+                    common.intern_string(org_unit["owner_id"]),
+                    org_unit["created"],
+                    org_unit["private"],
+                )
+
     def render(self) -> Panel:
         """Render the widget."""
 
-        # Time to get projects?
-        now = datetime.now()
-        if (
-            self.last_response_time is None
-            or now - self.last_response_time > self.refresh_interval
-        ):
-            # No response, or we now need to replace what we have.
-            # Get an access token (it may be the one we already have)
-            self.access_token = AccessToken.get_as_access_token(
-                prior_token=self.access_token
-            )
-            self.last_response_time = now
-            if self.access_token:
-                # Got a token, time to get a new set of results...
-                self.last_response = AsApi.get_available_units(self.access_token)
-            else:
-                self.last_response = None
-
         # Results in a table.
         self.prepare_table(_COLUMNS)
         assert self.table
 
-        # Populate rows based on the last response.
-        # We populate 'data' with the project material
-        # so that we can sort on 'launched' date using pandas.
-        data: Dict[str, List[Any]] = {}
-        row_number: int = 1
-        if self.last_response and self.last_response.success:
-            for unit in self.last_response.msg["units"]:
-                unit_org: str = unit["organisation"]["name"]
-                # Skip units in the Default organisation
-                if unit_org == "Default":
-                    continue
-                for org_unit in unit["units"]:
-                    data[f"{row_number}"] = [
-                        unit_org,
-                        org_unit["id"],
-                        org_unit["name"],
-                        org_unit["owner_id"],
-                        org_unit["created"],
-                        org_unit["private"],
-                    ]
-                    row_number += 1
-
-        # Populate rows based on the last response.
-        if data:
-            data_frame: pandas.DataFrame = pandas.DataFrame.from_dict(
-                data, orient="index"
+        # Populate the table with the rows that can be seen
+        # (sorted on the chosen column).
+        for row_label, row in self.visible_rows():
+            self.table.add_row(
+                row_label,
+                common.truncate(row[0], common.NAME_LENGTH),
+                row[1],
+                common.truncate(row[2], common.NAME_LENGTH),
+                row[3],
+                row[4],
+                common.TICK if row[5] else common.CROSS,
             )
-            for _, row in data_frame.sort_values(
-                by=[self.sort_column], ascending=self.sort_order == SortOrder.ASCENDING
-            ).iterrows():
-                self.table.add_row(
-                    str(self.table.row_count + 1),
-                    common.truncate(row[0], common.NAME_LENGTH),
-                    row[1],
-                    common.truncate(row[2], common.NAME_LENGTH),
-                    row[3],
-                    row[4],
-                    common.TICK if row[5] else common.CROSS,
-                )
 
-        title: str = f"Orgs/Units ({self.table.row_count})"
+        title: str = f"Orgs/Units ({len(self.rows)})"
         return Panel(
             self.table,
             title=title,
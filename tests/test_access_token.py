@@ -1,8 +1,13 @@
+import base64
+import time
+
 import pytest
 
 pytestmark = pytest.mark.unit
 
-from squad.access_token import AccessToken
+from squonk2.dm_api import DmApi, DmApiRv
+
+from squad.access_token import AccessToken, get_token_expiry
 
 
 def test_as_access_token_without_config():
@@ -23,3 +28,48 @@ def test_dm_access_token_without_config():
 
     # Assert
     assert result is None
+
+
+def test_token_expiry():
+    # Arrange
+    payload = base64.urlsafe_b64encode(b'{"exp": 1660000000}').decode().rstrip("=")
+    token = f"header.{payload}.signature"
+
+    # Act
+    result = get_token_expiry(token)
+
+    # Assert
+    assert result == 1660000000
+
+
+def test_token_expiry_of_invalid_token():
+    # Arrange
+    now = time.time()
+
+    # Act
+    result = get_token_expiry("not-a-token")
+
+    # Assert
+    assert result > now
+
+
+def test_dm_admin_state_set_once_per_token(monkeypatch):
+    # Arrange
+    calls = []
+
+    def set_admin_state(access_token, *, admin):
+        calls.append(access_token)
+        return DmApiRv(success=True, msg={})
+
+    monkeypatch.setattr(DmApi, "set_admin_state", set_admin_state)
+    AccessToken.reset_dm_admin_state()
+
+    # Act
+    AccessToken.set_dm_admin_state("token-a")
+    AccessToken.set_dm_admin_state("token-a")
+    AccessToken.set_dm_admin_state("token-b")
+    AccessToken.reset_dm_admin_state()
+    AccessToken.set_dm_admin_state("token-b")
+
+    # Assert
+    assert calls == ["token-a", "token-b", "token-b"]
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from squonk2.dm_api import DmApiRv
+
+from squad.bench import PAYLOADS, benchmark, main
+from squad.widgets.topics.registry import renderer_class
+
+
+@pytest.mark.parametrize("topic", list(PAYLOADS))
+def test_payload_rows(topic):
+    # Arrange
+    renderer = renderer_class(topic)()
+
+    # Act
+    rows = list(renderer.extract_rows(DmApiRv(success=True, msg=PAYLOADS[topic](30))))
+
+    # Assert
+    assert len(rows) == 30
+
+
+@pytest.mark.parametrize("topic", list(PAYLOADS))
+def test_benchmark(topic):
+    # Arrange
+    num_rows = 25
+
+    # Act
+    result = benchmark(topic, num_rows, repeat=1)
+
+    # Assert
+    assert result["topic"] == topic
+    assert result["rows"] == num_rows
+    assert result["peak_bytes"] > 0
+    assert result["extract_s"] >= 0
+
+
+def test_main_writes_json(tmp_path):
+    # Arrange
+    output = tmp_path / "bench.json"
+
+    # Act
+    ret_val = main(
+        ["--sizes", "10,20", "--topics", "projects", "--repeat", "1", "-o", str(output)]
+    )
+
+    # Assert
+    assert ret_val == 0
+    report = json.loads(output.read_text())
+    assert [result["rows"] for result in report["results"]] == [10, 20]
+    assert set(report["results"][0]) == {
+        "topic",
+        "rows",
+        "extract_s",
+        "sort_s",
+        "reverse_s",
+        "render_s",
+        "peak_bytes",
+    }
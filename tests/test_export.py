@@ -0,0 +1,79 @@
+import io
+import json
+from decimal import Decimal
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from rich.text import Text
+from squonk2.dm_api import DmApi, DmApiRv
+
+from squad.access_token import AccessToken
+from squad.export import get_final_response, main, write_csv, write_jsonl
+from squad.recordings import Recordings
+from squad.widgets.topics.tasks import Tasks
+
+
+def test_write_csv():
+    # Arrange
+    file = io.StringIO()
+
+    # Act
+    write_csv(
+        ["Name", "Coins", "Job"], iter([["a", Decimal("1.10"), Text("x|y")]]), file
+    )
+
+    # Assert
+    assert file.getvalue().splitlines() == ["Name,Coins,Job", "a,1.10,x|y"]
+
+
+def test_write_jsonl():
+    # Arrange
+    file = io.StringIO()
+
+    # Act
+    write_jsonl(
+        ["Name", "Used", "Size"], iter([["a", True, None], ["b", False, 2]]), file
+    )
+
+    # Assert
+    lines = file.getvalue().splitlines()
+    assert json.loads(lines[0]) == {"Name": "a", "Used": True, "Size": None}
+    assert len(lines) == 2
+
+
+def test_final_response_is_the_only_request(monkeypatch):
+    # Arrange
+    calls = []
+
+    def get_available_tasks(access_token, *, exclude_done):
+        calls.append(exclude_done)
+        return DmApiRv(success=True, msg={"tasks": []})
+
+    monkeypatch.setattr(AccessToken, "get_dm_access_token", lambda: "token")
+    monkeypatch.setattr(AccessToken, "set_dm_admin_state", lambda token: True)
+    monkeypatch.setattr(DmApi, "get_available_tasks", get_available_tasks)
+
+    # Act
+    response = get_final_response(Tasks())
+
+    # Assert
+    assert response.success
+    assert calls == [False]
+
+
+def test_unreadable_recordings_are_an_error(monkeypatch, capsys):
+    # Arrange
+    def replay(directory):
+        raise PermissionError(f"Permission denied: '{directory}'")
+
+    monkeypatch.setattr("squad.environment.load_environment", lambda name: None)
+    monkeypatch.setattr(Recordings, "replay", replay)
+
+    # Act
+    ret_val = main(["tasks", "--replay", "recordings"])
+
+    # Assert
+    assert ret_val == 1
+    assert "Error using recordings" in capsys.readouterr().err
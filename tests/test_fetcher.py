@@ -0,0 +1,112 @@
+import time
+from datetime import timedelta
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from squad.fetcher import Fetcher
+
+
+def _wait_for(key):
+    for _ in range(100):
+        if not Fetcher.busy(key):
+            return
+        time.sleep(0.01)
+
+
+def test_schedule_and_get():
+    # Arrange
+
+    # Act
+    Fetcher.schedule("test-a", lambda: 42, interval=timedelta(seconds=20))
+    _wait_for("test-a")
+
+    # Assert
+    assert Fetcher.get("test-a") == 42
+
+
+def test_schedule_respects_interval():
+    # Arrange
+    Fetcher.schedule("test-b", lambda: 1, interval=timedelta(seconds=20))
+    _wait_for("test-b")
+
+    # Act
+    Fetcher.schedule("test-b", lambda: 2, interval=timedelta(seconds=20))
+    _wait_for("test-b")
+
+    # Assert
+    assert Fetcher.get("test-b") == 1
+
+
+def test_schedule_does_not_block():
+    # Arrange
+    start = time.monotonic()
+
+    # Act
+    Fetcher.schedule("test-c", lambda: time.sleep(0.5), interval=timedelta())
+    result = Fetcher.get("test-c")
+
+    # Assert
+    assert result is None
+    assert time.monotonic() - start < 0.25
+
+
+def test_get_unknown():
+    # Arrange
+
+    # Act
+    result = Fetcher.get("test-unknown")
+
+    # Assert
+    assert result is None
+
+
+def test_background_budget():
+    # Arrange
+    Fetcher.set_background_budget(1)
+
+    # Act
+    Fetcher.schedule(
+        "test-bg-a", lambda: 1, interval=timedelta(seconds=20), background=True
+    )
+    Fetcher.schedule(
+        "test-bg-b", lambda: 2, interval=timedelta(seconds=20), background=True
+    )
+    _wait_for("test-bg-a")
+    _wait_for("test-bg-b")
+    Fetcher.set_background_budget(30)
+
+    # Assert
+    assert Fetcher.get("test-bg-a") == 1
+    assert Fetcher.get("test-bg-b") is None
+
+
+def test_gather_is_concurrent():
+    # Arrange
+    start = time.monotonic()
+
+    # Act
+    result = Fetcher.gather(
+        lambda: time.sleep(0.3) or 1, lambda: time.sleep(0.3) or 2, lambda: 1 / 0
+    )
+
+    # Assert
+    assert result == [1, 2, None]
+    assert time.monotonic() - start < 0.55
+
+
+def test_host_slot_limits_concurrency():
+    # Arrange
+    start = time.monotonic()
+
+    def call():
+        with Fetcher.host_slot("test-host"):
+            time.sleep(0.2)
+
+    # Act
+    Fetcher.gather(call, call, call)
+
+    # Assert
+    # One slot, so the calls are made one at a time
+    assert time.monotonic() - start >= 0.6
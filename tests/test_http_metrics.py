@@ -0,0 +1,61 @@
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from squad.http_metrics import HttpMetrics, LatencyHistogram, endpoint_name
+
+
+@pytest.fixture
+def metrics():
+    HttpMetrics.reset()
+    yield HttpMetrics
+    HttpMetrics.reset()
+
+
+def test_endpoint_name():
+    # Arrange
+    url = "https://dm.example.com/data-manager-api/project/project-00a1/file?x=1"
+
+    # Act
+    name = endpoint_name("get", url)
+
+    # Assert
+    assert name == "GET dm.example.com/data-manager-api/project/{id}/file"
+    assert endpoint_name("GET", "https://as/v1/unit") == "GET as/v1/unit"
+
+
+def test_histogram_quantiles():
+    # Arrange
+    histogram = LatencyHistogram()
+    counts = len(histogram.counts)
+
+    # Act
+    for latency_ms in range(1, 1001):
+        histogram.add(latency_ms / 1000)
+
+    # Assert
+    # (buckets are about 19% wide, so quantiles are within 10%)
+    assert histogram.quantile(0.5) == pytest.approx(0.5, rel=0.1)
+    assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.1)
+    assert len(histogram.counts) == counts
+    assert LatencyHistogram().quantile(0.5) is None
+
+
+def test_summaries(metrics):
+    # Arrange
+    url = "https://dm.example.com/data-manager-api/task"
+
+    # Act
+    metrics.record("GET", url, 0.1, size=100)
+    metrics.record("GET", url, 0.2, error=True)
+    metrics.record("POST", "https://kc.example.com/token", 0.05, size=10)
+
+    # Assert
+    summaries = {summary.endpoint: summary for summary in metrics.get_summaries()}
+    task = summaries["GET dm.example.com/data-manager-api/task"]
+    assert (task.requests, task.errors, task.total_bytes) == (2, 1, 100)
+    assert task.p50_s == pytest.approx(0.1, rel=0.1)
+    assert task.p99_s == pytest.approx(0.2, rel=0.1)
+    host = metrics.get_host_summary("dm.example.com")
+    assert (host.requests, host.errors) == (2, 1)
+    assert metrics.get_host_summary("unknown").p50_s is None
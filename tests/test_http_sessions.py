@@ -0,0 +1,70 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from squonk2 import as_api, auth, dm_api
+
+pytestmark = pytest.mark.unit
+
+from squad.http_metrics import HttpMetrics
+from squad.http_sessions import HttpSessions
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/version"
+    HttpSessions.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_connections_are_reused(server_url, monkeypatch):
+    # Arrange
+    # (the real requests module is restored when the test ends)
+    for module in (as_api, dm_api, auth):
+        monkeypatch.setattr(module, "requests", requests)
+    HttpSessions.install()
+    stats = HttpSessions.get_stats()
+
+    # Act
+    dm_api.requests.request("GET", server_url, timeout=4).close()
+    response = dm_api.requests.request("GET", server_url, timeout=4)
+    response.close()
+
+    # Assert
+    assert response.status_code == 200
+    assert HttpSessions.get_stats().requests == stats.requests + 2
+    assert HttpSessions.get_stats().connections == stats.connections + 1
+
+
+def test_requests_are_measured(server_url):
+    # Arrange
+    HttpMetrics.reset()
+
+    # Act
+    HttpSessions.request("GET", server_url, timeout=4).close()
+
+    # Assert
+    summary = HttpMetrics.get_host_summary("127.0.0.1")
+    assert summary.requests == 1
+    assert summary.errors == 0
+    assert summary.total_bytes == 2
+    assert summary.p50_s is not None
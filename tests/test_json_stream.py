@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from squad.json_stream import iter_array
+
+
+def chunked(data, size):
+    return [data[index : index + size] for index in range(0, len(data), size)]
+
+
+def test_iter_array_across_chunk_boundaries():
+    # Arrange
+    msg = {
+        "count": 3,
+        "note": "ignored, with [brackets] and {braces}",
+        "tasks": [
+            {"id": "task-1", "exit_code": 12345, "done": True},
+            {"id": "task-é", "exit_code": -1.5e3, "done": False},
+            {"id": "task-3", "nested": {"tasks": [1, 2]}, "done": None},
+        ],
+        "after": [1, 2, 3],
+    }
+    data = json.dumps(msg, indent=1).encode("utf-8")
+
+    # Act
+    records = [list(iter_array(chunked(data, size), "tasks")) for size in (1, 7, 4096)]
+
+    # Assert
+    for records_read in records:
+        assert records_read == msg["tasks"]
+
+
+def test_iter_array_empty():
+    # Arrange
+    data = b'{"count": 0, "tasks": []}'
+
+    # Act
+    records = list(iter_array([data], "tasks"))
+
+    # Assert
+    assert records == []
+
+
+def test_iter_array_missing_key():
+    # Arrange
+    data = b'{"count": 0, "datasets": []}'
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        list(iter_array([data], "tasks"))
+
+
+def test_iter_array_truncated():
+    # Arrange
+    data = b'{"tasks": [{"id": "task-1"}, {"id": "ta'
+
+    # Act / Assert
+    with pytest.raises(ValueError):
+        list(iter_array(chunked(data, 5), "tasks"))
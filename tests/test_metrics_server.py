@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+import pytest
+import requests
+
+pytestmark = pytest.mark.unit
+
+from squad.http_metrics import HttpMetrics
+from squad.metrics_server import MetricsStore, TopicGauges, format_sample, serve
+from squad.widgets.topics.instances import InstanceRow, Instances
+from squad.widgets.topics.row_store import RowStore
+
+
+def _instance(instance_id, phase, coins):
+    return InstanceRow(
+        instance_id, False, "name", "owner", "launched", phase, Decimal(coins), "", ""
+    )
+
+
+def test_format_sample():
+    # Arrange
+    labels = (("endpoint", 'GET "a"\\b'),)
+
+    # Act
+    line = format_sample("squad_http_requests", labels, 3)
+
+    # Assert
+    assert line == 'squad_http_requests{endpoint="GET \\"a\\"\\\\b"} 3'
+    assert format_sample("squad_projects", (), 2) == "squad_projects 2"
+
+
+def test_gauges_follow_the_rows():
+    # Arrange
+    rows = RowStore(key_columns=(0,))
+    gauges = TopicGauges("instances")
+    rows.merge([_instance("a", "RUNNING", "1.5"), _instance("b", "RUNNING", "2.25")])
+    gauges.update(rows)
+
+    # Act
+    # One instance completes, another appears and one goes away
+    keys = rows.merge(
+        [_instance("b", "COMPLETED", "3"), _instance("c", "RUNNING", "0.5")]
+    )
+    rows.retain(keys)
+    changed = gauges.update(rows)
+    unchanged = gauges.update(rows)
+
+    # Assert
+    assert changed
+    assert not unchanged
+    assert gauges.text.splitlines() == [
+        "# TYPE squad_instances gauge",
+        "# HELP squad_instances The number of instances, by phase",
+        'squad_instances{phase="COMPLETED"} 1',
+        'squad_instances{phase="RUNNING"} 1',
+        "# TYPE squad_instances_coins gauge",
+        "# HELP squad_instances_coins The coins used by instances, by phase",
+        'squad_instances_coins{phase="COMPLETED"} 3',
+        'squad_instances_coins{phase="RUNNING"} 0.5',
+    ]
+
+
+def test_scrape():
+    # Arrange
+    MetricsStore.reset()
+    HttpMetrics.reset()
+    renderer = Instances()
+    renderer.rows.merge([_instance("a", "RUNNING", "1")])
+    renderer.rows_loaded = True
+    MetricsStore.update("instances", renderer)
+    server = serve(("127.0.0.1", 0))
+    url = f"http://127.0.0.1:{server.server_port}"
+
+    # Act
+    response = requests.get(f"{url}/metrics", timeout=4)
+    missing = requests.get(f"{url}/other", timeout=4)
+
+    # Assert
+    server.shutdown()
+    server.server_close()
+    MetricsStore.reset()
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+    lines = response.text.splitlines()
+    assert 'squad_topic_up{topic="instances"} 1' in lines
+    assert 'squad_topic_rows{topic="instances"} 1' in lines
+    assert 'squad_instances{phase="RUNNING"} 1' in lines
+    assert lines[-1] == "# EOF"
+    assert missing.status_code == 404
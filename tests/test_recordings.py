@@ -0,0 +1,84 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from squad.http_sessions import HttpSessions
+from squad.recordings import Recordings, request_key
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # The number of requests handled
+    count = 0
+
+    def do_GET(self):
+        _Handler.count += 1
+        body = f'{{"count": {_Handler.count}}}'.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/task"
+    HttpSessions.close()
+    Recordings.stop()
+    server.shutdown()
+    server.server_close()
+
+
+def test_request_key():
+    # Arrange
+
+    # Act
+    key = request_key("get", "https://dm/task", {"b": 1, "a": True})
+
+    # Assert
+    assert key == request_key("GET", "https://dm/task", {"a": True, "b": 1})
+    assert key != request_key("GET", "https://dm/task")
+
+
+def test_record_and_replay(server_url, tmp_path):
+    # Arrange
+    Recordings.record(str(tmp_path))
+    for _ in range(2):
+        HttpSessions.request("GET", server_url, timeout=4).close()
+    HttpSessions.request(
+        "GET", server_url, params={"exclude_done": True}, timeout=4
+    ).close()
+    Recordings.stop()
+    handled = _Handler.count
+
+    # Act
+    Recordings.replay(str(tmp_path))
+    responses = [HttpSessions.request("GET", server_url) for _ in range(3)]
+    filtered = HttpSessions.request("GET", server_url, params={"exclude_done": True})
+    unknown = HttpSessions.request("GET", server_url + "/unknown")
+
+    # Assert
+    # Nothing was sent, the responses were replayed in order
+    # (the last one repeated) with their original status and headers
+    assert _Handler.count == handled
+    assert [response.json()["count"] for response in responses] == [
+        handled - 2,
+        handled - 1,
+        handled - 1,
+    ]
+    assert responses[0].status_code == 200
+    assert responses[0].headers["Content-Type"] == "application/json"
+    assert list(responses[0].iter_content(4))
+    assert filtered.json() == {"count": handled}
+    assert unknown.status_code == 404
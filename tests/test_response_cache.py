@@ -0,0 +1,98 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from squonk2.as_api import AsApiRv
+
+from squad.response_cache import ResponseCache
+
+
+class _Api:
+    def __init__(self, success=True):
+        self.calls = 0
+        self.success = success
+
+    def get_things(self, access_token, **kwargs):
+        self.calls += 1
+        time.sleep(0.05)
+        return AsApiRv(success=self.success, msg={"things": kwargs})
+
+
+def test_get_shares_response():
+    # Arrange
+    ResponseCache.clear()
+    api = _Api()
+
+    # Act
+    first = ResponseCache.get(api.get_things, "token-a", ttl=timedelta(seconds=20))
+    second = ResponseCache.get(api.get_things, "token-b", ttl=timedelta(seconds=20))
+
+    # Assert
+    assert api.calls == 1
+    assert first is second
+
+
+def test_get_with_different_arguments():
+    # Arrange
+    ResponseCache.clear()
+    api = _Api()
+
+    # Act
+    ResponseCache.get(api.get_things, "token", ttl=timedelta(seconds=20), x=1)
+    ResponseCache.get(api.get_things, "token", ttl=timedelta(seconds=20), x=2)
+
+    # Assert
+    assert api.calls == 2
+
+
+def test_get_after_ttl():
+    # Arrange
+    ResponseCache.clear()
+    api = _Api()
+
+    # Act
+    ResponseCache.get(api.get_things, "token", ttl=timedelta())
+    ResponseCache.get(api.get_things, "token", ttl=timedelta())
+
+    # Assert
+    assert api.calls == 2
+
+
+def test_get_does_not_cache_failures():
+    # Arrange
+    ResponseCache.clear()
+    api = _Api(success=False)
+
+    # Act
+    ResponseCache.get(api.get_things, "token", ttl=timedelta(seconds=20))
+    ResponseCache.get(api.get_things, "token", ttl=timedelta(seconds=20))
+
+    # Assert
+    assert api.calls == 2
+
+
+def test_concurrent_get_makes_one_call():
+    # Arrange
+    ResponseCache.clear()
+    api = _Api()
+    threads = [
+        threading.Thread(
+            target=ResponseCache.get,
+            args=(api.get_things, "token"),
+            kwargs={"ttl": timedelta(seconds=20)},
+        )
+        for _ in range(4)
+    ]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert api.calls == 1
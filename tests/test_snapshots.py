@@ -0,0 +1,37 @@
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from squad.snapshots import Snapshots
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    Snapshots.set_environment("test-env")
+    yield tmp_path / "squad" / "test-env"
+    monkeypatch.setattr(Snapshots, "_directory", None)
+    Snapshots._save_times.clear()
+
+
+def test_save_and_load(snapshot_dir):
+    # Arrange
+    msg = {"projects": [{"project_id": "project-1", "size": 10}]}
+
+    # Act
+    Snapshots.save("Projects", msg)
+    snapshot = Snapshots.load("Projects")
+
+    # Assert
+    assert (snapshot_dir / "Projects.json.gz").exists()
+    assert snapshot[1] == msg
+
+
+def test_load_missing_snapshot(snapshot_dir):
+    # Arrange
+
+    # Act
+    snapshot = Snapshots.load("Unknown")
+
+    # Assert
+    assert snapshot is None
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from squad.startup import StartupProfile
+
+
+@pytest.fixture
+def profile():
+    StartupProfile.reset()
+    yield StartupProfile
+    StartupProfile.reset()
+
+
+def test_only_the_first_event_is_recorded(profile):
+    # Arrange
+    profile.mark("imported")
+    first = profile.events()[0]
+
+    # Act
+    profile.mark("imported")
+    with profile.span("load environment"):
+        pass
+    with profile.span("load environment"):
+        profile.mark("first token")
+
+    # Assert
+    events = profile.events()
+    assert [event.name for event in events] == [
+        "imported",
+        "load environment",
+        "first token",
+    ]
+    assert events[0] == first
+    assert events[0].duration_s is None
+    assert events[1].duration_s >= 0
+    assert events[0].start_s > 0
+
+
+def test_report_and_chrome_trace(profile, tmp_path):
+    # Arrange
+    profile.mark("imported")
+    with profile.span("get token"):
+        pass
+    path = tmp_path / "trace.json"
+
+    # Act
+    report = profile.report()
+    profile.write_chrome_trace(str(path))
+
+    # Assert
+    assert "imported" in report
+    assert "get token [MainThread]" in report
+    trace = json.loads(path.read_text())
+    phases = {event["name"]: event["ph"] for event in trace["traceEvents"]}
+    assert phases == {"imported": "i", "get token": "X", "thread_name": "M"}
@@ -0,0 +1,421 @@
+import json
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from rich.console import Console
+from squonk2.dm_api import DmApi, DmApiRv
+
+from squad.access_token import AccessToken
+from squad.fetcher import Fetcher, Pages
+from squad.http_sessions import HttpSessions
+from squad.snapshots import Snapshots
+from squad.widgets.topics.base import KEEP_ROWS, StreamedRv
+from squad.widgets.topics.row_store import RowStore, SortOrder
+from squad.widgets.topics.instances import Instances
+from squad.widgets.topics.projects import Projects
+from squad.widgets.topics.tasks import Tasks
+
+
+def test_get_panel_is_reused():
+    # Arrange
+    tr = Projects()
+
+    # Act
+    first = tr.get_panel(120)
+    second = tr.get_panel(120)
+
+    # Assert
+    assert first is second
+
+
+def test_get_panel_after_sort_change():
+    # Arrange
+    tr = Projects()
+    first = tr.get_panel(120)
+
+    # Act
+    tr.adjust_sort_order("ascending")
+    second = tr.get_panel(120)
+
+    # Assert
+    assert first is not second
+
+
+def test_get_panel_after_width_change():
+    # Arrange
+    tr = Projects()
+    first = tr.get_panel(120)
+
+    # Act
+    second = tr.get_panel(100)
+
+    # Assert
+    assert first is not second
+
+
+def _projects_with_rows(num_rows, page_size):
+    tr = Projects()
+    tr.rows = RowStore([[f"p{n:03}", "name", "owner", n] for n in range(num_rows)])
+    tr.page_size = page_size
+    return tr
+
+
+def test_visible_rows_only_includes_window():
+    # Arrange
+    tr = _projects_with_rows(100, 10)
+
+    # Act
+    visible = list(tr.visible_rows())
+
+    # Assert
+    assert len(visible) == 10
+    assert visible[0][0].plain == "1"
+
+
+def test_adjust_scroll():
+    # Arrange
+    tr = _projects_with_rows(100, 10)
+
+    # Act
+    tr.adjust_scroll("page-down")
+    after_page_down = tr.first_row
+    tr.adjust_scroll("end")
+    after_end = tr.first_row
+    tr.adjust_scroll("page-up")
+    after_page_up = tr.first_row
+    tr.adjust_scroll("home")
+
+    # Assert
+    assert after_page_down == 10
+    assert after_end == 90
+    assert after_page_up == 80
+    assert tr.first_row == 0
+
+
+def test_visible_rows_unlimited():
+    # Arrange
+    tr = _projects_with_rows(100, 0)
+
+    # Act
+    visible = list(tr.visible_rows())
+
+    # Assert
+    assert len(visible) == 100
+
+
+def _tasks_response(*task_ids):
+    return DmApiRv(
+        success=True,
+        msg={
+            "tasks": [
+                {"id": task_id, "created": "", "purpose": "", "purpose_id": ""}
+                for task_id in task_ids
+            ]
+        },
+    )
+
+
+def test_collect_pages():
+    # Arrange
+    tr = Tasks()
+    tr.rows.merge(tr.extract_rows(_tasks_response("task-old")))
+    pages = Pages(2)
+    pages.append(_tasks_response("task-a"))
+
+    # Act
+    tr.collect_pages(pages)
+    progress = tr.loading_progress()
+    pages.append(_tasks_response("task-a", "task-b"))
+    pages.complete = True
+    tr.collect_pages(pages)
+
+    # Assert
+    assert progress == " [loading 1/2]"
+    assert sorted(tr.rows.column(0)) == ["task-a", "task-b"]
+    assert tr.loading_progress() == ""
+
+
+def test_changed_rows_are_highlighted():
+    # Arrange
+    tr = Tasks()
+    pages = Pages(1)
+    pages.append(_tasks_response("task-a", "task-b"))
+    pages.complete = True
+    tr.collect_pages(pages)
+    pages = Pages(1)
+    pages.append(_tasks_response("task-a", "task-b", "task-c"))
+    pages.complete = True
+
+    # Act
+    tr.collect_pages(pages)
+    labels = {row[0]: label for label, row in tr.visible_rows()}
+
+    # Assert
+    assert labels["task-c"].spans
+    assert not labels["task-a"].spans
+
+
+def test_refresh_interval_grows_when_nothing_changes():
+    # Arrange
+    tr = Projects()
+    tr.refresh_interval = timedelta(seconds=20)
+
+    # Act
+    tr.adapt_refresh_interval(changed=False)
+
+    # Assert
+    assert tr.refresh_interval == timedelta(seconds=30)
+
+
+def test_refresh_interval_bounds():
+    # Arrange
+    tr = Tasks()
+    tr.refresh_interval = timedelta(seconds=6)
+
+    # Act
+    tr.adapt_refresh_interval(changed=True)
+    fast = tr.refresh_interval
+    tr.adapt_refresh_interval(changed=True, failed=True, elapsed_s=30.0)
+
+    # Assert
+    assert fast == tr.min_refresh_interval
+    assert tr.refresh_interval == tr.max_refresh_interval
+
+
+def test_panel_fits_the_display():
+    # Arrange
+    tr = _projects_with_rows(100, 0)
+    tr.check_response = lambda background=False: None
+    console = Console(width=120)
+
+    # Act
+    panel = tr.get_panel(120, 30)
+    with console.capture() as capture:
+        console.print(panel)
+    lines = capture.get().splitlines()
+
+    # Assert
+    assert len(lines) == 30
+    assert "1-24 of 100" in lines[-1]
+
+
+def test_tasks_use_one_page_once_loaded():
+    # Arrange
+    tr = Tasks()
+    pages = Pages(2)
+    pages.append(_tasks_response("task-a"))
+    pages.append(_tasks_response("task-a", "task-b"))
+    pages.complete = True
+
+    # Act
+    cold_pages = tr.get_num_pages()
+    tr.collect_pages(pages)
+
+    # Assert
+    assert cold_pages == 2
+    assert tr.get_num_pages() == 1
+
+
+def test_every_failed_fetch_backs_off(monkeypatch):
+    # Arrange
+    tr = Projects()
+    tr.refresh_interval = timedelta(seconds=10)
+    generations = iter([1, 2])
+    monkeypatch.setattr(Fetcher, "schedule", lambda *args, **kwargs: None)
+    monkeypatch.setattr(Fetcher, "get", lambda key: None)
+    monkeypatch.setattr(Fetcher, "generation", lambda key: next(generations))
+
+    # Act
+    tr.check_response()
+    tr.check_response()
+
+    # Assert
+    assert tr.refresh_interval == timedelta(seconds=40)
+
+
+def test_title_shows_refresh_interval():
+    # Arrange
+    tr = _projects_with_rows(5, 0)
+    tr.check_response = lambda background=False: None
+    tr.refresh_interval = timedelta(seconds=30)
+
+    # Act
+    panel = tr.get_panel(120)
+
+    # Assert
+    assert panel.title.endswith(" every 30s")
+
+
+def test_rows_from_snapshot_are_stale(monkeypatch):
+    # Arrange
+    msg = {"projects": [{"project_id": "p1", "name": "n", "owner": "o", "size": 1}]}
+    monkeypatch.setattr(Snapshots, "load", lambda name: (time.time() - 120, msg))
+    tr = Projects()
+
+    # Act
+    tr.load_snapshot()
+
+    # Assert
+    assert len(tr.rows) == 1
+    assert tr.staleness() == " [stale, 2 minutes old]"
+
+
+class _StreamedResponse:
+    def __init__(self, body):
+        self.status_code = 200
+        self.body = body
+
+    def iter_content(self, chunk_size):
+        for index in range(0, len(self.body), 10):
+            yield self.body[index : index + 10]
+
+    def close(self):
+        pass
+
+
+def test_streamed_rows_match_extracted_rows(monkeypatch):
+    # Arrange
+    response = _tasks_response("task-a", "task-b", "task-c")
+    body = json.dumps(response.msg).encode("utf-8")
+    monkeypatch.setattr(DmApi, "get_api_url", lambda: ("https://dm", False))
+    monkeypatch.setattr(
+        HttpSessions, "request", lambda method, url, **kwargs: _StreamedResponse(body)
+    )
+    tr = Tasks()
+
+    # Act
+    streamed = tr.get_streamed_response("/task", "token")
+
+    # Assert
+    assert isinstance(streamed, StreamedRv)
+    assert streamed.success
+    assert list(tr.response_rows(streamed)) == list(tr.extract_rows(response))
+
+
+def test_collected_responses_are_dropped():
+    # Arrange
+    tr = Tasks()
+    task = '{"id": "%s", "created": "", "purpose": "INSTANCE", "purpose_id": ""}'
+    msg = json.loads('{"tasks": [%s, %s]}' % (task % "task-a", task % "task-b"))
+    pages = Pages(1)
+    pages.append(DmApiRv(success=True, msg=msg))
+    pages.complete = True
+
+    # Act
+    tr.collect_pages(pages)
+
+    # Assert
+    assert pages.responses == [None]
+    assert [row.task_id for row in tr.rows.rows] == ["task-a", "task-b"]
+    assert tr.rows.rows[0].purpose is tr.rows.rows[1].purpose
+
+
+def test_current_response_keeps_rows():
+    # Arrange
+    tr = Tasks()
+    pages = Pages(1)
+    pages.append(_tasks_response("task-a"))
+    pages.complete = True
+    tr.collect_pages(pages)
+    kept_pages = Pages(1)
+
+    # Act
+    response = tr.current_response()
+    kept_pages.append(response)
+    kept_pages.complete = True
+    tr.collect_pages(kept_pages)
+
+    # Assert
+    assert response is KEEP_ROWS
+    assert [row.task_id for row in tr.rows.rows] == ["task-a"]
+    assert tr.rows_loaded
+
+
+def test_kept_snapshot_rows_stay_stale_and_back_off(monkeypatch):
+    # Arrange
+    msg = {"projects": [{"project_id": "p1", "name": "n", "owner": "o", "size": 1}]}
+    monkeypatch.setattr(Snapshots, "load", lambda name: (time.time() - 120, msg))
+    tr = Projects()
+    tr.load_snapshot()
+    tr.refresh_interval = timedelta(seconds=20)
+    pages = Pages(1)
+    pages.append(tr.current_response())
+    pages.complete = True
+
+    # Act
+    tr.collect_pages(pages)
+
+    # Assert
+    assert len(tr.rows) == 1
+    assert tr.staleness() == " [stale, 2 minutes old]"
+    assert tr.refresh_interval == timedelta(seconds=40)
+
+
+@pytest.mark.parametrize("status,calls", [(401, 2), (403, 2), (500, 1), (504, 1)])
+def test_admin_calls_are_only_retried_when_refused(monkeypatch, status, calls):
+    # Arrange
+    monkeypatch.setattr(AccessToken, "set_dm_admin_state", lambda token: True)
+    monkeypatch.setattr(AccessToken, "reset_dm_admin_state", lambda: None)
+    tr = Tasks()
+    tokens = []
+
+    def function(access_token):
+        tokens.append(access_token)
+        return DmApiRv(
+            success=False,
+            msg={"error": f"Failed to get tasks (resp=<Response [{status}]>)"},
+        )
+
+    # Act
+    response = tr.get_admin_response(function, "token")
+
+    # Assert
+    assert not response.success
+    assert tokens == ["token"] * calls
+
+
+def test_filter_narrows_the_visible_rows():
+    # Arrange
+    tr = Instances()
+    tr.rows.merge(
+        [
+            ["i-1", False, "a", "alan", "2022", "RUNNING", Decimal(), "j", ""],
+            ["i-2", False, "b", "bob", "2023", "RUNNING", Decimal(), "j", ""],
+            ["i-3", False, "c", "alan", "2024", "FAILED", Decimal(), "j", ""],
+        ]
+    )
+
+    # Act
+    for key in "/owner:alan phase:run":
+        tr.edit_filter(key)
+    tr.edit_filter("enter")
+    filtered = [row[0] for _, row in tr.visible_rows()]
+    tr.edit_filter("/")
+    tr.edit_filter("escape")
+    unfiltered = [row[0] for _, row in tr.visible_rows()]
+
+    # Assert
+    assert filtered == ["i-1"]
+    assert unfiltered == ["i-3", "i-2", "i-1"]
+
+
+def test_push_and_pop_sort_columns():
+    # Arrange
+    tr = Projects()
+    tr.sort_column = 3
+    tr.sort_order = SortOrder.DESCENDING
+
+    # Act
+    tr.push_sort_column()
+    tr.sort_column = 2
+    pushed = list(tr.then_sort_by)
+    tr.pop_sort_column()
+
+    # Assert
+    assert pushed == [(3, SortOrder.DESCENDING)]
+    assert tr.then_sort_by == []
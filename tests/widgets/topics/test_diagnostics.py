@@ -0,0 +1,37 @@
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from rich.panel import Panel
+
+from squad.http_metrics import HttpMetrics
+from squad.widgets.topics.base import TopicRenderer
+from squad.widgets.topics.diagnostics import Diagnostics
+
+
+def test_instantiate():
+    # Arrange
+
+    # Act
+    tr = Diagnostics()
+
+    # Assert
+    assert tr is not None
+    assert isinstance(tr, Diagnostics)
+    assert isinstance(tr, TopicRenderer)
+
+
+def test_render_metrics():
+    # Arrange
+    HttpMetrics.reset()
+    HttpMetrics.record("GET", "https://dm.example.com/api/task", 0.1, size=10)
+    tr = Diagnostics()
+
+    # Act
+    tr.rows.merge(tr.response_rows(tr.get_response()))
+    panel = tr.render()
+
+    # Assert
+    assert isinstance(panel, Panel)
+    assert len(tr.rows) == 1
+    HttpMetrics.reset()
@@ -0,0 +1,38 @@
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from squad.widgets.topics.registry import TopicRegistry, renderer_class
+from squad.widgets.topics.tasks import Tasks
+
+
+def test_renderers_are_created_when_used():
+    # Arrange
+    registry = TopicRegistry()
+
+    # Act
+    names = list(registry)
+    known = "tasks" in registry and "unknown" not in registry
+    loaded_before = registry.is_loaded("tasks")
+    renderer = registry["tasks"]
+
+    # Assert
+    assert len(names) == len(registry) == 13
+    assert known
+    assert not loaded_before
+    assert isinstance(renderer, Tasks)
+    assert registry["tasks"] is renderer
+    assert registry.is_loaded("tasks")
+    assert not registry.is_loaded("projects")
+
+
+def test_unknown_topic():
+    # Arrange
+    registry = TopicRegistry()
+
+    # Act
+    with pytest.raises(KeyError):
+        registry["unknown"]
+
+    # Assert
+    assert renderer_class("tasks") is Tasks
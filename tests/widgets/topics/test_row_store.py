@@ -0,0 +1,173 @@
+from decimal import Decimal
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+from squad.widgets.topics.row_store import RowStore, SortOrder, parse_filter
+
+
+def test_sort_ascending():
+    # Arrange
+    rows = RowStore([["b", 2], ["a", 3], ["c", 1]])
+
+    # Act
+    result = rows.sort(1, SortOrder.ASCENDING)
+
+    # Assert
+    assert [row[0] for row in result] == ["c", "b", "a"]
+
+
+def test_sort_descending_is_stable():
+    # Arrange
+    rows = RowStore([["a", 1], ["b", 2], ["c", 1]])
+
+    # Act
+    result = rows.sort(1, SortOrder.DESCENDING)
+
+    # Assert
+    assert [row[0] for row in result] == ["b", "a", "c"]
+
+
+def test_sort_keeps_decimals_exact():
+    # Arrange
+    rows = RowStore([[Decimal("0.30000000000000001")], [Decimal("0.3")]])
+
+    # Act
+    result = rows.sort(0, SortOrder.DESCENDING)
+
+    # Assert
+    assert result[0][0] == Decimal("0.30000000000000001")
+    assert isinstance(result[0][0], Decimal)
+
+
+def test_sort_mixed_and_missing_values():
+    # Arrange
+    rows = RowStore([["x"], [None], [1], [True]])
+
+    # Act
+    result = rows.sort(0, SortOrder.ASCENDING)
+
+    # Assert
+    assert [row[0] for row in result] == [None, 1, True, "x"]
+
+
+def test_empty_store():
+    # Arrange
+    rows = RowStore()
+
+    # Act
+    result = rows.sort(0, SortOrder.ASCENDING)
+
+    # Assert
+    assert len(rows) == 0
+    assert result == []
+
+
+def test_merge_replaces_rows_with_the_same_key():
+    # Arrange
+    rows = RowStore([["a", 1], ["b", 2]], key_columns=(0,))
+    version = rows.version
+
+    # Act
+    keys = rows.merge([["b", 3], ["c", 4]])
+
+    # Assert
+    assert keys == {("b",), ("c",)}
+    assert rows.rows == [["a", 1], ["b", 3], ["c", 4]]
+    assert rows.version != version
+
+
+def test_retain():
+    # Arrange
+    rows = RowStore([["a", 1], ["b", 2]], key_columns=(0,))
+    rows.sort(1, SortOrder.ASCENDING)
+
+    # Act
+    rows.retain({("b",)})
+
+    # Assert
+    assert rows.sort(1, SortOrder.ASCENDING) == [["b", 2]]
+
+
+def test_merge_of_equal_rows_changes_nothing():
+    # Arrange
+    rows = RowStore([["a", 1], ["b", 2]], key_columns=(0,))
+    rows.sort(1, SortOrder.ASCENDING)
+    version = rows.version
+
+    # Act
+    rows.merge([["a", 1], ["b", 2]], record_changes=True)
+
+    # Assert
+    assert rows.version == version
+    assert rows.last_change_time == 0.0
+
+
+def test_parse_filter():
+    # Arrange
+    column_names = ["UUID", "Owner", "Launched (UTC)", "Phase"]
+
+    # Act
+    terms = parse_filter("owner:Alan launched:2022 phase:RUNNING x:y abc", column_names)
+
+    # Assert
+    assert terms == [
+        (1, "alan"),
+        (2, "2022"),
+        (3, "running"),
+        (None, "x:y"),
+        (None, "abc"),
+    ]
+
+
+def test_select_uses_indexed_and_unindexed_columns():
+    # Arrange
+    rows = RowStore(
+        [
+            ["i-1", "alan", "RUNNING", "job-a"],
+            ["i-2", "alan.b", "COMPLETED", "job-b"],
+            ["i-3", "bob", "RUNNING", "job-ab"],
+        ],
+        key_columns=(0,),
+        index_columns=(1, 2),
+    )
+
+    # Act
+    by_owner = rows.select([(1, "alan")])
+    by_owner_and_phase = rows.select([(1, "alan"), (2, "running")])
+    by_text = rows.select([(None, "ab")])
+    by_unindexed_column = rows.select([(3, "job-a")])
+
+    # Assert
+    assert by_owner == {0, 1}
+    assert by_owner_and_phase == {0}
+    assert by_text == {2}
+    assert by_unindexed_column == {0, 2}
+
+
+def test_sort_by_more_than_one_column():
+    # Arrange
+    rows = RowStore([["u2", 1], ["u1", 3], ["u2", 5], ["u1", 2]])
+
+    # Act
+    result = rows.sort(0, SortOrder.ASCENDING, then_by=[(1, SortOrder.DESCENDING)])
+
+    # Assert
+    assert [list(row) for row in result] == [["u1", 3], ["u1", 2], ["u2", 5], ["u2", 1]]
+
+
+def test_reversed_sort_matches_a_full_sort():
+    # Arrange
+    values = [["b", 1, 3], ["a", 2, 1], ["b", 2, 2], ["a", 1, 2], ["b", 1, 1]]
+    rows = RowStore(values)
+    then_by = [(1, SortOrder.ASCENDING)]
+    rows.sort(0, SortOrder.ASCENDING, then_by=then_by)
+
+    # Act
+    reversed_result = rows.sort(0, SortOrder.DESCENDING, then_by=then_by)
+    full_result = RowStore(values).sort(0, SortOrder.DESCENDING, then_by=then_by)
+
+    # Assert
+    assert reversed_result == full_result
+    assert [row[2] for row in reversed_result] == [3, 1, 2, 2, 1]